@@ -0,0 +1,513 @@
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+import autocorrelacao_espacial
+import padronizacao_etaria
+import series_epi
+import snapshot_colunar
+from geometria_bairros import ORCAMENTO_VERTICES, escolher_nivel
+from vizinhanca import Vizinhanca
+
+# define o caminho do banco de dados
+DB_FILE = "db_local.db"
+DATA_DIR = "data"
+DB_PATH = os.path.join(DATA_DIR, DB_FILE)
+# chave das linhas de "Todos os Anos" nas tabelas rollup_* (ver db_local.py)
+ANO_TODOS = 0
+
+# ajustes das conexões de leitura: o arquivo é mapeado em memória (leituras sem
+# cópia para o cache do SQLite) e a conexão recusa qualquer escrita
+PRAGMAS_LEITURA = (
+    "PRAGMA mmap_size = 268435456",  # 256 MB
+    "PRAGMA cache_size = -65536",    # ~64 MB
+    "PRAGMA query_only = 1",
+)
+# statements preparados mantidos por conexão (as consultas abaixo são sempre as mesmas)
+STATEMENTS_EM_CACHE = 128
+# threads que carregam as tabelas de um recorte/contexto ao mesmo tempo (1 = em série);
+# o sqlite3 solta o GIL durante a consulta, então a carga fria fica perto da tabela mais lenta
+THREADS_CARGA = int(os.environ.get("RIBEIRAO_THREADS_CARGA", "6"))
+
+# município aberto por padrão (código IBGE de Ribeirão Preto, ver db_local.py)
+MUNICIPIO_PADRAO = "354340"
+
+# --- CONSULTAS PARAMETRIZADAS ---
+# Tudo sai das tabelas rollup_* pela chave primária (cod_municipio, ano, ...): cada
+# página busca apenas as linhas do município e do ano selecionados (ou as linhas
+# pré-somadas de ANO_TODOS), sem passar pelas partições dos outros municípios.
+CONSULTAS_RECORTE = {
+    'df_perfil_filtrado': "SELECT * FROM rollup_perfil WHERE cod_municipio = :mun AND ano = :ano",
+    'df_mensal_filtrado': "SELECT * FROM rollup_mensal WHERE cod_municipio = :mun AND ano = :ano",
+    'df_faixa_filtrada': "SELECT * FROM rollup_faixa WHERE cod_municipio = :mun AND ano = :ano",
+    'df_regioes_filtrado': "SELECT * FROM rollup_regioes WHERE cod_municipio = :mun AND ano = :ano",
+    'df_bairros_filtrado': "SELECT * FROM rollup_bairros WHERE cod_municipio = :mun AND ano = :ano",
+}
+
+# tabela rollup de onde sai cada frame do recorte (para leitura pelo snapshot colunar)
+TABELAS_RECORTE = {
+    'df_perfil_filtrado': 'rollup_perfil',
+    'df_mensal_filtrado': 'rollup_mensal',
+    'df_faixa_filtrada': 'rollup_faixa',
+    'df_regioes_filtrado': 'rollup_regioes',
+    'df_bairros_filtrado': 'rollup_bairros',
+}
+
+# dados pequenos usados em todas as páginas (lista de anos, série anual, município)
+CONSULTAS_CONTEXTO = {
+    'df_anos': """
+        SELECT ano FROM rollup_perfil WHERE cod_municipio = :mun AND ano <> :todos ORDER BY ano DESC
+    """,
+    'df_historico': """
+        SELECT ano, casos_total, curados, obitos_dengue FROM rollup_perfil
+        WHERE cod_municipio = :mun AND ano <> :todos ORDER BY ano
+    """,
+    'df_municipio': "SELECT indicador, valor, unidade FROM dados_municipio WHERE cod_municipio = :mun",
+}
+
+# municípios cadastrados que já têm dados agregados (seletor da barra lateral)
+CONSULTA_MUNICIPIOS = """
+    SELECT m.cod_municipio, m.nome, m.uf FROM municipios m
+    WHERE EXISTS (SELECT 1 FROM rollup_perfil r WHERE r.cod_municipio = m.cod_municipio)
+    ORDER BY m.nome
+"""
+
+# casos diários por área (séries por semana epidemiológica) e a população de cada área;
+# no nível 'municipio' a única área é o próprio município, com todas as notificações
+CONSULTAS_SERIES = {
+    'municipio': """
+        SELECT dt_notificacao, cod_municipio AS area, SUM(casos) AS casos FROM casos_dengue_diario
+        WHERE cod_municipio = :mun GROUP BY dt_notificacao
+    """,
+    'regioes': """
+        SELECT dt_notificacao, nome_regiao AS area, SUM(casos) AS casos FROM casos_dengue_diario
+        WHERE cod_municipio = :mun AND nome_regiao IS NOT NULL GROUP BY dt_notificacao, nome_regiao
+    """,
+    'bairros': """
+        SELECT dt_notificacao, nome_bairro AS area, SUM(casos) AS casos FROM casos_dengue_diario
+        WHERE cod_municipio = :mun AND nome_bairro IS NOT NULL GROUP BY dt_notificacao, nome_bairro
+    """,
+}
+CONSULTAS_POPULACAO = {
+    'municipio': """
+        SELECT cod_municipio, valor FROM dados_municipio
+        WHERE cod_municipio = :mun AND indicador = 'População Censo 2022'
+    """,
+    'regioes': "SELECT nome_regiao, total_populacao FROM rollup_regioes WHERE cod_municipio = :mun AND ano = :todos",
+    'bairros': "SELECT nome_bairro, total_populacao FROM rollup_bairros WHERE cod_municipio = :mun AND ano = :todos",
+}
+
+# clima das estações do município por semana epidemiológica e por mês, este ao lado
+# dos casos mensais
+CONSULTA_CLIMA_SEMANAL = """
+    SELECT inicio_semana, chuva_mm, temperatura, temp_min, temp_max, umidade FROM clima_semanal
+    WHERE cod_municipio = :mun ORDER BY semana_epi
+"""
+CONSULTA_CLIMA_MENSAL = """
+    SELECT k.ano, k.mes, c.casos, k.chuva_mm, k.temperatura, k.temp_min, k.temp_max, k.umidade
+    FROM clima_mensal k
+    LEFT JOIN casos_dengue_mensal c ON c.cod_municipio = k.cod_municipio AND c.ano = k.ano AND c.mes = k.mes
+    WHERE k.cod_municipio = :mun ORDER BY k.ano, k.mes
+"""
+
+# casos por área, ano e faixa etária (índice em padronizacao_etaria.FAIXAS_ETARIAS) e a
+# pirâmide etária interpolada dos setores censitários (variáveis pop_<faixa>); a das
+# regiões é a soma da dos seus bairros
+CONSULTAS_FAIXA_AREA = {
+    'regioes': """
+        SELECT ano, nome_regiao AS area, faixa, SUM(casos) AS casos FROM casos_dengue_faixa_area
+        WHERE cod_municipio = :mun AND nome_regiao IS NOT NULL GROUP BY ano, nome_regiao, faixa
+    """,
+    'bairros': """
+        SELECT ano, nome_bairro AS area, faixa, SUM(casos) AS casos FROM casos_dengue_faixa_area
+        WHERE cod_municipio = :mun AND nome_bairro IS NOT NULL GROUP BY ano, nome_bairro, faixa
+    """,
+}
+CONSULTAS_PIRAMIDE = {
+    'regioes': """
+        SELECT b.nome_regiao AS area, c.variavel, SUM(c.valor) AS valor FROM censo_bairros c
+        JOIN bairros b ON b.cod_municipio = c.cod_municipio AND b.nome_bairro = c.nome_bairro
+        WHERE c.cod_municipio = :mun AND c.variavel LIKE 'pop%' AND b.nome_regiao IS NOT NULL
+        GROUP BY b.nome_regiao, c.variavel
+    """,
+    'bairros': """
+        SELECT nome_bairro AS area, variavel, valor FROM censo_bairros
+        WHERE cod_municipio = :mun AND variavel LIKE 'pop%'
+    """,
+}
+
+# casos e população de cada bairro em todos os anos (e em ANO_TODOS) e os pares de
+# bairros vizinhos, para a autocorrelação espacial
+CONSULTA_BAIRROS_ANOS = """
+    SELECT ano, nome_bairro, casos, total_populacao, latitude, longitude FROM rollup_bairros
+    WHERE cod_municipio = :mun ORDER BY ano, nome_bairro
+"""
+CONSULTA_VIZINHOS = "SELECT nome_bairro, vizinho, contiguo FROM vizinhos_bairros WHERE cod_municipio = :mun"
+
+# indicadores socioeconômicos por área para o laboratório de correlação; nos bairros,
+# valem as variáveis interpoladas dos setores censitários (censo_bairros) e, na falta
+# delas, as da região a que o bairro pertence
+CONSULTAS_CORRELACAO = {
+    'regioes': """
+        SELECT r.nome_regiao AS area, r.casos, r.total_populacao, r.taxa_incidencia, r.renda_per_capita,
+               r.densidade_pop, r.populacao_negra_pct, r.anos_de_estudo,
+               1.0 * c.total_populacao / NULLIF(c.total_domicilios, 0) AS moradores_por_domicilio
+        FROM rollup_regioes r
+        LEFT JOIN censo_2022 c ON c.cod_municipio = r.cod_municipio AND c.regiao = r.nome_regiao
+        WHERE r.cod_municipio = :mun AND r.ano = :ano ORDER BY r.nome_regiao
+    """,
+    'bairros': """
+        SELECT b.nome_bairro AS area, b.casos, b.total_populacao, b.taxa_incidencia, b.renda_per_capita,
+               b.total_populacao / NULLIF(g.area_km2, 0) AS densidade_pop,
+               COALESCE(cs.populacao_negra_pct, c10.populacao_negra_pct) AS populacao_negra_pct,
+               COALESCE(cs.anos_de_estudo, c10.anos_de_estudo) AS anos_de_estudo,
+               COALESCE(cs.populacao / NULLIF(cs.domicilios, 0),
+                        1.0 * c22.total_populacao / NULLIF(c22.total_domicilios, 0)) AS moradores_por_domicilio
+        FROM rollup_bairros b
+        LEFT JOIN bairros g ON g.cod_municipio = b.cod_municipio AND g.nome_bairro = b.nome_bairro
+        LEFT JOIN (
+            SELECT nome_bairro,
+                   MAX(CASE WHEN variavel = 'populacao' THEN valor END) AS populacao,
+                   MAX(CASE WHEN variavel = 'domicilios' THEN valor END) AS domicilios,
+                   MAX(CASE WHEN variavel = 'populacao_negra_pct' THEN valor END) AS populacao_negra_pct,
+                   MAX(CASE WHEN variavel = 'anos_de_estudo' THEN valor END) AS anos_de_estudo
+            FROM censo_bairros WHERE cod_municipio = :mun GROUP BY nome_bairro
+        ) cs ON cs.nome_bairro = b.nome_bairro
+        LEFT JOIN censo_2010 c10 ON c10.cod_municipio = b.cod_municipio AND c10.regiao = b.nome_regiao
+        LEFT JOIN censo_2022 c22 ON c22.cod_municipio = b.cod_municipio AND c22.regiao = b.nome_regiao
+        WHERE b.cod_municipio = :mun AND b.ano = :ano ORDER BY b.nome_bairro
+    """,
+}
+
+# tabelas do banco das quais cada consulta depende (para versionar os caches)
+DEPENDENCIAS = {
+    'df_perfil_filtrado': ('rollup_perfil',),
+    'df_mensal_filtrado': ('rollup_mensal',),
+    'df_faixa_filtrada': ('rollup_faixa',),
+    'df_regioes_filtrado': ('rollup_regioes',),
+    'df_bairros_filtrado': ('rollup_bairros',),
+    'geometria_bairros': ('bairros_geometria',),
+    'series_epi': ('casos_dengue_diario', 'rollup_regioes', 'rollup_bairros'),
+    'variaveis_correlacao': ('rollup_regioes', 'rollup_bairros', 'bairros', 'censo_2010', 'censo_2022', 'censo_bairros'),
+    'taxas_padronizadas': ('casos_dengue_faixa_area', 'censo_bairros', 'bairros'),
+    'autocorrelacao_espacial': ('rollup_bairros', 'vizinhos_bairros'),
+    'clima_semanal': ('clima_semanal',),
+    'clima_mensal': ('clima_mensal', 'casos_dengue_mensal'),
+    'df_anos': ('rollup_perfil',),
+    'df_historico': ('rollup_perfil',),
+    'df_municipio': ('dados_municipio',),
+    'municipios': ('municipios', 'rollup_perfil'),
+}
+
+_local = threading.local()
+_manifesto = {'assinatura': None, 'conteudo': None}
+_pool = {'executor': None}
+_lock_pool = threading.Lock()
+
+
+def conectar_somente_leitura(caminho=DB_PATH):
+    """
+    Abre uma conexão somente leitura (URI mode=ro) com mmap e cache de statements.
+
+    Não usamos immutable=1: o db_local.py atualiza o arquivo em uso (modo WAL) e
+    uma conexão "imutável" continuaria lendo páginas antigas.
+    """
+    uri = f"file:{os.path.abspath(caminho)}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, cached_statements=STATEMENTS_EM_CACHE)
+    for pragma in PRAGMAS_LEITURA:
+        conn.execute(pragma)
+    return conn
+
+
+def conexao():
+    """
+    Conexão de longa duração da thread atual (uma por thread: o Streamlit atende
+    cada sessão numa thread e objetos sqlite3 não devem ser usados em paralelo).
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _local.conn = conectar_somente_leitura()
+    return conn
+
+
+def consultar(sql, params=(), conn=None):
+    """Executa uma consulta e devolve um DataFrame (sem passar pelo read_sql do pandas)."""
+    cursor = (conn or conexao()).execute(sql, params)
+    colunas = [descricao[0] for descricao in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=colunas)
+
+
+def _executor_carga():
+    # criado na primeira carga e mantido: cada thread guarda a sua conexão (ver conexao())
+    with _lock_pool:
+        if _pool['executor'] is None:
+            _pool['executor'] = ThreadPoolExecutor(max_workers=THREADS_CARGA, thread_name_prefix="carga_dados")
+        return _pool['executor']
+
+
+def _carregar_medido(carregar):
+    inicio = time.perf_counter()
+    df = carregar()
+    return df, (time.perf_counter() - inicio) * 1000
+
+
+def carregar_em_paralelo(tarefas, tempos=None):
+    """
+    Executa {nome: carregar()} ao mesmo tempo no pool de carga, cada thread com a sua
+    conexão somente leitura, e devolve {nome: DataFrame}. Se `tempos` for um dict,
+    recebe o tempo de cada tabela em ms.
+    """
+    if THREADS_CARGA <= 1 or len(tarefas) <= 1:
+        resultados = {nome: _carregar_medido(carregar) for nome, carregar in tarefas.items()}
+    else:
+        executor = _executor_carga()
+        futuros = {nome: executor.submit(_carregar_medido, carregar) for nome, carregar in tarefas.items()}
+        resultados = {nome: futuro.result() for nome, futuro in futuros.items()}
+    if tempos is not None:
+        tempos.update({nome: ms for nome, (_, ms) in resultados.items()})
+    return {nome: df for nome, (df, _) in resultados.items()}
+
+
+def chave_ano(ano):
+    """Converte o valor do filtro ("Todos os Anos" ou um ano) na chave das tabelas rollup_*."""
+    return ANO_TODOS if ano == "Todos os Anos" else int(ano)
+
+
+def manifesto_snapshot():
+    """Manifesto do snapshot colunar, relido só quando o arquivo muda (um os.stat)."""
+    caminho = os.path.join(snapshot_colunar.SNAPSHOT_DIR, snapshot_colunar.MANIFESTO)
+    try:
+        info = os.stat(caminho)
+        assinatura = (info.st_mtime_ns, info.st_size)
+    except FileNotFoundError:
+        return None
+    if assinatura != _manifesto['assinatura']:
+        _manifesto['conteudo'] = snapshot_colunar.ler_manifesto()
+        _manifesto['assinatura'] = assinatura
+    return _manifesto['conteudo']
+
+
+def _ler_do_snapshot(tabela, municipio, ano, versoes):
+    """
+    Partição (município, ano) no snapshot colunar, por memory-map, se ela estiver na
+    mesma versão do banco; senão None (quem chama cai para a consulta SQL).
+    """
+    manifesto = manifesto_snapshot()
+    info = snapshot_colunar.informacoes_particao(manifesto, tabela, municipio)
+    if info is None or info['versao'] != versoes.get(tabela):
+        return None
+    return snapshot_colunar.ler_particao(manifesto, tabela, municipio, ano)
+
+
+def _ler_frame_recorte(nome, municipio, chave, versoes):
+    df = _ler_do_snapshot(TABELAS_RECORTE[nome], municipio, chave, versoes)
+    if df is None:
+        df = consultar(CONSULTAS_RECORTE[nome], {'mun': municipio, 'ano': chave})
+    # a chave da partição é a mesma em todas as linhas: as páginas não a veem
+    return df.drop(columns='cod_municipio')
+
+
+def carregar_recorte(ano, versoes=None, tempos=None, municipio=MUNICIPIO_PADRAO):
+    """
+    Frames de um filtro de município e ano, carregados em paralelo. Vêm do snapshot
+    colunar (Arrow, por mmap) quando ele está atualizado; caso contrário, da consulta
+    indexada nas tabelas rollup_*.
+    """
+    chave = chave_ano(ano)
+    versoes = ler_versoes_tabelas(municipio) if versoes is None else versoes
+    tarefas = {nome: partial(_ler_frame_recorte, nome, municipio, chave, versoes) for nome in CONSULTAS_RECORTE}
+    return carregar_em_paralelo(tarefas, tempos)
+
+
+def carregar_contexto(tempos=None, municipio=MUNICIPIO_PADRAO):
+    """Frames pequenos comuns a todas as páginas (anos disponíveis, série anual, município)."""
+    params = {'mun': municipio, 'todos': ANO_TODOS}
+    tarefas = {nome: partial(consultar, sql, params) for nome, sql in CONSULTAS_CONTEXTO.items()}
+    return carregar_em_paralelo(tarefas, tempos)
+
+
+def listar_municipios():
+    """
+    Municípios com dados no banco (cod_municipio, nome, uf), em ordem de nome. Bancos
+    sem a tabela municipios devolvem um frame vazio (o painel abre o município padrão).
+    """
+    try:
+        return consultar(CONSULTA_MUNICIPIOS)
+    except sqlite3.OperationalError:
+        return pd.DataFrame(columns=['cod_municipio', 'nome', 'uf'])
+
+
+def carregar_geometria_bairros(orcamento=ORCAMENTO_VERTICES, municipio=MUNICIPIO_PADRAO):
+    """
+    (nível, geojson serializado) do mapa de bairros do município: o nível mais
+    detalhado que cabe no orçamento de vértices. (None, None) se o banco não tiver a
+    geometria.
+    """
+    try:
+        niveis = conexao().execute(
+            "SELECT nivel, tolerancia, vertices, geojson FROM bairros_geometria WHERE cod_municipio = ? ORDER BY nivel",
+            (municipio,),
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None, None
+    if not niveis:
+        return None, None
+    nivel = escolher_nivel(niveis, orcamento)
+    return nivel, next(geojson for n, _, _, geojson in niveis if n == nivel)
+
+
+def carregar_series_epi(nivel, municipio=MUNICIPIO_PADRAO):
+    """
+    SeriesEpi (ver series_epi.py) de todas as áreas do município no nível ('regioes' ou 'bairros'),
+    com os indicadores móveis já calculados. None se o banco não tiver casos diários
+    (eles vêm das notificações do SINAN).
+    """
+    try:
+        df = consultar(CONSULTAS_SERIES[nivel], {'mun': municipio})
+    except sqlite3.OperationalError:  # banco anterior à tabela casos_dengue_diario
+        return None
+    if df.empty:
+        return None
+    populacao = dict(conexao().execute(CONSULTAS_POPULACAO[nivel], {'mun': municipio, 'todos': ANO_TODOS}).fetchall())
+    dias = pd.to_datetime(df['dt_notificacao'], format="%Y-%m-%d").to_numpy().astype("datetime64[D]")
+    return series_epi.calcular_series(dias, df['area'].to_numpy(), df['casos'].to_numpy(), populacao)
+
+
+def carregar_variaveis_correlacao(nivel, ano, municipio=MUNICIPIO_PADRAO):
+    """Uma linha por área ('regioes' ou 'bairros') do município no ano, com incidência e indicadores do censo."""
+    return consultar(CONSULTAS_CORRELACAO[nivel], {'mun': municipio, 'ano': chave_ano(ano)})
+
+
+def carregar_clima_semanal(municipio=MUNICIPIO_PADRAO):
+    """
+    (domingo de cada SE em datetime64[D], {variável: valores por semana}) do clima do
+    município, NaN nas semanas sem leitura da variável e sem as variáveis que nenhuma
+    estação mede. None se o banco não tiver clima (vem do db_local.py --clima).
+    """
+    try:
+        df = consultar(CONSULTA_CLIMA_SEMANAL, {'mun': municipio})
+    except sqlite3.OperationalError:  # banco anterior à tabela clima_semanal
+        return None
+    if df.empty:
+        return None
+    semanas = pd.to_datetime(df.pop('inicio_semana'), format="%Y-%m-%d").to_numpy().astype("datetime64[D]")
+    valores = {variavel: df[variavel].to_numpy(dtype=np.float64) for variavel in df.columns}
+    # variáveis que nenhuma estação mede ficam de fora
+    return semanas, {variavel: serie for variavel, serie in valores.items() if np.isfinite(serie).any()}
+
+
+def carregar_clima_mensal(municipio=MUNICIPIO_PADRAO):
+    """Uma linha por mês com clima: casos do mês (quando houver) e as variáveis de clima. Vazio sem clima."""
+    try:
+        return consultar(CONSULTA_CLIMA_MENSAL, {'mun': municipio})
+    except sqlite3.OperationalError:
+        return pd.DataFrame()
+
+
+def carregar_autocorrelacao_espacial(municipio=MUNICIPIO_PADRAO):
+    """
+    AutocorrelacaoEspacial (ver autocorrelacao_espacial.py) da incidência dos bairros
+    do município em cada ano e em ANO_TODOS, com as permutações de todos os anos de
+    uma vez. Só entram os bairros com população. None sem casos por bairro, sem a
+    vizinhança (bancos anteriores à tabela vizinhos_bairros) ou com menos de 3 bairros.
+    """
+    try:
+        df = consultar(CONSULTA_BAIRROS_ANOS, {'mun': municipio})
+        registros = conexao().execute(CONSULTA_VIZINHOS, {'mun': municipio}).fetchall()
+    except sqlite3.OperationalError:
+        return None
+    todos = df[(df['ano'] == ANO_TODOS) & (df['total_populacao'] > 0)].set_index('nome_bairro')
+    if not registros or len(todos) < 3 or not (df['casos'] > 0).any():
+        return None
+
+    vizinhanca = Vizinhanca.de_registros(registros, nomes=sorted(todos.index))
+    todos = todos.loc[list(vizinhanca.nomes)]
+    casos = (
+        df[df['nome_bairro'].isin(todos.index)]
+        .pivot_table(index='ano', columns='nome_bairro', values='casos', aggfunc='sum', fill_value=0)
+        .reindex(columns=todos.index, fill_value=0)
+    )
+    return autocorrelacao_espacial.analisar(
+        casos.to_numpy(), todos['total_populacao'].to_numpy(), vizinhanca.nomes, casos.index.tolist(),
+        vizinhanca, todos['latitude'].to_numpy(), todos['longitude'].to_numpy(),
+    )
+
+
+def carregar_taxas_padronizadas(nivel, padrao='oms', municipio=MUNICIPIO_PADRAO):
+    """
+    TaxasPadronizadas (ver padronizacao_etaria.py) de todas as áreas do município no
+    nível ('regioes' ou 'bairros'), em cada ano e em ANO_TODOS (casos somados, pessoas-ano
+    da pirâmide vezes o número de anos). `padrao` é 'oms' (população padrão da OMS) ou
+    'municipio' (a pirâmide do próprio município). None se faltarem casos por faixa
+    etária (vêm das notificações do SINAN) ou a pirâmide dos setores censitários.
+    """
+    try:
+        casos = consultar(CONSULTAS_FAIXA_AREA[nivel], {'mun': municipio})
+        piramide = consultar(CONSULTAS_PIRAMIDE[nivel], {'mun': municipio})
+    except sqlite3.OperationalError:  # banco anterior às tabelas casos_dengue_faixa_area/censo_bairros
+        return None
+    faixas = {f"pop_{faixa}": k for k, faixa in enumerate(padronizacao_etaria.FAIXAS_ETARIAS)}
+    piramide = piramide[piramide['variavel'].isin(faixas)]
+    if casos.empty or piramide.empty:
+        return None
+
+    # só as áreas com pirâmide entram: sem população não há taxa
+    areas = pd.Index(sorted(piramide['area'].unique()))
+    anos = np.sort(casos['ano'].unique())
+    n_areas, n_anos, n_faixas = len(areas), len(anos) + 1, len(faixas)
+
+    populacao = np.bincount(
+        areas.get_indexer(piramide['area']) * n_faixas + piramide['variavel'].map(faixas).to_numpy(),
+        weights=piramide['valor'].to_numpy(dtype=np.float64), minlength=n_areas * n_faixas,
+    ).reshape(n_areas, 1, n_faixas)
+    area = areas.get_indexer(casos['area'])
+    casos = casos[area >= 0]
+    area = area[area >= 0]
+    cubo = np.bincount(
+        (area * n_anos + np.searchsorted(anos, casos['ano'].to_numpy())) * n_faixas + casos['faixa'].to_numpy(),
+        weights=casos['casos'].to_numpy(dtype=np.float64), minlength=n_areas * n_anos * n_faixas,
+    ).reshape(n_areas, n_anos, n_faixas)
+    cubo[:, -1] = cubo[:, :-1].sum(axis=1)
+    # a última fatia é o período inteiro: a pirâmide conta uma vez por ano
+    anos_por_fatia = np.r_[np.ones(n_anos - 1), n_anos - 1][None, :, None]
+
+    pesos = padronizacao_etaria.POPULACAO_PADRAO_OMS if padrao == 'oms' else populacao.sum(axis=(0, 1))
+    return padronizacao_etaria.padronizar(
+        cubo, populacao * anos_por_fatia, pesos, areas=areas, anos=(*anos.tolist(), ANO_TODOS),
+    )
+
+
+def impressao_digital_banco(caminho=DB_PATH):
+    """
+    Assinatura barata do banco: mtime e tamanho do arquivo e do -wal (em modo WAL
+    as escritas novas ficam no -wal até o checkpoint). Custa dois os.stat.
+    """
+    assinatura = []
+    for arquivo in (caminho, caminho + '-wal'):
+        try:
+            info = os.stat(arquivo)
+            assinatura += [info.st_mtime_ns, info.st_size]
+        except FileNotFoundError:
+            assinatura += [0, 0]
+    return tuple(assinatura)
+
+
+def ler_versoes_tabelas(municipio=MUNICIPIO_PADRAO, conn=None):
+    """
+    Versões gravadas pelo db_local.py em versao_tabelas ({tabela: versão}) vistas por
+    um município: a da partição dele nas tabelas particionadas e a versão única das
+    demais. Bancos antigos, sem essa tabela, devolvem um dicionário vazio.
+    """
+    try:
+        return dict((conn or conexao()).execute(
+            "SELECT tabela, MAX(versao) FROM versao_tabelas WHERE cod_municipio IN ('', ?) GROUP BY tabela",
+            (municipio,),
+        ))
+    except sqlite3.OperationalError:
+        return {}
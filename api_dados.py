@@ -0,0 +1,235 @@
+"""
+API JSON somente leitura com os números do dashboard (KPIs, série mensal, incidência
+por região), para outros sistemas não precisarem raspar a interface do Streamlit.
+
+Só biblioteca padrão (http.server) sobre a mesma camada de dados do app
+(acesso_dados). Cada resposta é serializada uma vez por versão dos dados e guardada
+em memória já em bytes, com um ETag derivado da versão: uma requisição repetida
+custa uma busca num dicionário, e um If-None-Match com o ETag atual recebe 304 sem
+corpo. Quando o db_local.py atualiza o banco, a versão muda e o cache é refeito.
+
+Rotas (ANO = um ano ou "todos"):
+    /api/anos                     anos disponíveis e versão dos dados
+    /api/historico                série anual (casos, curados, óbitos)
+    /api/ANO/kpis                 cards do RESUMO, com as variações contra o ano anterior
+    /api/ANO/mensal               casos por mês
+    /api/ANO/regioes              incidência por região
+    /api/ANO/regioes/NOME         uma região
+
+Uso:
+    python api_dados.py --porta 8600 [--municipio 354340]
+"""
+import argparse
+import hashlib
+import json
+import logging
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import acesso_dados
+from indicadores import kpis_periodo
+
+logger = logging.getLogger(__name__)
+
+PORTA_PADRAO = 8600
+# intervalo mínimo entre verificações do banco (dois os.stat) para detectar atualização
+INTERVALO_VERIFICACAO = 1.0
+TODOS = "todos"
+
+
+class NaoEncontrado(Exception):
+    pass
+
+
+def _registros(df):
+    # via to_json: NaN vira null e tipos numpy viram números JSON
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+
+def _ano_do_caminho(texto, anos):
+    if texto == TODOS:
+        return "Todos os Anos"
+    if not texto.isdigit() or int(texto) not in anos:
+        raise NaoEncontrado(f"ano sem dados: {texto}")
+    return int(texto)
+
+
+class CacheRespostas:
+    """
+    Respostas serializadas por caminho, válidas para uma versão dos dados do
+    município. A versão é conferida no máximo a cada INTERVALO_VERIFICACAO segundos;
+    cargas de outros municípios não a alteram.
+    """
+
+    def __init__(self, intervalo=INTERVALO_VERIFICACAO, municipio=acesso_dados.MUNICIPIO_PADRAO):
+        self.intervalo = intervalo
+        self.municipio = municipio
+        self._lock = threading.Lock()
+        self._respostas = {}   # caminho -> (status, etag, corpo)
+        self._recortes = {}    # ano -> frames do recorte
+        self._impressao = None
+        self._proxima_verificacao = 0.0
+        self.versao = None
+        self.contexto = None
+        self.anos = frozenset()
+
+    def _sincronizar(self):
+        agora = time.monotonic()
+        if agora < self._proxima_verificacao:
+            return
+        with self._lock:
+            if agora < self._proxima_verificacao:
+                return
+            impressao = acesso_dados.impressao_digital_banco()
+            if impressao != self._impressao:
+                versoes = acesso_dados.ler_versoes_tabelas(self.municipio)
+                versao = hashlib.sha1(
+                    json.dumps(versoes or impressao, sort_keys=True).encode()
+                ).hexdigest()[:16]
+                if versao != self.versao:
+                    self.contexto = acesso_dados.carregar_contexto(municipio=self.municipio)
+                    self.anos = frozenset(self.contexto['df_anos']['ano'].tolist())
+                    self._recortes = {}
+                    self._respostas = {}
+                    self.versao = versao
+                    logger.info("dados na versão %s", versao)
+                self._impressao = impressao
+            self._proxima_verificacao = agora + self.intervalo
+
+    def resposta(self, caminho):
+        """(status, etag, corpo em bytes) de um caminho, montada só na primeira vez por versão."""
+        self._sincronizar()
+        # se a versão mudar durante a montagem, a resposta vai para o cache antigo, já descartado
+        respostas, versao = self._respostas, self.versao
+        pronta = respostas.get(caminho)
+        if pronta is not None:
+            return pronta
+        try:
+            status, dados = 200, self._montar(caminho)
+        except NaoEncontrado as exc:
+            status, dados = 404, {'erro': str(exc)}
+        corpo = json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = f'"{versao}-{zlib.crc32(corpo):08x}"'
+        pronta = (status, etag, corpo)
+        if status == 200 or len(respostas) < 10_000:  # 404 não pode encher a memória
+            respostas[caminho] = pronta
+        return pronta
+
+    def _recorte(self, ano):
+        recorte = self._recortes.get(ano)
+        if recorte is None:
+            recorte = self._recortes[ano] = acesso_dados.carregar_recorte(ano, municipio=self.municipio)
+        return recorte
+
+    def _montar(self, caminho):
+        partes = [unquote(p) for p in caminho.strip("/").split("/")]
+        if partes[:1] != ["api"] or len(partes) < 2:
+            raise NaoEncontrado(f"rota inexistente: {caminho}")
+        partes = partes[1:]
+        if partes == ["anos"]:
+            return {'versao': self.versao, 'anos': sorted(self.anos)}
+        if partes == ["historico"]:
+            return _registros(self.contexto['df_historico'])
+
+        ano = _ano_do_caminho(partes[0], self.anos)
+        rota = partes[1:]
+        if rota == ["kpis"]:
+            kpis = kpis_periodo(self._recorte(ano)['df_perfil_filtrado'], self.contexto['df_historico'], ano)
+            return {'ano': partes[0], **kpis}
+        if rota == ["mensal"]:
+            return _registros(self._recorte(ano)['df_mensal_filtrado'][['mes', 'casos']])
+        if rota[:1] == ["regioes"] and len(rota) <= 2:
+            df = self._recorte(ano)['df_regioes_filtrado'].drop(columns=['ano'])
+            if len(rota) == 1:
+                return _registros(df)
+            linha = df[df['nome_regiao'] == rota[1]]
+            if linha.empty:
+                raise NaoEncontrado(f"região inexistente: {rota[1]}")
+            return _registros(linha)[0]
+        raise NaoEncontrado(f"rota inexistente: {caminho}")
+
+    def aquecer(self):
+        """Monta de antemão as respostas de todas as rotas (exceto as de uma região)."""
+        self._sincronizar()
+        caminhos = ["/api/anos", "/api/historico"]
+        for ano in [TODOS, *map(str, sorted(self.anos))]:
+            caminhos += [f"/api/{ano}/kpis", f"/api/{ano}/mensal", f"/api/{ano}/regioes"]
+        for caminho in caminhos:
+            self.resposta(caminho)
+        return len(caminhos)
+
+
+def _etag_confere(cabecalho, etag):
+    if not cabecalho:
+        return False
+    candidatos = [c.strip().removeprefix("W/") for c in cabecalho.split(",")]
+    return "*" in candidatos or etag in candidatos
+
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: sem um handshake TCP por requisição
+    # cabeçalho e corpo saem em writes separados: com Nagle, cada resposta esperaria o ACK atrasado (~40 ms)
+    disable_nagle_algorithm = True
+    cache = None  # CacheRespostas, definido em criar_servidor
+
+    def do_GET(self):
+        self._responder(com_corpo=True)
+
+    def do_HEAD(self):
+        self._responder(com_corpo=False)
+
+    def _responder(self, com_corpo):
+        status, etag, corpo = self.cache.resposta(urlsplit(self.path).path)
+        if status == 200 and _etag_confere(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")  # pode guardar, mas revalida pelo ETag
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        if com_corpo:
+            self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        # uma linha de log por requisição custaria mais que a própria resposta
+        logger.debug(formato, *args)
+
+
+def criar_servidor(host="127.0.0.1", porta=PORTA_PADRAO, cache=None):
+    manipulador = type("Manipulador", (ManipuladorAPI,), {'cache': cache or CacheRespostas()})
+    servidor = ThreadingHTTPServer((host, porta), manipulador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API JSON somente leitura com os dados do dashboard.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--municipio", default=acesso_dados.MUNICIPIO_PADRAO, help="código IBGE do município servido")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    cache = CacheRespostas(municipio=args.municipio)
+    logger.info("%d respostas pré-serializadas", cache.aquecer())
+    servidor = criar_servidor(args.host, args.porta, cache)
+    logger.info("API em http://%s:%d/api/anos", args.host, args.porta)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,34 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import json
+import logging
 import os
-import numpy as np
+import time
+import uuid
+from types import MappingProxyType
+
+import acesso_dados
+import instrumentacao
+import paginas
+from acesso_dados import DB_FILE, DB_PATH, DEPENDENCIAS, MUNICIPIO_PADRAO
+from cache_figuras import CacheLRU, figura_memoizada, frame_memoizado, json_figura_memoizada
+from canal_endemico import CanaisPorVersao
+from correlacao_bootstrap import correlacoes_com_ic
+from correlacao_defasada import correlacoes_defasadas
+from figuras_multiano import ativar_ano, figura_com_anos
+from geometria_bairros import ARQUIVO_ESTATICO, DIR_ESTATICO
+
+logger = logging.getLogger("ribeirao_em_dados")
+inicio_execucao = time.perf_counter()
 
 # --- CONFIGURAÇÃO DA PÁGINA E ESTILO ---
 st.set_page_config(layout="wide", page_title="Ribeirão em Dados", page_icon="🦟")
 
+# medição de desempenho desta execução (ver instrumentacao.py)
+st.session_state.setdefault('id_sessao', uuid.uuid4().hex[:8])
+st.session_state['reruns'] = st.session_state.get('reruns', 0) + 1
+execucao = instrumentacao.iniciar(st.session_state['id_sessao'], st.session_state['reruns'])
+
 def load_css():
     light_theme = """
     <style>
@@ -42,55 +62,200 @@ def load_css():
     """
     st.markdown(light_theme, unsafe_allow_html=True)
 
-# define o caminho do banco de dados
-DB_FILE = "db_local.db"
-DATA_DIR = "data"
-DB_PATH = os.path.join(DATA_DIR, DB_FILE)
-
-@st.cache_data
-def carregar_dados_locais():
-    if not os.path.exists(DB_PATH):
-        st.error(f"Erro: Banco de dados '{DB_FILE}' não encontrado! Execute 'db_local.py' primeiro.")
-        st.stop()
-    conn = sqlite3.connect(DB_PATH)
-    
-    # query principal que cruza dados de dengue com censo e geometria (join)
-    query_regioes = """
-    SELECT 
-        cr.ano, cr.nome_regiao, cr.casos,
-        geo.latitude, geo.longitude,
-        c22.total_populacao, c22.populacao_por_km2 as densidade_pop,
-        c10.renda_per_capita, c10.populacao_negra_pct, c10.anos_de_estudo
-    FROM casos_dengue_regiao_anual cr
-    LEFT JOIN regioes_geometria geo ON cr.nome_regiao = geo.nome_regiao
-    LEFT JOIN censo_2022 c22 ON cr.nome_regiao = c22.regiao
-    LEFT JOIN censo_2010 c10 ON cr.nome_regiao = c10.regiao
+# os frames carregados são compartilhados entre todas as sessões; com copy-on-write
+# (padrão a partir do pandas 3) qualquer alteração feita por uma sessão gera cópia própria
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def _compactar(df):
     """
-    
-    tabelas = {
-        'df_regioes': pd.read_sql_query(query_regioes, conn),
-        'df_mensal': pd.read_sql_query("SELECT * FROM casos_dengue_mensal", conn),
-        'df_perfil': pd.read_sql_query("SELECT * FROM perfil_dengue_anual", conn),
-        'df_municipio': pd.read_sql_query("SELECT * FROM dados_municipio", conn),
-        'df_obitos_gerais': pd.read_sql_query("SELECT * FROM obitos_gerais_anual", conn),
-        'df_faixa': pd.read_sql_query("SELECT * FROM dengue_faixa_etaria", conn)
-    }
-    conn.close()
-    return tabelas
+    Tipos compactos para os frames compartilhados: texto repetido (nome_regiao,
+    indicador...) vira category e contagens inteiras usam o menor inteiro que cabe.
+    Colunas sem nenhum valor (ex.: um município sem regiões cadastradas) viram float,
+    para as contas das páginas darem NaN em vez de erro.
+    """
+    for coluna in df.columns:
+        serie = df[coluna]
+        if pd.api.types.is_integer_dtype(serie):
+            df[coluna] = pd.to_numeric(serie, downcast='integer')
+        elif serie.dtype == object and serie.isna().all():
+            df[coluna] = serie.astype('float64')
+        elif pd.api.types.is_string_dtype(serie):
+            df[coluna] = serie.astype('category')
+    return df
+
+@st.cache_resource(max_entries=2)
+def carregar_municipios(impressao_digital):
+    """{código IBGE: nome} dos municípios com dados, relido só quando o arquivo do banco muda."""
+    instrumentacao.marcar_falta('carregar_municipios')
+    df = acesso_dados.listar_municipios()
+    return MappingProxyType(dict(zip(df['cod_municipio'], df['nome'])))
+
+@st.cache_resource(max_entries=16)
+def versoes_tabelas(impressao_digital, municipio):
+    """
+    Versão de cada tabela gravada pelo db_local.py em versao_tabelas, vista pelo
+    município (a partição dele nas tabelas particionadas). Só é consultada quando a
+    impressão digital do arquivo muda; bancos antigos, sem essa tabela, usam a própria
+    impressão digital como versão de tudo.
+    """
+    instrumentacao.marcar_falta('versoes_tabelas')
+    versoes = acesso_dados.ler_versoes_tabelas(municipio)
+    padrao = hash(impressao_digital)
+
+    def versao_de(*frames):
+        return max(versoes.get(tabela, padrao) for frame in frames for tabela in DEPENDENCIAS[frame])
+    return versao_de
+
+@st.cache_resource(max_entries=16)
+def carregar_dados_locais(municipio, versao):
+    """
+    Carrega os dados comuns a todas as páginas (anos, série anual e município) uma
+    vez por município, versão e processo, as tabelas em paralelo. Diferente de st.cache_data, não há cópia (pickle)
+    por sessão a cada rerun: todas as sessões leem os mesmos frames, que devem ser
+    tratados como somente leitura.
+    """
+    instrumentacao.marcar_falta('carregar_dados_locais')
+    tempos = {}
+    tabelas = acesso_dados.carregar_contexto(tempos, municipio)
+    instrumentacao.registrar_tempos('carregar', tempos)
+    return MappingProxyType({nome: _compactar(df) for nome, df in tabelas.items()})
+
+@st.cache_resource(max_entries=32)
+def carregar_recorte(municipio, ano, versao):
+    """
+    Busca os dados de um filtro de município e ano nas tabelas rollup_* (consultas
+    indexadas por município e ano, em paralelo): só a partição selecionada é lida.
+    "Todos os Anos" usa as linhas pré-somadas, e a taxa de incidência já vem calculada
+    do banco. Compartilhado entre sessões (somente leitura).
+    """
+    instrumentacao.marcar_falta('carregar_recorte')
+    tempos = {}
+    recorte = acesso_dados.carregar_recorte(ano, tempos=tempos, municipio=municipio)
+    instrumentacao.registrar_tempos('carregar', tempos)
+    return MappingProxyType({nome: _compactar(df) for nome, df in recorte.items()})
+
+@st.cache_resource(max_entries=4)
+def carregar_geometria_bairros(municipio, versao):
+    """
+    Geometria do mapa de bairros (simplificada e quantizada na montagem do banco).
+    Com server.enableStaticServing, devolve a URL do arquivo em static/: o navegador o
+    baixa uma vez e as figuras levam só os valores por bairro. Sem isso, o geojson vai
+    embutido na figura.
+    """
+    instrumentacao.marcar_falta('carregar_geometria_bairros')
+    nivel, geojson = acesso_dados.carregar_geometria_bairros(municipio=municipio)
+    if geojson is None:
+        return None
+    arquivo = ARQUIVO_ESTATICO.format(municipio=municipio, nivel=nivel)
+    if st.get_option("server.enableStaticServing") and os.path.exists(os.path.join(DIR_ESTATICO, arquivo)):
+        return f"app/static/{arquivo}"
+    return json.loads(geojson)
+
+@st.cache_resource(max_entries=8)
+def carregar_series_epi(municipio, nivel, versao):
+    """
+    Séries por semana epidemiológica de todas as áreas de um nível, com os indicadores
+    móveis calculados de uma vez (NumPy). Compartilhadas entre sessões (somente leitura).
+    """
+    instrumentacao.marcar_falta('carregar_series_epi')
+    return acesso_dados.carregar_series_epi(nivel, municipio)
+
+@st.cache_resource
+def obter_canais_endemicos():
+    # um por processo: a cada versão dos dados, cada canal é atualizado a partir do anterior
+    return CanaisPorVersao()
+
+def canal_endemico(nivel, metodo):
+    versao = versao_de('series_epi')
+    with execucao.secao("canal_endemico"):
+        return obter_canais_endemicos().obter(
+            nivel, metodo, versao, lambda: carregar_series_epi(municipio_selecionado, nivel, versao), municipio_selecionado)
+
+@st.cache_resource(max_entries=32)
+def correlacoes_bootstrap(municipio, nivel, ano, variaveis, versao):
+    """
+    (áreas com todas as variáveis preenchidas, ResultadoCorrelacao ou None com menos de
+    3 áreas). O bootstrap roda uma vez por (nível, ano, variáveis, versão dos dados).
+    """
+    instrumentacao.marcar_falta('correlacoes_bootstrap')
+    df = acesso_dados.carregar_variaveis_correlacao(nivel, ano, municipio).dropna(subset=list(variaveis)).reset_index(drop=True)
+    if len(df) < 3:
+        return df, None
+    return df, correlacoes_com_ic(df[list(variaveis)].to_numpy(), variaveis)
+
+@st.cache_resource(max_entries=8)
+def correlacao_clima(municipio, nivel, versao_series, versao_clima):
+    """
+    Correlação defasada (0 a 12 semanas) entre cada variável de clima e os casos
+    semanais de todas as áreas do nível, calculada por FFT uma vez por versão dos
+    casos e do clima. None sem casos diários ou sem clima no banco.
+    """
+    instrumentacao.marcar_falta('correlacao_clima')
+    series = carregar_series_epi(municipio, nivel, versao_series)
+    clima = acesso_dados.carregar_clima_semanal(municipio)
+    if series is None or clima is None:
+        return None
+    return correlacoes_defasadas(series.inicio, series.casos, series.areas, *clima)
+
+@st.cache_resource(max_entries=8)
+def clima_mensal(municipio, versao):
+    # casos e clima por mês: só leitura, compartilhado entre sessões
+    instrumentacao.marcar_falta('clima_mensal')
+    return acesso_dados.carregar_clima_mensal(municipio)
+
+@st.cache_resource(max_entries=8)
+def taxas_padronizadas(municipio, nivel, padrao, versao):
+    """
+    Taxas padronizadas por idade de todas as áreas de um nível em todos os anos,
+    calculadas de uma vez (NumPy) e compartilhadas entre sessões (somente leitura).
+    """
+    instrumentacao.marcar_falta('taxas_padronizadas')
+    return acesso_dados.carregar_taxas_padronizadas(nivel, padrao, municipio)
+
+@st.cache_resource(max_entries=4)
+def autocorrelacao_espacial(municipio, versao):
+    """
+    Moran global, LISA e varredura de Kulldorff dos bairros em todos os anos, com as
+    999 réplicas de Monte Carlo de uma vez; trocar de ano só lê o resultado pronto.
+    """
+    instrumentacao.marcar_falta('autocorrelacao_espacial')
+    return acesso_dados.carregar_autocorrelacao_espacial(municipio)
+
+@st.cache_resource
+def obter_cache_figuras():
+    # um único cache por processo, compartilhado por todas as sessões
+    return CacheLRU()
 
 # carrega dados
-dados = carregar_dados_locais()
-df_regioes = dados['df_regioes']
-df_mensal = dados['df_mensal']
-df_perfil = dados['df_perfil']
-df_municipio = dados['df_municipio']
-df_obitos_gerais = dados['df_obitos_gerais']
-df_faixa = dados['df_faixa']
+if not os.path.exists(DB_PATH):
+    st.error(f"Erro: Banco de dados '{DB_FILE}' não encontrado! Execute 'db_local.py' primeiro.")
+    st.stop()
+impressao_digital = acesso_dados.impressao_digital_banco()
+municipios = carregar_municipios(impressao_digital)
 
 # sidebar e filtros
 st.sidebar.title("Painel de Controle")
-anos_disponiveis = ["Todos os Anos"] + sorted(df_regioes['ano'].unique(), reverse=True)
-ano_selecionado = st.sidebar.selectbox("Selecione o ano de análise", options=anos_disponiveis)
+# o seletor só aparece com mais de um município no banco; trocar de município carrega
+# apenas a partição dele (os caches dos outros ficam como estão)
+if len(municipios) > 1:
+    municipio_selecionado = st.sidebar.selectbox(
+        "Município:", options=list(municipios), format_func=municipios.get, key="municipio",
+        index=list(municipios).index(MUNICIPIO_PADRAO) if MUNICIPIO_PADRAO in municipios else 0,
+    )
+else:
+    municipio_selecionado = next(iter(municipios), MUNICIPIO_PADRAO)
+
+with execucao.secao("carregar_dados"):
+    versao_de = versoes_tabelas(impressao_digital, municipio_selecionado)
+    versao_dados = versao_de(*DEPENDENCIAS)
+    dados = carregar_dados_locais(municipio_selecionado, versao_de(*acesso_dados.CONSULTAS_CONTEXTO))
+df_anos = dados['df_anos']
+df_historico = dados['df_historico']
+df_municipio = dados['df_municipio']
+
+anos_disponiveis = ["Todos os Anos"] + df_anos['ano'].tolist()
+ano_selecionado = st.sidebar.selectbox("Selecione o ano de análise", options=anos_disponiveis, key="ano")
 
 # abas
 tabs_list_final = ["📄 RESUMO", "🗺️ Análise Geográfica", "📈 Análise Temporal e de Perfil", "🔬 Análise de Correlação"]
@@ -100,6 +265,60 @@ load_css()
 st.sidebar.markdown("---")
 st.sidebar.header("Navegação")
 pagina_selecionada = st.sidebar.radio("Ir para:", options=tabs_list_final, index=0)
+anos_no_navegador = st.sidebar.toggle(
+    "Trocar o ano dentro dos gráficos",
+    help="Os gráficos que dependem só do ano trazem todos os anos num controle deslizante: "
+         "a troca acontece no navegador, sem recarregar a página.",
+)
+
+cache_figuras = obter_cache_figuras()
+# dados novos do município no banco: figuras e frames derivados da versão anterior
+# dele são descartados (os dos outros municípios continuam válidos)
+cache_figuras.sincronizar_versao(versao_dados, municipio_selecionado)
+
+def figura(nome, construir, seletor=None):
+    """Figura memoizada por (município, versão, ano, página, seletor, nome): construir() só roda na primeira vez."""
+    chave = (municipio_selecionado, versao_dados, ano_selecionado, pagina_selecionada, seletor, nome)
+    return figura_memoizada(cache_figuras, chave, execucao.medir_construcao(nome, construir))
+
+def frame(nome, construir, seletor=None):
+    """DataFrame derivado memoizado com a mesma chave das figuras (somente leitura)."""
+    chave = (municipio_selecionado, versao_dados, ano_selecionado, pagina_selecionada, seletor, nome)
+    return frame_memoizado(cache_figuras, chave, execucao.medir_construcao(nome, construir))
+
+def _emitir(nome, fig, tamanho, **opcoes):
+    inicio = time.perf_counter()
+    with execucao.secao(f"emitir:{nome}"):
+        st.plotly_chart(fig, **opcoes)
+    execucao.registrar_grafico(nome, tamanho, (time.perf_counter() - inicio) * 1000)
+
+def grafico(nome, construir, seletor=None, **opcoes):
+    """Desenha a figura memoizada com st.plotly_chart, medindo construção, envio e bytes."""
+    import plotly.io as pio
+
+    chave = (municipio_selecionado, versao_dados, ano_selecionado, pagina_selecionada, seletor, nome)
+    fig_json = json_figura_memoizada(cache_figuras, chave, execucao.medir_construcao(nome, construir))
+    _emitir(nome, pio.from_json(fig_json), len(fig_json), **opcoes)
+
+def grafico_por_ano(nome, construir, frame_recorte, **opcoes):
+    """
+    Gráfico que depende só do ano: construir(df) recebe o frame `frame_recorte` do recorte.
+
+    Com a troca de ano no navegador ligada, uma única figura traz todos os anos num
+    slider (ver figuras_multiano.py). Ela não depende do filtro, então é montada uma vez
+    e compartilhada entre sessões; o filtro só escolhe o passo que aparece ativo.
+    """
+    if not anos_no_navegador:
+        grafico(nome, lambda: construir(recorte[frame_recorte]), **opcoes)
+        return
+
+    def construir_todos_os_anos():
+        anos = sorted(df_anos['ano'].tolist()) + ["Todos os Anos"]
+        return figura_com_anos({str(ano): construir(carregar_recorte(municipio_selecionado, ano, versao_recorte)[frame_recorte]) for ano in anos})
+
+    chave = (municipio_selecionado, versao_dados, "todos_os_anos", pagina_selecionada, None, nome)
+    fig_json = json_figura_memoizada(cache_figuras, chave, execucao.medir_construcao(nome, construir_todos_os_anos))
+    _emitir(nome, ativar_ano(json.loads(fig_json), str(ano_selecionado)), len(fig_json), **opcoes)
 
 st.sidebar.markdown("---")
 with st.sidebar.expander("📚 Fontes de Dados", expanded=False):
@@ -119,420 +338,110 @@ with st.sidebar.expander("📚 Fontes de Dados", expanded=False):
     </small>
     """, unsafe_allow_html=True)
 
-# Lógica de Filtragem
-if ano_selecionado == "Todos os Anos":
-    periodo_titulo = f"{df_regioes['ano'].min()}-{df_regioes['ano'].max()}"
-    df_perfil_filtrado = df_perfil.sum(numeric_only=True).to_frame().T
-    df_mensal_filtrado = df_mensal.groupby('mes')['casos'].sum().reset_index()
-    df_faixa_filtrada = df_faixa.sum(numeric_only=True).to_frame().T
-    
-    df_regioes_filtrado = df_regioes.groupby('nome_regiao').agg({
-        'casos': 'sum', 'total_populacao': 'first', 'densidade_pop': 'first', 
-        'renda_per_capita': 'first', 'populacao_negra_pct': 'first', 'anos_de_estudo': 'first',
-        'latitude': 'first', 'longitude': 'first'
-    }).reset_index()
-    
-    obitos_gerais_filtrado = df_obitos_gerais['obitos_total'].sum()
-else:
-    periodo_titulo = str(ano_selecionado)
-    df_perfil_filtrado = df_perfil[df_perfil['ano'] == ano_selecionado].copy()
-    df_mensal_filtrado = df_mensal[df_mensal['ano'] == ano_selecionado].copy()
-    df_regioes_filtrado = df_regioes[df_regioes['ano'] == ano_selecionado].copy()
-    df_faixa_filtrada = df_faixa[df_faixa['ano'] == ano_selecionado].copy()
-    
-    obitos_ano_df = df_obitos_gerais[df_obitos_gerais['ano'] == ano_selecionado]
-    obitos_gerais_filtrado = obitos_ano_df['obitos_total'].iloc[0] if not obitos_ano_df.empty else "N/A"
-
-# calculo da taxa de incidencia (casos divididos por populacao vezes 100 mil)
-# proteger contra divisão por zero / NaN
-df_regioes_filtrado['total_populacao'] = df_regioes_filtrado['total_populacao'].replace({0: np.nan})
-df_regioes_filtrado['taxa_incidencia'] = (df_regioes_filtrado['casos'] / df_regioes_filtrado['total_populacao'] * 100000)
-
-st.title(f"🦟 Ribeirão em Dados: Monitoramento da Dengue")
-
-# função de plot de desfechos (reaproveitada)
-def plot_desfechos():
-    # em caso de soma (Todos os Anos) ou ano específico, pegar com segurança
-    try:
-        total_curados = int(df_perfil_filtrado['curados'].iloc[0])
-        total_obitos_dengue = int(df_perfil_filtrado['obitos_dengue'].iloc[0])
-        total_obitos_outros = int(df_perfil_filtrado['obitos_outras_causas'].iloc[0])
-        em_investigacao = int(df_perfil_filtrado['obitos_investigacao'].iloc[0])
-        ign_branco = int(df_perfil_filtrado['ign_branco'].iloc[0])
-    except Exception:
-        total_curados = total_obitos_dengue = total_obitos_outros = em_investigacao = ign_branco = 0
-    
-    dados = {
-        'Situação': ['Cura', 'Óbito Dengue', 'Óbito Outras', 'Em Investigação', 'Ign/Branco'],
-        'Quantidade': [total_curados, total_obitos_dengue, total_obitos_outros, em_investigacao, ign_branco]
-    }
-    
-    cores = {'Cura': '#2ca02c', 'Óbito Dengue': '#d62728', 'Óbito Outras': '#ff7f0e', 'Em Investigação': '#7f7f7f', 'Ign/Branco': '#bcbd22'}
-    
-    fig = px.bar(pd.DataFrame(dados), x='Quantidade', y='Situação', orientation='h', text_auto=True, 
-                  title="Matemática dos Desfechos (Status Final)", color='Situação',
-                  color_discrete_map=cores)
-    fig.update_layout(showlegend=False)
-    return fig
-
-# helper delta html
-def gerar_delta_html(atual, anterior, tipo="ruim"):
-    if anterior == 0 or pd.isna(anterior) or anterior is None:
-        return ""
-    
-    diff = atual - anterior
-    pct = (diff / anterior) * 100 if anterior != 0 else 0
-    symbol = "⬆" if diff > 0 else "⬇"
-    
-    if tipo == "ruim": # Casos/Óbitos: Vermelho se subir
-        color = "#d62728" if diff > 0 else "#2ca02c"
-    else: # Cura: Verde se subir
-        color = "#2ca02c" if diff > 0 else "#d62728"
-        
-    return f'<div class="delta-indicator" style="color: {color}">{symbol} {abs(pct):.1f}% vs. ano anterior</div>'
+# Lógica de Filtragem (busca nas tabelas rollup_* montadas pelo db_local.py)
+with execucao.secao("filtragem"):
+    versao_recorte = versao_de(*acesso_dados.CONSULTAS_RECORTE)
+    recorte = carregar_recorte(municipio_selecionado, ano_selecionado, versao_recorte)
+    df_perfil_filtrado = recorte['df_perfil_filtrado']
+    df_mensal_filtrado = recorte['df_mensal_filtrado']
+    df_faixa_filtrada = recorte['df_faixa_filtrada']
+    df_regioes_filtrado = recorte['df_regioes_filtrado']
+    df_bairros_filtrado = recorte['df_bairros_filtrado']
 
-# -----------------------------------------
-# PÁGINA: RESUMO
-# -----------------------------------------
-if pagina_selecionada == "📄 RESUMO":
-    
-    st.markdown("---")
-    st.header("📄 Resumo e Análise de casos totais" if ano_selecionado == "Todos os Anos" else f"📄 Resumo e Análise: {periodo_titulo}")
-    
-    # Texto explicativo (restaurado do primeiro código)
-    st.markdown("""
-    <div class="explanation-box">
-        <b>O que é este Painel?</b><br>
-        Uma ferramenta de inteligência epidemiológica que analisa a Dengue em Ribeirão Preto, cruzando dados de Saúde com dados Socioeconômicos e Demográficos.
-        <br><br>
-        <b>Objetivo:</b>Este painel busca entender se há correlação entre a incidência de casos de Dengue por bairros de Ribeirão Preto e a presença de fatores de risco socioambientais, como a existência de terrenos baldios, pontos de descarte irregular de lixo e a densidade populacional nos últimos 5 anos.
-    </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown("---")
-    # Dados demográficos exibidos apenas para "Todos os Anos" (mantido)
-    if ano_selecionado == "Todos os Anos":
-        st.subheader("Dados Demográficos (Contexto da Cidade)")
-        pop_censo = df_municipio[df_municipio['indicador'] == 'População Censo 2022']['valor'].iloc[0]
-        pop_estimada = df_municipio[df_municipio['indicador'] == 'População Estimada 2025']['valor'].iloc[0]
-        densidade = df_municipio[df_municipio['indicador'] == 'Densidade Demográfica 2022']['valor'].iloc[0]
-
-        col_pop1, col_pop2, col_pop3 = st.columns(3)
-        with col_pop1: 
-            st.markdown(f'<div class="kpi-card" style="border-left: 5px solid #1f77b4;"><h3>População (Censo 2022)</h3><p style="color:#1f77b4">{int(pop_censo):,}</p></div>'.replace(",", "."), unsafe_allow_html=True)
-        with col_pop2: 
-            st.markdown(f'<div class="kpi-card" style="border-left: 5px solid #ff7f0e;"><h3>População (Estimada 2025)</h3><p style="color:#ff7f0e">{int(pop_estimada):,}</p></div>'.replace(",", "."), unsafe_allow_html=True)
-        with col_pop3: 
-            st.markdown(f'<div class="kpi-card" style="border-left: 5px solid #2ca02c;"><h3>Densidade Demográfica</h3><p style="color:#2ca02c">{densidade:,.2f} hab/km²</p></div>'.replace(",", "."), unsafe_allow_html=True)
-        st.divider()
-
-    # KPIs principais (mantidos)
-    st.subheader(f"Panorama da Dengue: {periodo_titulo}")
-
-    # pega valores com segurança
-    try:
-        total_casos = int(df_perfil_filtrado['casos_total'].iloc[0])
-        total_curados = int(df_perfil_filtrado['curados'].iloc[0])
-        total_obitos_dengue = int(df_perfil_filtrado['obitos_dengue'].iloc[0])
-        total_obitos_outros = int(df_perfil_filtrado['obitos_outras_causas'].iloc[0])
-        ign_branco = int(df_perfil_filtrado['ign_branco'].iloc[0])
-        em_investigacao = int(df_perfil_filtrado['obitos_investigacao'].iloc[0])
-    except Exception:
-        total_casos = total_curados = total_obitos_dengue = total_obitos_outros = ign_branco = em_investigacao = 0
-
-    total_sem_desfecho = ign_branco + em_investigacao
-
-    # calcula delta apenas quando ano específico
-    delta_casos = delta_curados = delta_obitos = ""
-    if ano_selecionado != "Todos os Anos":
-        ano_prev = ano_selecionado - 1
-        df_prev = df_perfil[df_perfil['ano'] == ano_prev]
-        if not df_prev.empty:
-            prev_casos = int(df_prev['casos_total'].iloc[0])
-            prev_curados = int(df_prev['curados'].iloc[0])
-            prev_obitos = int(df_prev['obitos_dengue'].iloc[0])
-            delta_casos = gerar_delta_html(total_casos, prev_casos, "ruim")
-            delta_curados = gerar_delta_html(total_curados, prev_curados, "bom")
-            delta_obitos = gerar_delta_html(total_obitos_dengue, prev_obitos, "ruim")
-
-    c1, c2, c3, c4, c5 = st.columns(5)
-    with c1:
-        st.markdown(f'<div class="kpi-card kpi-notif"><h3>Notificações da Doença</h3><p>{int(total_casos):,}</p>{delta_casos}</div>'.replace(",", "."), unsafe_allow_html=True)
-    with c2:
-        st.markdown(f'<div class="kpi-card kpi-curados"><h3>Curados</h3><p>{int(total_curados):,}</p>{delta_curados}</div>'.replace(",", "."), unsafe_allow_html=True)
-    with c3:
-        st.markdown(f'<div class="kpi-card kpi-obitos"><h3>Óbitos (Dengue)</h3><p>{int(total_obitos_dengue)}</p>{delta_obitos}</div>', unsafe_allow_html=True)
-    with c4:
-        st.markdown(f'<div class="kpi-card kpi-outros"><h3>Óbitos (Outros*)</h3><p>{int(total_obitos_outros)}</p></div>', unsafe_allow_html=True)
-    with c5:
-        st.markdown(f'<div class="kpi-card kpi-neutro"><h3>Sem Desfecho**</h3><p>{int(total_sem_desfecho):,}</p></div>'.replace(",", "."), unsafe_allow_html=True)
-
-    st.caption("*Óbitos de pacientes com dengue confirmados por outras causas. **Soma de Ignorados/Brancos e Óbitos em Investigação.")
-    st.markdown("---")
-    
-    # ----------------------------
-    # HISTÓRICO ANUAL (APENAS TODOS OS ANOS)
-    # ----------------------------
     if ano_selecionado == "Todos os Anos":
-        st.subheader("1. Histórico Anual de Casos (Tendência)")
-        df_hist = df_perfil.groupby('ano')['casos_total'].sum().reset_index()
-        
-        fig_hist = px.line(
-            df_hist, 
-            x='ano', 
-            y='casos_total', 
-            text='casos_total',
-            title="Evolução do Total de Notificações (2020-2024)",
-            markers=True,
-            color_discrete_sequence=['#1f77b4'] 
-        )
-
-        fig_hist.update_traces(
-            textposition="top center", 
-            texttemplate='%{text:,.0f}', 
-            marker=dict(size=12) 
-        )
-        fig_hist.update_layout(
-            xaxis=dict(tickmode='linear', title=dict(text="Ano", font=dict(size=18))), 
-            yaxis=dict(title=dict(text="Número de Casos", font=dict(size=18))), 
-            title=dict(font=dict(size=22)), 
-            font=dict(size=16), 
-            height=500
-        )
-        st.plotly_chart(fig_hist, width='stretch')
-        with st.expander("Análise dos Extremos: Por que a queda em 2021 e o pico em 2024?"):
-            st.markdown("""A variação extrema de casos entre os anos pode ser explicada por fatores **epidemiológicos e climáticos**:
-    
-Queda em 2021 (481 casos):*Principalmente devido à **imunidade populacional** (após o surto de 2020) e ao impacto das medidas de **distanciamento social** e restrições impostas pela pandemia de COVID-19, que indiretamente limitaram a circulação do vírus.
-
-Pico em 2024 (46.531 casos):** Impulsionado pela **reintrodução de novos sorotipos** do vírus (contra os quais a população não tinha defesa) e por **condições climáticas extremas** (altas temperaturas e chuvas irregulares), que favorecem a proliferação acelerada do mosquito *Aedes aegypti*.
-            """)
-        st.markdown("---")
-    # se não for "Todos os Anos", o gráfico não aparece (conforme solicitado)
-
-    # ----------------------------
-    # Incidência Regional (mantido)
-    # ----------------------------
-    st.subheader("2. Incidência Regional (Visualização do Risco Socioeconômico)")
-    st.info("⚠️ **IMPORTANTE:**O gráfico foi dividido em duas partes. A Região Leste foi separada devido ao seu pico extremo, que ofuscava a análise das demais regiões. A Região Leste apresenta uma Taxa de Incidência **muito superior** (aprox. 55.236 / 100k) em relação às demais, sendo o **principal motor** da correlação negativa observada.Esta concentração massiva de casos pode ser um **artefato de classificação/geocodificação** na fonte de dados, onde grande parte dos casos da cidade foram atribuídos a esta macrorregião por padrão. Analisamos o ranking das demais regiões separadamente para maior clareza." )
-
-    st.markdown("---")
-    df_leste = df_regioes_filtrado[df_regioes_filtrado['nome_regiao'] == 'Leste'].copy()
-    df_outras_regioes = df_regioes_filtrado[df_regioes_filtrado['nome_regiao'] != 'Leste'].copy()
+        periodo_titulo = f"{df_anos['ano'].min()}-{df_anos['ano'].max()}"
+    else:
+        periodo_titulo = str(ano_selecionado)
 
-    st.markdown("#### A) Foco no Extremo (Região Leste)")
-    col_le, col_avg = st.columns([2, 1])
+    obitos_gerais_filtrado = df_perfil_filtrado['obitos_gerais'].iloc[0] if not df_perfil_filtrado.empty else None
+    if pd.isna(obitos_gerais_filtrado):
+        obitos_gerais_filtrado = "N/A"
 
-    with col_le:
-        incidencia_media_cidade = df_regioes_filtrado['taxa_incidencia'].mean()
-        val_leste = df_leste['taxa_incidencia'].iloc[0] if not df_leste.empty else 0
-        
-        df_leste_vs_media = pd.DataFrame({
-            'Região': ['Leste', 'Média da Cidade'],
-            'Incidência': [val_leste, incidencia_media_cidade],
-            'Cor': ['Leste', 'Média']
-        })
-        
-        fig_leste = px.bar(
-            df_leste_vs_media, 
-            x='Incidência', 
-            y='Região', 
-            orientation='h', 
-            text='Incidência',
-            title=f"Leste (Extremo) vs. Média Geral ({incidencia_media_cidade:,.0f}/100k)",
-            color='Região',
-            color_discrete_map={'Leste': '#d62728', 'Média da Cidade': '#7f7f7f'}
-        )
-        fig_leste.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-        fig_leste.update_layout(xaxis_title="Incidência / 100 mil hab.", yaxis_title="")
-        st.plotly_chart(fig_leste, width='stretch')
-
-    st.markdown("---")
-    st.markdown("#### B) Ranking de Risco e Renda (Demais Regiões)")
-    st.caption("Observamos que a Região Centro, com renda média/baixa, apresenta a maior incidência, alinhando-se à correlação negativa esperada.No entanto, a Região Norte, a mais pobre de todas, registra a incidência mínima. Este contraste sugere que a incidência da Dengue é um fenômeno multifatorial. Fatores como a Densidade Populacional (muito alta no Centro) ou a circulação viral específica do período podem ter um peso maior na determinação do risco do que a renda isoladamente.")
-
-    df_risco_rank = df_outras_regioes.sort_values('taxa_incidencia', ascending=True)
-
-    fig_risco = px.bar(
-        df_risco_rank,
-        x='taxa_incidencia', 
-        y='nome_regiao',
-        orientation='h',
-        text=df_risco_rank['taxa_incidencia'].round(0).astype(int),
-        title="Correlação: Incidência x Renda (Exceto Leste)",
-        color='renda_per_capita', 
-        color_continuous_scale=px.colors.sequential.Inferno_r,
-    )
-    fig_risco.update_layout(
-        yaxis={'categoryorder':'total ascending', 'title': "Região"}, 
-        xaxis={'title': "Incidência / 100 mil hab."},
-        coloraxis_colorbar=dict(title="Renda Média (R$)"),
-        height=450 
-    ) 
-    fig_risco.update_traces(textposition='outside')
-    st.plotly_chart(fig_risco, width='stretch')
-
-# -----------------------------------------
-# PÁGINA: ANÁLISE GEOGRÁFICA
-# -----------------------------------------
-elif pagina_selecionada == "🗺️ Análise Geográfica":
-    st.markdown("---")
-    st.header(f"🗺️ Análise Geográfica por Regiões ({periodo_titulo})")
-    st.info(
-    "Este mapa representa **pontos geográficos aproximados das regiões**, "
-    "e o tamanho da bolha indica a quantidade de casos. "
-    "As cores representam o indicador selecionado no menu acima."
+if municipio_selecionado == MUNICIPIO_PADRAO:
+    st.title(f"🦟 Ribeirão em Dados: Monitoramento da Dengue")
+else:
+    st.title(f"🦟 Monitoramento da Dengue: {municipios[municipio_selecionado]}")
+
+
+# --- RENDERIZAÇÃO DA PÁGINA SELECIONADA ---
+# cada página mora num módulo próprio (pasta paginas/), importado só quando é visitado
+ctx = paginas.ContextoPagina(
+    ano_selecionado=ano_selecionado,
+    periodo_titulo=periodo_titulo,
+    df_perfil_filtrado=df_perfil_filtrado,
+    df_mensal_filtrado=df_mensal_filtrado,
+    df_faixa_filtrada=df_faixa_filtrada,
+    df_regioes_filtrado=df_regioes_filtrado,
+    df_bairros_filtrado=df_bairros_filtrado,
+    df_historico=df_historico,
+    df_municipio=df_municipio,
+    figura=figura,
+    frame=frame,
+    grafico=grafico,
+    grafico_por_ano=grafico_por_ano,
+    geometria_bairros=lambda: carregar_geometria_bairros(municipio_selecionado, versao_de('geometria_bairros')),
+    series_epi=lambda nivel: carregar_series_epi(municipio_selecionado, nivel, versao_de('series_epi')),
+    canal_endemico=canal_endemico,
+    correlacoes=lambda nivel, variaveis: correlacoes_bootstrap(
+        municipio_selecionado, nivel, ano_selecionado, tuple(variaveis), versao_de('variaveis_correlacao')),
+    taxas_padronizadas=lambda nivel, padrao: taxas_padronizadas(
+        municipio_selecionado, nivel, padrao, versao_de('taxas_padronizadas')),
+    correlacao_clima=lambda nivel: correlacao_clima(
+        municipio_selecionado, nivel, versao_de('series_epi'), versao_de('clima_semanal')),
+    clima_mensal=lambda: clima_mensal(municipio_selecionado, versao_de('clima_mensal')),
+    autocorrelacao_espacial=lambda: autocorrelacao_espacial(
+        municipio_selecionado, versao_de('autocorrelacao_espacial')),
 )
-    
-    # restaurar explicação detalhada do primeiro código
-    st.markdown("""
-    <div class="explanation-box">
-        <b>Objetivo:</b> Identificar onde a doença está mais concentrada.<br>
-        <b>Metodologia:</b> Cruzamos as notificações georreferenciadas por bairro (agrupadas em regiões) com a população do Censo 2022.<br>
-        <b>Cálculos:</b>
-        <ul>
-            <li><b>Taxa de Incidência:</b> (Casos ÷ População) × 100.000. É a medida padrão da OMS para comparar regiões de tamanhos diferentes.</li>
-            <li><b>Cor:</b> Representa a intensidade do indicador (ex: áreas em amarelo maior número e em roxo menor número).</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
-
-    st.markdown("---")
-    # opcoes do seletor de cores do mapa (restaurado)
-    opcoes_cor = {
-        'taxa_incidencia': 'Taxa de Incidência (Casos/100k)',
-        'renda_per_capita': 'Renda Média (R$)',
-    }
-
-    map_color_var = st.selectbox("Colorir mapa por:", list(opcoes_cor.keys()), format_func=lambda x: opcoes_cor[x])
-    
-    # define a escala de cor (verde/azul para social, vermelho para doenca)
-    if map_color_var in ['renda_per_capita', 'taxa_incidencia']:
-        scale = px.colors.sequential.Viridis
-    else:
-        scale = px.colors.sequential.Reds
-        
-    # plota o mapa de bolhas
-    fig_map = px.scatter_map(df_regioes_filtrado, 
-        lat="latitude", lon="longitude",
-        size="casos", color=map_color_var,
-        hover_name="nome_regiao",
-        hover_data={"casos": True, "taxa_incidencia": ":.0f", map_color_var: ':.2f'},
-        color_continuous_scale=scale, size_max=50, zoom=10.5, map_style="carto-positron"
+with execucao.secao("importar_pagina"):
+    pagina = paginas.carregar_pagina(pagina_selecionada)
+with execucao.secao("renderizar_pagina"):
+    pagina.renderizar(ctx)
+
+# tempo até a primeira tela: medido uma vez por sessão (e, na primeira sessão do
+# processo, desde a importação do pacote de páginas, que inclui o boot do worker)
+if 'primeira_renderizacao_ms' not in st.session_state:
+    agora = time.perf_counter()
+    st.session_state['primeira_renderizacao_ms'] = (agora - inicio_execucao) * 1000
+    logger.info(
+        "primeira renderização da sessão (%s): %.0f ms; %.0f ms desde o início do processo",
+        pagina_selecionada, st.session_state['primeira_renderizacao_ms'], (agora - paginas.INICIO_PROCESSO) * 1000,
     )
-    # garante tamanho minimo da bolha para nao sumir
-    fig_map.update_traces(marker=dict(sizemin=8))
-    fig_map.update_layout(uirevision=True) # para garantir que o mapa não “trave” depois do zoom 
-    st.plotly_chart(fig_map, width='stretch')
-
-# -----------------------------------------
-# PÁGINA: ANÁLISE TEMPORAL E DE PERFIL
-# -----------------------------------------
-elif pagina_selecionada == "📈 Análise Temporal e de Perfil":
-    st.markdown("---")
-    st.header("Análise Temporal e de Perfil")
-    
-    # restaurar explicação detalhada do primeiro código na aba temporal
-    st.markdown("""
-    <div class="explanation-box">
-        <b>Objetivo:</b> Entender <i>QUANDO</i> (sazonalidade) e <i>QUEM</i> (perfil demográfico) adoece.<br>
-        <b>Dados Usados:</b> Campos de 'Data de Notificação', 'Sexo' e 'Idade' das fichas do SINAN.<br>
-        <b>Importância:</b> Ajuda a planejar campanhas sazonais (ex: reforço antes de Março) e focar em grupos de risco.
-    </div>
-    """, unsafe_allow_html=True)
 
-    st.markdown("---")
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        st.subheader("Sazonalidade (Meses de Pico)")
-        mapa_meses = {1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun', 7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'}
-        df_mensal_filtrado['mes_nome'] = df_mensal_filtrado['mes'].map(mapa_meses)
-        fig_bar = px.bar(df_mensal_filtrado.sort_values('mes'), y='mes_nome', x='casos', orientation='h', text_auto=True)
-        st.plotly_chart(fig_bar, width='stretch')
-    with col2:
-        st.subheader("Distribuição por Sexo")
-        df_sexo = df_perfil_filtrado[['casos_masculino', 'casos_feminino']].T.reset_index()
-        df_sexo.columns = ['sexo', 'casos']
-        df_sexo['sexo'] = df_sexo['sexo'].str.replace('casos_', '').str.capitalize()
-        fig_pie = px.pie(df_sexo, names='sexo', values='casos', hole=0.4, color_discrete_sequence=['#1f77b4', '#e377c2'])
-        st.plotly_chart(fig_pie, width='stretch')
-
-    st.markdown("---")    
-    st.subheader("Faixa Etária e Desfechos")
-    c_age, c_outcome = st.columns(2)
-    with c_age:
-        if not df_faixa_filtrada.empty:
-            df_faixa_long = df_faixa_filtrada.drop(columns=['ano'], errors='ignore').melt(var_name='Faixa', value_name='Casos')
-            df_faixa_long['Faixa'] = df_faixa_long['Faixa'].str.replace('casos_', '').str.replace('_', ' ').str.title()
-            fig_age = px.bar(df_faixa_long, x='Casos', y='Faixa', orientation='h', text_auto=True, title="Casos por Idade")
-            st.plotly_chart(fig_age, width='stretch')
-    with c_outcome:
-        st.plotly_chart(plot_desfechos(), width='stretch')
-
-# -----------------------------------------
-# PÁGINA: ANÁLISE DE CORRELAÇÃO
-# -----------------------------------------
-elif pagina_selecionada == "🔬 Análise de Correlação":
-    st.markdown("---")
-    st.header("🔬 Laboratório de Correlação (Estudo Ecológico)")
-    
-    
-    # restaurar explicação do primeiro código (breve)
-    st.markdown("""
-    <div class="explanation-box">
-        <b>O que é esta análise?</b><br>
-        Um estudo ecológico que busca associações estatísticas entre o ambiente (bairro) e a doença.<br>
-        <b>Metodologia:</b> Calculamos o Coeficiente de Pearson (r).<br>
-        <b>Como interpretar:</b>
-        <ul>
-            <li><b>Matriz (Heatmap):</b> Cores quentes (azul) indicam que os dados "andam juntos" (ex: Mais Chuva = Mais Dengue). Cores frias (vermelho) indicam o oposto.</li>
-            <li><b>Gráfico de Dispersão (Regressão):</b> Cada ponto é uma região. A linha mostra a tendência. Se a linha sobe, a correlação é positiva.</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
+# com a primeira tela já desenhada, as demais páginas são importadas em segundo plano
+if os.environ.get("RIBEIRAO_AQUECER_PAGINAS", "1") != "0":
+    paginas.aquecer_em_segundo_plano()
 
-    st.markdown("---")
-    cols_analise = {
-        'taxa_incidencia': 'Incidência Dengue',
-        'renda_per_capita': 'Renda Média',
-        'densidade_pop': 'Densidade Pop.'
-    }
-    
-    st.subheader("1. Matriz de Correlação (Visão Geral) (2020 - 2024)")
-    df_corr = df_regioes_filtrado.copy()
-    # tentativa de substituir NaNs se necessário
-    # df_corr['densidade_pop'] = df_corr['densidade_pop'].fillna(0)
-    df_corr = df_corr[list(cols_analise.keys())].rename(columns=cols_analise).corr()
-    fig_heat = px.imshow(df_corr, text_auto=".2f", color_continuous_scale='RdBu_r', zmin=-1, zmax=1, aspect="auto")
-    st.plotly_chart(fig_heat, width='stretch')
-
-    st.divider()
-    
-    st.subheader("2. Detalhe da Regressão (Teste de Hipótese) (2020 - 2024)")
-    eixo_x_selecionado = st.selectbox("Escolha o Fator Social (Eixo X):", options=['renda_per_capita', 'densidade_pop'], format_func=lambda x: cols_analise[x])
-    
-    if len(df_regioes_filtrado) > 1:
-        r = df_regioes_filtrado['taxa_incidencia'].corr(df_regioes_filtrado[eixo_x_selecionado])
-        st.metric("Coeficiente Pearson (r)", f"{r:.2f}")
-        
-        fig_scatter = px.scatter(
-            df_regioes_filtrado, x=eixo_x_selecionado, y='taxa_incidencia',
-            size='total_populacao', color='nome_regiao', hover_name='nome_regiao', size_max=60,
-            trendline='ols',
-            labels={'taxa_incidencia': 'Incidência (Casos/100k)', eixo_x_selecionado: cols_analise[eixo_x_selecionado]}
+# --- MEDIÇÃO DE DESEMPENHO ---
+# registro desta execução vai para o log JSONL; o painel aparece com ?debug=1 na URL
+# (ou RIBEIRAO_PAINEL_DESEMPENHO=1)
+registro = execucao.finalizar(
+    pagina=pagina_selecionada, ano=str(ano_selecionado), cache_figuras=cache_figuras.estatisticas(),
+)
+historico_execucoes = st.session_state.setdefault('historico_execucoes', [])
+historico_execucoes.append(registro)
+del historico_execucoes[:-20]
+
+if st.query_params.get("debug") == "1" or os.environ.get("RIBEIRAO_PAINEL_DESEMPENHO") == "1":
+    with st.sidebar.expander("⏱️ Desempenho", expanded=True):
+        st.caption(f"Sessão {registro['sessao']} · execução nº {registro['rerun']} · {registro['total_ms']:.0f} ms")
+        st.dataframe(
+            pd.DataFrame(sorted(registro['secoes'].items(), key=lambda item: -item[1]), columns=['Seção', 'ms']),
+            hide_index=True, width='stretch',
         )
-        st.plotly_chart(fig_scatter, width='stretch')
-    else:
-        st.warning("Dados insuficientes para gerar regressão.")
-
-    st.markdown("---")
-    st.info("Nota: 'Incidência' é o cálculo de casos por 100 mil habitantes. 'Total de Casos' é o número absoluto de notificações.")
-    st.subheader("Tabela de Dados por Região (2020 - 2024)")
-    df_ranking = df_regioes_filtrado[['nome_regiao','casos', 'taxa_incidencia', eixo_x_selecionado]].sort_values('taxa_incidencia', ascending=False)
-    df_ranking.columns = ['Região', 'Total de Casos', 'Incidência / 100k', cols_analise[eixo_x_selecionado]]
-    df_ranking['Incidência / 100k'] = df_ranking['Incidência / 100k'].round(0).astype('Int64')
-    st.dataframe(df_ranking, use_container_width=True, hide_index=True, column_config={
-            "Incidência / 100k": st.column_config.NumberColumn(format="%.0f"),
-            "Total de Casos": st.column_config.NumberColumn(format="%d")
-        }
-    )
\ No newline at end of file
+        if registro['graficos']:
+            st.dataframe(
+                pd.DataFrame.from_dict(registro['graficos'], orient='index').rename_axis('Gráfico').reset_index(),
+                hide_index=True, width='stretch',
+            )
+        st.caption(
+            f"Figuras/frames desta execução: {registro['cache']['acertos']} acertos, {registro['cache']['faltas']} faltas · "
+            f"{registro['bytes_graficos'] / 1024:.0f} KB em gráficos"
+        )
+        if registro['faltas_recursos']:
+            st.caption("Recarregados nesta execução: " + ", ".join(registro['faltas_recursos']))
+        cache_processo = registro['cache_figuras']
+        st.caption(
+            f"Cache do processo: {cache_processo['itens']} itens, {cache_processo['bytes'] / 1024 / 1024:.1f} MB, "
+            f"{cache_processo['acertos']} acertos / {cache_processo['faltas']} faltas"
+        )
+        st.line_chart(pd.DataFrame({'total (ms)': [r['total_ms'] for r in historico_execucoes]}))
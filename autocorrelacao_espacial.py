@@ -0,0 +1,265 @@
+"""
+Autocorrelação espacial e detecção de aglomerados da incidência por bairro, para
+todos os anos de uma vez.
+
+- I de Moran global e LISA (I de Moran local) sobre a taxa de incidência, com a
+  matriz de vizinhança padronizada por linha (ver vizinhanca.py). A significância é
+  por permutação: no global, os valores trocam de bairro; no local, cada bairro
+  mantém o seu valor e recebe vizinhos sorteados entre os demais (aleatorização
+  condicional). Bairros significativos viram quadrantes AA, BA, BB e AB (alto-alto,
+  baixo-alto...).
+- Varredura espacial de Kulldorff (modelo de Poisson): janelas circulares em torno
+  do centro de cada bairro, crescendo pelos bairros mais próximos até metade da
+  população. O aglomerado mais provável é a janela de maior razão de
+  verossimilhança, e o p-valor vem de Monte Carlo: os casos do ano são redistribuídos
+  entre os bairros proporcionalmente à população e a maior razão de cada réplica
+  forma a distribuição nula. Aglomerados secundários são as melhores janelas que não
+  se sobrepõem às já escolhidas.
+
+As réplicas são geradas em lote: uma matriz de índices sorteados serve a todos os
+bairros e a todos os anos, e as somas por janela saem de um cumsum. Os blocos rodam
+no pool de threads compartilhado (paralelo.py), com sementes independentes e
+reprodutíveis.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from geometria_bairros import KM_POR_GRAU
+from paralelo import executor_numpy
+
+REPLICAS = 999
+SEMENTE = 20240101
+NIVEL_SIGNIFICANCIA = 0.05
+# teto da janela da varredura, em fração da população (o padrão do SaTScan)
+FRACAO_MAXIMA_POPULACAO = 0.5
+AGLOMERADOS_MAXIMOS = 5
+# elementos (float64) por bloco de réplicas: limita a memória de cada thread
+ELEMENTOS_POR_BLOCO = 4_000_000
+
+# quadrantes do LISA (0 = não significativo)
+QUADRANTES = {1: "Alto-Alto", 2: "Baixo-Alto", 3: "Baixo-Baixo", 4: "Alto-Baixo"}
+
+
+@dataclass(frozen=True)
+class Aglomerado:
+    """Janela da varredura: bairros (do centro para fora), casos observados e esperados."""
+    centro: str
+    areas: tuple
+    casos: int
+    esperados: float
+    risco_relativo: float
+    razao_verossimilhanca: float
+    p_valor: float
+
+
+@dataclass(frozen=True)
+class AutocorrelacaoEspacial:
+    """Arrays (ano, bairro) na ordem de `anos` e `areas`; os aglomerados são uma tupla por ano."""
+    areas: tuple
+    anos: tuple
+    moran: np.ndarray
+    moran_p: np.ndarray
+    lisa: np.ndarray
+    lisa_p: np.ndarray
+    quadrante: np.ndarray
+    aglomerados: tuple
+    replicas: int
+
+    @property
+    def moran_esperado(self):
+        return -1 / (len(self.areas) - 1)
+
+    def do_ano(self, ano):
+        return self.anos.index(ano)
+
+
+def _centrar(taxas):
+    # anos sem variação (nenhum caso) ficam com desvio zero: I indefinido
+    z = taxas - taxas.mean(axis=1, keepdims=True)
+    m2 = (z ** 2).mean(axis=1, keepdims=True)
+    return z, np.where(m2 > 0, m2, np.nan)
+
+
+def _tamanho_bloco(elementos_por_replica, replicas):
+    return int(np.clip(ELEMENTOS_POR_BLOCO // max(elementos_por_replica, 1), 1, replicas))
+
+
+def _p_valor(acima, abaixo, replicas):
+    """
+    (réplicas na cauda do observado + 1) / (réplicas + 1), com `acima` e `abaixo` as
+    réplicas >= e <= o observado (empates contam nas duas caudas: valor constante dá 1).
+    """
+    return (np.minimum(acima, abaixo) + 1) / (replicas + 1)
+
+
+def _janelas(latitude, longitude, populacao, fracao_maxima):
+    """
+    (ordem, valida): `ordem[i]` são os bairros por distância ao centro de i, e
+    `valida[i, k]` diz se a janela com os k + 1 primeiros cabe no teto de população.
+    """
+    escala = np.cos(np.radians(np.mean(latitude)))
+    x, y = longitude * KM_POR_GRAU * escala, latitude * KM_POR_GRAU
+    distancia = np.hypot(x[:, None] - x[None], y[:, None] - y[None])
+    ordem = np.argsort(distancia, axis=1, kind="stable")
+    valida = np.cumsum(populacao[ordem], axis=1) <= fracao_maxima * populacao.sum()
+    valida[:, 0] = True  # um bairro sozinho é sempre uma janela
+    return ordem, valida
+
+
+def _razao_verossimilhanca(casos_janela, fracao_janela, total):
+    """
+    Log da razão de verossimilhança de Poisson de cada janela, com os esperados =
+    fração da população na janela × total de casos (só excesso de risco; 0 no resto).
+    """
+    total = np.asarray(total, dtype=np.float64)[..., None, None]
+    esperados_janela = fracao_janela * total
+    fora = total - casos_janela
+    with np.errstate(divide="ignore", invalid="ignore"):
+        llr = (
+            casos_janela * np.log(casos_janela / esperados_janela)
+            + np.where(fora > 0, fora * np.log(fora / (total - esperados_janela)), 0.0)
+        )
+    return np.where((casos_janela > esperados_janela) & (casos_janela > 0), llr, 0.0)
+
+
+def _maximo_varredura(casos, ordem, valida, fracao_janela, total):
+    """Maior razão de verossimilhança entre as janelas válidas: casos (..., n) -> (...)."""
+    casos_janela = np.cumsum(casos[..., ordem], axis=-1)
+    llr = _razao_verossimilhanca(casos_janela, fracao_janela, total)
+    return np.where(valida, llr, 0.0).max(axis=(-2, -1))
+
+
+def _bloco(dados, semente, tamanho):
+    """
+    Réplicas de um bloco: I global das permutações (tamanho, ano), contagens de LISA
+    simulados >= e <= o observado (ano, bairro) e o máximo da varredura de cada
+    réplica (tamanho, ano).
+    """
+    z, m2, lisa, vizinhanca, casos_ano, probabilidade, ordem, valida, fracao_janela = dados
+    gerador = np.random.default_rng(semente)
+    n = z.shape[1]
+
+    # global: permutação dos valores entre os bairros
+    permutacoes = gerador.permuted(np.broadcast_to(np.arange(n), (tamanho, n)), axis=1)
+    zp = z[:, permutacoes]                                       # (ano, réplica, bairro)
+    moran = (zp * vizinhanca.defasagem(zp)).mean(axis=-1) / m2
+
+    # local: cada bairro i recebe k_i vizinhos sorteados entre os outros n - 1; a mesma
+    # matriz de sorteios serve a todos, pulando o próprio i
+    k = vizinhanca.numero_vizinhos
+    kmax = int(k.max())
+    sorteio = gerador.permuted(np.broadcast_to(np.arange(n - 1), (tamanho, n - 1)), axis=1)[:, :kmax]
+    indices = sorteio[None] + (sorteio[None] >= np.arange(n)[:, None, None])  # (bairro, réplica, kmax)
+    usado = np.arange(kmax) < k[:, None, None]
+    defasagem = np.where(usado, z[:, indices], 0.0).sum(axis=-1) / np.maximum(k, 1)[:, None]
+    lisa_simulado = z[..., None] * defasagem / m2[..., None]    # (ano, bairro, réplica)
+    acima = (lisa_simulado >= lisa[..., None]).sum(axis=-1)
+    abaixo = (lisa_simulado <= lisa[..., None]).sum(axis=-1)
+
+    # varredura: casos do ano distribuídos pela população
+    simulados = gerador.multinomial(casos_ano, probabilidade, size=(tamanho, len(casos_ano)))
+    maximos = _maximo_varredura(simulados.astype(np.float64), ordem, valida, fracao_janela, casos_ano[None])
+    return moran.T, (acima, abaixo), maximos
+
+
+def _aglomerados(casos, fracao_janela, total, ordem, valida, maximos_nulos, areas):
+    """Aglomerado mais provável e secundários (sem sobreposição) de um ano."""
+    if total <= 0:
+        return ()
+    casos_janela = np.cumsum(casos[ordem], axis=-1)
+    llr = np.where(valida, _razao_verossimilhanca(casos_janela, fracao_janela, total), 0.0)
+    candidatos = np.flatnonzero(llr.ravel() > 0)
+    candidatos = candidatos[np.argsort(-llr.ravel()[candidatos], kind="stable")]
+    usado = np.zeros(len(areas), dtype=bool)
+    escolhidos = []
+    for indice in candidatos:
+        centro, tamanho = divmod(int(indice), ordem.shape[1])
+        membros = ordem[centro, :tamanho + 1]
+        if usado[membros].any():
+            continue
+        usado[membros] = True
+        observados, esperados = casos_janela[centro, tamanho], fracao_janela[centro, tamanho] * total
+        # p-valor contra o máximo de cada réplica (conservador para os secundários)
+        p_valor = (np.count_nonzero(maximos_nulos >= llr[centro, tamanho] - 1e-9) + 1) / (len(maximos_nulos) + 1)
+        escolhidos.append(Aglomerado(
+            centro=areas[centro],
+            areas=tuple(areas[m] for m in membros),
+            casos=int(observados),
+            esperados=float(esperados),
+            risco_relativo=float((observados / esperados) / ((total - observados) / (total - esperados)))
+            if total > observados else float("inf"),
+            razao_verossimilhanca=float(llr[centro, tamanho]),
+            p_valor=float(p_valor),
+        ))
+        if len(escolhidos) == AGLOMERADOS_MAXIMOS:
+            break
+    return tuple(escolhidos)
+
+
+def analisar(casos, populacao, areas, anos, vizinhanca, latitude, longitude,
+             replicas=REPLICAS, semente=SEMENTE, fracao_maxima=FRACAO_MAXIMA_POPULACAO):
+    """
+    AutocorrelacaoEspacial da incidência dos bairros em todos os `anos`.
+
+    `casos` é (ano, bairro), `populacao`, `latitude` e `longitude` são por bairro, e
+    `vizinhanca` (Vizinhanca) segue a ordem de `areas`. Só bairros com população
+    entram (os demais devem vir filtrados). Os p-valores são de pseudo-significância
+    (réplicas ao menos tão extremas + 1) / (réplicas + 1), na cauda do observado.
+    """
+    casos = np.asarray(casos, dtype=np.float64)
+    populacao = np.asarray(populacao, dtype=np.float64)
+    n = len(areas)
+
+    z, m2 = _centrar(casos / populacao * 100_000)
+    with np.errstate(invalid="ignore"):
+        lisa = z * vizinhanca.defasagem(z) / m2
+        moran = lisa.mean(axis=1)
+    total = casos.sum(axis=1)
+    probabilidade = populacao / populacao.sum()
+    ordem, valida = _janelas(np.asarray(latitude, dtype=np.float64), np.asarray(longitude, dtype=np.float64),
+                             populacao, fracao_maxima)
+    fracao_janela = np.cumsum(probabilidade[ordem], axis=1)  # fração da população em cada janela
+
+    # maior array por réplica: o LISA simulado (ano x bairro x kmax) ou a varredura (ano x n x n)
+    por_replica = len(anos) * n * max(int(vizinhanca.numero_vizinhos.max()), n)
+    tamanho = _tamanho_bloco(por_replica, replicas)
+    tamanhos = [tamanho] * (replicas // tamanho) + ([replicas % tamanho] if replicas % tamanho else [])
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    dados = (z, m2, lisa, vizinhanca, total.astype(np.int64), probabilidade, ordem, valida, fracao_janela)
+    if len(tamanhos) > 1:
+        blocos = list(executor_numpy().map(_bloco, [dados] * len(tamanhos), sementes, tamanhos))
+    else:
+        blocos = [_bloco(dados, sementes[0], tamanhos[0])]
+    moran_nulo = np.concatenate([b[0] for b in blocos])          # (réplica, ano)
+    lisa_acima = sum(b[1][0] for b in blocos)
+    lisa_abaixo = sum(b[1][1] for b in blocos)
+    maximos_nulos = np.concatenate([b[2] for b in blocos])       # (réplica, ano)
+
+    # pseudo p-valor unilateral, na cauda em que o observado caiu
+    moran_p = _p_valor((moran_nulo >= moran).sum(axis=0), (moran_nulo <= moran).sum(axis=0), replicas)
+    moran_p = np.where(np.isfinite(moran), moran_p, np.nan)
+    # bairro sem vizinhos não tem LISA
+    lisa_p = _p_valor(lisa_acima, lisa_abaixo, replicas)
+    lisa_p = np.where(np.isfinite(lisa) & (vizinhanca.numero_vizinhos > 0), lisa_p, np.nan)
+
+    alto, vizinhos_altos = z > 0, vizinhanca.defasagem(z) > 0
+    quadrante = np.select(
+        [alto & vizinhos_altos, ~alto & vizinhos_altos, ~alto & ~vizinhos_altos, alto & ~vizinhos_altos], [1, 2, 3, 4],
+    ).astype(np.int8)
+    quadrante[~(lisa_p <= NIVEL_SIGNIFICANCIA)] = 0
+
+    return AutocorrelacaoEspacial(
+        areas=tuple(areas),
+        anos=tuple(anos),
+        moran=moran,
+        moran_p=moran_p,
+        lisa=lisa,
+        lisa_p=lisa_p,
+        quadrante=quadrante,
+        aglomerados=tuple(
+            _aglomerados(casos[j], fracao_janela, total[j], ordem, valida, maximos_nulos[:, j], areas)
+            for j in range(len(anos))
+        ),
+        replicas=replicas,
+    )
@@ -0,0 +1,341 @@
+"""
+Benchmark das páginas do dashboard, sem navegador (streamlit.testing.AppTest).
+
+Renderiza cada página para cada ano do filtro e cada opção dos seletores da página
+(cor do mapa, eixo X da correlação) e mede tempo de parede, pico de memória Python e
+tamanho do JSON das figuras Plotly enviadas ao navegador. Roda sobre os dados atuais
+e sobre cópias sintéticas ampliadas (10x, 100x, 1000x linhas em
+casos_dengue_regiao_anual e casos_dengue_mensal), e grava tudo em JSON.
+
+Uso:
+    python benchmark_paginas.py                        # escalas 1, 10, 100 e 1000
+    python benchmark_paginas.py --escalas 1 100 --saida resultado.json
+    python benchmark_paginas.py --base resultado_anterior.json --tolerancia 0.25
+
+Com --base, o script compara as medianas com um resultado anterior e termina com
+código 1 se alguma página ficou mais lenta que a tolerância.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(RAIZ, "app.py")
+DADOS_ORIGEM = os.path.join(RAIZ, "data")
+ESCALAS_PADRAO = (1, 10, 100, 1000)
+SAIDA_PADRAO = "benchmark_paginas.json"
+TIMEOUT_RENDER = 120  # segundos por execução do script no AppTest
+
+
+# --- DADOS SINTÉTICOS ---
+
+def _sequencia(n):
+    return f"WITH RECURSIVE seq(k) AS (SELECT 1 UNION ALL SELECT k + 1 FROM seq WHERE k < {n - 1})"
+
+
+def ampliar_banco(caminho, fator):
+    """
+    Multiplica por `fator` as linhas de casos_dengue_regiao_anual e casos_dengue_mensal
+    e refaz as tabelas rollup_* e as versões dos municípios ampliados.
+
+    - Regiões: cada região ganha fator-1 cópias ("Leste #k") em todos os anos, com casos
+      variados e a mesma linha de censo/geometria da original (coordenadas deslocadas),
+      sempre no município da original.
+      É o que aumenta o que as páginas de fato desenham (mapa, dispersão, ranking).
+    - Mensal: (cod_municipio, ano, mes) é único, então as cópias viram blocos de anos
+      sintéticos negativos, contados a partir dos anos de cada município (nunca colidem
+      com ANO_TODOS = 0). Não entram no seletor de anos (que vem das regiões), mas pesam
+      na montagem dos rollups e na soma de "Todos os Anos".
+    """
+    from db_local import construir_rollups, registrar_versoes
+
+    if fator <= 1:
+        return
+    conn = sqlite3.connect(caminho, isolation_level=None)
+    conn.execute("BEGIN")
+    municipios = [cod for (cod,) in conn.execute("""
+    SELECT cod_municipio FROM casos_dengue_regiao_anual UNION SELECT cod_municipio FROM casos_dengue_mensal
+    """)]
+    conn.execute("""
+    CREATE TEMP TABLE regioes_originais AS
+    SELECT DISTINCT cod_municipio, nome_regiao FROM casos_dengue_regiao_anual
+    """)
+    conn.execute(f"""
+    INSERT INTO casos_dengue_regiao_anual (cod_municipio, ano, nome_regiao, casos)
+    {_sequencia(fator)}
+    SELECT r.cod_municipio, r.ano, r.nome_regiao || ' #' || seq.k,
+           CAST(r.casos * (0.5 + ((seq.k * 7919 + r.ano * 104729) % 1000) / 1000.0) AS INTEGER)
+    FROM casos_dengue_regiao_anual r CROSS JOIN seq
+    """)
+    for tabela, chave in (("censo_2022", "regiao"), ("censo_2010", "regiao")):
+        colunas = [
+            linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})")
+            if linha[1] not in ("cod_municipio", chave)
+        ]
+        conn.execute(f"""
+        INSERT INTO {tabela} (cod_municipio, {chave}, {", ".join(colunas)})
+        {_sequencia(fator)}
+        SELECT t.cod_municipio, t.{chave} || ' #' || seq.k, {", ".join(f"t.{c}" for c in colunas)}
+        FROM {tabela} t
+        JOIN temp.regioes_originais o ON o.cod_municipio = t.cod_municipio AND o.nome_regiao = t.{chave}
+        CROSS JOIN seq
+        """)
+    conn.execute(f"""
+    INSERT INTO regioes_geometria (cod_municipio, nome_regiao, latitude, longitude)
+    {_sequencia(fator)}
+    SELECT g.cod_municipio, g.nome_regiao || ' #' || seq.k,
+           g.latitude + ((seq.k * 37) % 200 - 100) * 0.0002,
+           g.longitude + ((seq.k * 53) % 200 - 100) * 0.0002
+    FROM regioes_geometria g CROSS JOIN seq
+    """)
+    conn.execute(f"""
+    INSERT INTO casos_dengue_mensal (cod_municipio, ano, mes, casos)
+    {_sequencia(fator)}
+    SELECT m.cod_municipio, -(seq.k * (f.ultimo - f.primeiro + 1) + m.ano - f.primeiro), m.mes, m.casos
+    FROM casos_dengue_mensal m
+    JOIN (
+        SELECT cod_municipio, MIN(ano) AS primeiro, MAX(ano) AS ultimo FROM casos_dengue_mensal GROUP BY cod_municipio
+    ) f ON f.cod_municipio = m.cod_municipio
+    CROSS JOIN seq
+    """)
+    conn.execute("DROP TABLE temp.regioes_originais")
+    construir_rollups(conn, municipios)
+    registrar_versoes(conn.cursor(), municipios=municipios)
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def preparar_diretorio(fator, raiz_temporaria):
+    """
+    Monta um diretório de trabalho com data/db_local.db (ampliado) e o snapshot
+    colunar correspondente; os demais arquivos de data/ entram como links.
+    """
+    from snapshot_colunar import exportar_snapshot
+
+    trabalho = os.path.join(raiz_temporaria, f"escala_{fator}")
+    dados = os.path.join(trabalho, "data")
+    os.makedirs(dados)
+    for nome in os.listdir(DADOS_ORIGEM):
+        if nome.startswith("db_local") or nome == "snapshot":
+            continue
+        os.symlink(os.path.join(DADOS_ORIGEM, nome), os.path.join(dados, nome))
+    # mesma configuração do Streamlit e mesmos arquivos estáticos do projeto
+    for nome in (".streamlit", "static"):
+        if os.path.exists(os.path.join(RAIZ, nome)):
+            os.symlink(os.path.join(RAIZ, nome), os.path.join(trabalho, nome))
+
+    destino = os.path.join(dados, "db_local.db")
+    origem = sqlite3.connect(f"file:{os.path.join(DADOS_ORIGEM, 'db_local.db')}?mode=ro", uri=True)
+    copia = sqlite3.connect(destino)
+    origem.backup(copia)
+    origem.close()
+    copia.close()
+
+    ampliar_banco(destino, fator)
+    exportar_snapshot(destino, diretorio=os.path.join(dados, "snapshot"))
+    conn = sqlite3.connect(destino)
+    linhas = {
+        tabela: conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+        for tabela in ("casos_dengue_regiao_anual", "casos_dengue_mensal", "rollup_regioes", "rollup_mensal")
+    }
+    conn.close()
+    return trabalho, linhas
+
+
+# --- MEDIÇÃO (roda num subprocesso por escala, com o diretório ampliado como cwd) ---
+
+def _bytes_figuras(at):
+    specs = [len(elemento.proto.spec) for elemento in at.get("plotly_chart")]
+    return len(specs), sum(specs)
+
+
+def _medir(at, timeout=TIMEOUT_RENDER):
+    erro = None
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    inicio = time.perf_counter()
+    try:
+        at.run(timeout=timeout)
+    except RuntimeError as exc:  # estouro do timeout do AppTest: registra e segue
+        erro = str(exc)
+    tempo_ms = (time.perf_counter() - inicio) * 1000
+    pico = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+    n_figuras, bytes_figuras = _bytes_figuras(at)
+    if erro is None and at.exception:
+        erro = at.exception[0].message
+    return {
+        'tempo_ms': round(tempo_ms, 2),
+        'pico_memoria_kb': None if pico is None else round(pico / 1024, 1),
+        'figuras': n_figuras,
+        'bytes_figuras': bytes_figuras,
+        'erro': erro,
+    }
+
+
+def _seletor(at, tipo, rotulo):
+    # os widgets são recriados a cada execução: busca de novo pelo rótulo
+    return next(w for w in getattr(at.main, tipo) if w.label == rotulo)
+
+
+def _escolher(widget, indice):
+    # radio não tem select_index; sem format_func, a opção exibida é o próprio valor
+    if hasattr(widget, "select_index"):
+        widget.select_index(indice)
+    else:
+        widget.set_value(widget.options[indice])
+
+
+def executar_medicoes(timeout=TIMEOUT_RENDER, memoria=True):
+    """
+    Percorre páginas x anos x opções dos seletores e devolve uma linha por renderização.
+    O pico de memória vem do tracemalloc, que deixa o Python mais lento: com
+    memoria=False os tempos ficam mais próximos dos de produção.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    if memoria:
+        tracemalloc.start()
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    primeira = _medir(at, timeout)
+    medicoes = [{'pagina': None, 'ano': None, 'seletor': None, 'opcao': None, 'fase': 'inicial', **primeira}]
+
+    paginas = at.sidebar.radio[0].options
+    anos = at.sidebar.selectbox(key="ano").options
+    for pagina in paginas:
+        for i_ano, ano in enumerate(anos):
+            at.sidebar.selectbox(key="ano").select_index(i_ano)
+            at.sidebar.radio[0].set_value(pagina)
+            medicoes.append({'pagina': pagina, 'ano': ano, 'seletor': None, 'opcao': None, 'fase': 'filtro', **_medir(at, timeout)})
+            # seletores da própria página (selectbox e radio): cada opção além da primeira
+            for tipo in ("selectbox", "radio"):
+                for rotulo, opcoes in [(w.label, w.options) for w in getattr(at.main, tipo)]:
+                    for i_opcao, opcao in enumerate(opcoes[1:], start=1):
+                        _escolher(_seletor(at, tipo, rotulo), i_opcao)
+                        medicoes.append({'pagina': pagina, 'ano': ano, 'seletor': rotulo, 'opcao': opcao, 'fase': 'seletor', **_medir(at, timeout)})
+                    _escolher(_seletor(at, tipo, rotulo), 0)
+    return medicoes
+
+
+# --- ORQUESTRAÇÃO ---
+
+def _resumo(medicoes):
+    """Mediana, máximo e figuras por (escala, página), ignorando a execução inicial."""
+    grupos = {}
+    for m in medicoes:
+        if m['fase'] == 'inicial' or m['erro']:
+            continue
+        grupos.setdefault(f"{m['escala']}|{m['pagina']}", []).append(m)
+    resumo = {}
+    for chave, linhas in grupos.items():
+        tempos = [linha['tempo_ms'] for linha in linhas]
+        resumo[chave] = {
+            'renderizacoes': len(linhas),
+            'tempo_mediano_ms': round(statistics.median(tempos), 2),
+            'tempo_max_ms': max(tempos),
+            'pico_memoria_max_kb': max((linha['pico_memoria_kb'] or 0) for linha in linhas),
+            'bytes_figuras_max': max(linha['bytes_figuras'] for linha in linhas),
+        }
+    return resumo
+
+
+def comparar(resultado, base, tolerancia):
+    """Lista as (escala, página) cuja mediana piorou além da tolerância em relação à base."""
+    regressoes = []
+    for chave, atual in resultado['resumo'].items():
+        anterior = base.get('resumo', {}).get(chave)
+        if anterior is None or anterior['tempo_mediano_ms'] <= 0:
+            continue
+        variacao = atual['tempo_mediano_ms'] / anterior['tempo_mediano_ms'] - 1
+        if variacao > tolerancia:
+            regressoes.append((chave, anterior['tempo_mediano_ms'], atual['tempo_mediano_ms'], variacao))
+    return regressoes
+
+
+def executar_benchmark(escalas=ESCALAS_PADRAO, manter=False, timeout=TIMEOUT_RENDER, memoria=True):
+    raiz_temporaria = tempfile.mkdtemp(prefix="benchmark_paginas_")
+    resultado = {
+        'gerado_em': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'memoria_medida': memoria,
+        'escalas': {},
+        'medicoes': [],
+    }
+    try:
+        for fator in escalas:
+            inicio = time.perf_counter()
+            trabalho, linhas = preparar_diretorio(fator, raiz_temporaria)
+            preparo_s = time.perf_counter() - inicio
+            print(f"escala {fator}x: {linhas} (preparo em {preparo_s:.1f} s)")
+
+            # subprocesso por escala: caches do Streamlit, conexões e memória começam do zero
+            processo = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--medir", "--timeout", str(timeout)]
+                + ([] if memoria else ["--sem-memoria"]),
+                cwd=trabalho, capture_output=True, text=True,
+                env={**os.environ, "RIBEIRAO_AQUECER_PAGINAS": "0", "PYTHONPATH": RAIZ},
+            )
+            if processo.returncode != 0:
+                raise RuntimeError(f"medição da escala {fator}x falhou:\n{processo.stderr[-2000:]}")
+            medicoes = json.loads(processo.stdout.strip().splitlines()[-1])
+            erros = [m for m in medicoes if m['erro']]
+            print(f"  {len(medicoes)} renderizações, {len(erros)} com erro")
+            resultado['escalas'][str(fator)] = {'linhas': linhas, 'preparo_s': round(preparo_s, 2)}
+            resultado['medicoes'] += [{'escala': fator, **m} for m in medicoes]
+    finally:
+        if manter:
+            print(f"diretórios de trabalho mantidos em {raiz_temporaria}")
+        else:
+            shutil.rmtree(raiz_temporaria, ignore_errors=True)
+    resultado['resumo'] = _resumo(resultado['medicoes'])
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das páginas do dashboard (AppTest, sem navegador).")
+    parser.add_argument("--escalas", nargs="+", type=int, default=list(ESCALAS_PADRAO),
+                        help="fatores de ampliação dos dados (1 = dados atuais)")
+    parser.add_argument("--saida", default=SAIDA_PADRAO, help="arquivo JSON de resultado")
+    parser.add_argument("--base", help="resultado anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="piora máxima aceita na mediana (0.25 = 25%%)")
+    parser.add_argument("--timeout", type=int, default=TIMEOUT_RENDER,
+                        help="limite em segundos por renderização (estouros viram erro no resultado)")
+    parser.add_argument("--sem-memoria", action="store_true",
+                        help="não mede o pico de memória (tempos sem o custo do tracemalloc)")
+    parser.add_argument("--manter", action="store_true", help="não apaga os bancos ampliados")
+    parser.add_argument("--medir", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(executar_medicoes(args.timeout, not args.sem_memoria), ensure_ascii=False))
+        return
+
+    resultado = executar_benchmark(args.escalas, args.manter, args.timeout, not args.sem_memoria)
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f"resultado gravado em {args.saida}")
+    for chave, linha in sorted(resultado['resumo'].items()):
+        print(f"  {chave}: mediana {linha['tempo_mediano_ms']:.0f} ms, "
+              f"máx {linha['tempo_max_ms']:.0f} ms, figuras até {linha['bytes_figuras_max'] / 1024:.0f} KB")
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultado, json.load(arquivo), args.tolerancia)
+        for chave, antes, depois, variacao in regressoes:
+            print(f"REGRESSÃO {chave}: {antes:.0f} ms -> {depois:.0f} ms (+{variacao:.0%})")
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
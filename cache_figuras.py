@@ -0,0 +1,128 @@
+import threading
+from collections import OrderedDict
+
+# limites padrão do cache compartilhado entre todas as sessões do processo
+MAX_ITENS = 512
+MAX_BYTES = 128 * 1024 * 1024
+
+
+class CacheLRU:
+    """
+    Cache LRU thread-safe, limitado por número de itens e por bytes.
+
+    Pensado para ser um só por processo (via st.cache_resource) e compartilhado entre
+    sessões: quando duas sessões pedem a mesma chave ao mesmo tempo, só uma constrói
+    o valor e a outra espera por ele.
+    """
+
+    def __init__(self, max_itens=MAX_ITENS, max_bytes=MAX_BYTES):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self._itens = OrderedDict()  # chave -> (valor, tamanho)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._construindo = {}  # chave -> Lock da construção em andamento
+        self.acertos = 0
+        self.faltas = 0
+        self.versoes = {}  # partição (ex.: município) -> versão dos dados dos itens guardados
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.faltas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[0]
+
+    def guardar(self, chave, valor, tamanho=0):
+        with self._lock:
+            antigo = self._itens.pop(chave, None)
+            if antigo is not None:
+                self._bytes -= antigo[1]
+            self._itens[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            while self._itens and (len(self._itens) > self.max_itens or self._bytes > self.max_bytes):
+                _, (_, tamanho_removido) = self._itens.popitem(last=False)
+                self._bytes -= tamanho_removido
+
+    def obter_ou_construir(self, chave, construir, medir=lambda valor: 0):
+        """
+        Devolve o valor da chave; na falta, chama construir() uma única vez mesmo
+        com várias sessões pedindo a mesma chave em paralelo.
+        """
+        valor = self.obter(chave)
+        if valor is not None:
+            return valor
+
+        with self._lock:
+            trava = self._construindo.setdefault(chave, threading.Lock())
+        with trava:
+            # outra sessão pode ter terminado a construção enquanto esperávamos
+            with self._lock:
+                item = self._itens.get(chave)
+            if item is not None:
+                return item[0]
+            try:
+                valor = construir()
+                self.guardar(chave, valor, medir(valor))
+            finally:
+                with self._lock:
+                    self._construindo.pop(chave, None)
+        return valor
+
+    def sincronizar_versao(self, versao, particao=None):
+        """
+        Descarta os itens da partição quando a versão dos dados dela muda (itens antigos
+        nunca mais seriam lidos). As chaves de uma partição começam por ela (chave[0]);
+        as das outras partições ficam. Sem partição, vale para o cache inteiro.
+        """
+        with self._lock:
+            if self.versoes.get(particao) == versao:
+                return
+            self.versoes[particao] = versao
+            if particao is None:
+                self._itens.clear()
+                self._bytes = 0
+                return
+            for chave in [c for c in self._itens if c[0] == particao]:
+                _, tamanho = self._itens.pop(chave)
+                self._bytes -= tamanho
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'itens': len(self._itens), 'bytes': self._bytes,
+                'acertos': self.acertos, 'faltas': self.faltas,
+            }
+
+
+def json_figura_memoizada(cache, chave, construir):
+    """JSON da figura Plotly da chave (o que de fato é guardado), construindo-a só na primeira vez."""
+    return cache.obter_ou_construir(chave, lambda: construir().to_json(), medir=len)
+
+
+def figura_memoizada(cache, chave, construir):
+    """
+    Devolve a figura Plotly da chave, construindo-a só na primeira vez.
+
+    O cache guarda o JSON da figura (imutável e com tamanho conhecido), não o objeto:
+    cada chamada recebe uma figura nova e pode alterá-la sem afetar outras sessões.
+    """
+    import plotly.io as pio  # importado só quando alguma página desenha uma figura
+
+    return pio.from_json(json_figura_memoizada(cache, chave, construir))
+
+
+def frame_memoizado(cache, chave, construir):
+    """
+    Devolve o DataFrame derivado da chave, construindo-o só na primeira vez.
+    O frame é compartilhado entre sessões: trate-o como somente leitura.
+    """
+    return cache.obter_ou_construir(chave, construir, medir=lambda df: int(df.memory_usage(deep=True).sum()))
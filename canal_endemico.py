@@ -0,0 +1,188 @@
+"""
+Canal endêmico (diagrama de controle) e alertas de surto por área.
+
+Para cada área e semana epidemiológica, os limiares saem da taxa semanal da mesma SE
+nos ANOS_BASE anos anteriores: quartis (Q1, mediana, Q3) ou média ± 2 desvios-padrão.
+A semana atual cai numa das zonas do diagrama (êxito, segurança, alerta, epidemia).
+
+Tudo é calculado sobre um cubo áreas x anos x 53 semanas: as janelas de anos
+anteriores de todos os anos, áreas e semanas saem de uma indexação só, e os quartis de
+uma ordenação ao longo do eixo da janela (sem np.nanpercentile, que percorre fatia por
+fatia quando há NaN). Os limiares de um ano só dependem dos anos anteriores, então uma
+semana nova reaproveita os limiares já calculados e só reclassifica (atualizar_canal).
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+ANOS_BASE = 5    # anos anteriores usados nos limiares
+MINIMO_ANOS = 3  # com menos anos de histórico na SE, não há limiar (zona SEM_BASE)
+SEMANAS_ANO = 53
+
+METODOS = ("quartis", "media_dp")
+
+# zonas do diagrama de controle
+SEM_BASE, EXITO, SEGURANCA, ALERTA, EPIDEMIA = -1, 0, 1, 2, 3
+NOMES_ZONAS = {SEM_BASE: "Sem histórico", EXITO: "Êxito", SEGURANCA: "Segurança", ALERTA: "Alerta", EPIDEMIA: "Epidemia"}
+
+
+def cubo_semanal(series):
+    """
+    Taxa semanal (SeriesEpi.taxa_semanal) num cubo áreas x anos x 53, com NaN nas
+    semanas fora da série. Devolve (anos, cubo).
+    """
+    anos = np.arange(series.ano_epi.min(), series.ano_epi.max() + 1)
+    cubo = np.full((len(series.areas), len(anos), SEMANAS_ANO), np.nan)
+    cubo[:, series.ano_epi - anos[0], series.semana_epi - 1] = series.taxa_semanal()
+    return anos, cubo
+
+
+def _quantis_ordenados(ordenado, validos, qs):
+    """Quantis (interpolação linear, como np.percentile) de janelas já ordenadas com os NaN no fim."""
+    resultado = []
+    ultimo = ordenado.shape[-1] - 1
+    for q in qs:
+        posicao = q * (validos - 1)
+        baixo = np.clip(np.floor(posicao).astype(np.int64), 0, ultimo)
+        alto = np.clip(baixo + 1, 0, ultimo)
+        fracao = posicao - baixo
+        v_baixo = np.take_along_axis(ordenado, baixo[..., None], axis=-1)[..., 0]
+        v_alto = np.take_along_axis(ordenado, alto[..., None], axis=-1)[..., 0]
+        resultado.append(np.where(fracao > 0, v_baixo + (v_alto - v_baixo) * fracao, v_baixo))
+    return resultado
+
+
+def calcular_limiares(cubo, indices_anos, metodo="quartis", anos_base=ANOS_BASE, minimo=MINIMO_ANOS):
+    """
+    (inferior, central, superior) de cada área x ano alvo x SE, para os anos de
+    `indices_anos` (posições no eixo de anos do cubo). Limiar NaN onde a SE tem menos
+    de `minimo` anos de histórico.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"método desconhecido: {metodo}")
+    n_areas, _, n_semanas = cubo.shape
+    preenchido = np.concatenate([np.full((n_areas, anos_base, n_semanas), np.nan), cubo], axis=1)
+    # janela do ano j: anos j-anos_base .. j-1 (posições j .. j+anos_base-1 no cubo preenchido)
+    posicoes = np.asarray(indices_anos)[:, None] + np.arange(anos_base)
+    janelas = np.moveaxis(preenchido[:, posicoes, :], 2, 3)  # áreas x alvos x semanas x janela
+    validos = np.count_nonzero(~np.isnan(janelas), axis=-1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if metodo == "quartis":
+            inferior, central, superior = _quantis_ordenados(np.sort(janelas, axis=-1), validos, (0.25, 0.5, 0.75))
+        else:
+            soma = np.nansum(janelas, axis=-1)
+            media = soma / validos
+            desvio = np.sqrt(np.nansum((janelas - media[..., None]) ** 2, axis=-1) / (validos - 1))
+            inferior, central, superior = np.maximum(media - 2 * desvio, 0), media, media + 2 * desvio
+
+    sem_base = validos < minimo
+    return tuple(np.where(sem_base, np.nan, limiar) for limiar in (inferior, central, superior))
+
+
+def classificar(valores, inferior, central, superior):
+    """Zona do diagrama de cada valor (arrays de mesmo formato)."""
+    zona = np.select(
+        [valores > superior, valores > central, valores >= inferior],
+        [EPIDEMIA, ALERTA, SEGURANCA],
+        default=EXITO,
+    )
+    return np.where(np.isnan(superior) | np.isnan(valores), SEM_BASE, zona)
+
+
+@dataclass(frozen=True)
+class CanalEndemico:
+    """Limiares e zonas de todas as áreas x anos x SE de um nível e método."""
+    areas: np.ndarray
+    anos: np.ndarray
+    metodo: str
+    valores: np.ndarray    # taxa semanal (cubo áreas x anos x 53)
+    inferior: np.ndarray
+    central: np.ndarray
+    superior: np.ndarray
+    zonas: np.ndarray
+
+    def ultima_semana(self, ano=None):
+        """(ano, SE) da última semana com dados, no ano dado ou em toda a série."""
+        com_dados = ~np.all(np.isnan(self.valores), axis=0)  # anos x semanas
+        if ano is not None:
+            com_dados[self.anos != int(ano)] = False
+        if not com_dados.any():
+            return None
+        i_ano, i_semana = np.nonzero(com_dados)
+        ultimo = np.lexsort((i_semana, i_ano))[-1]
+        return int(self.anos[i_ano[ultimo]]), int(i_semana[ultimo]) + 1
+
+    def situacao(self, ano, semana):
+        """Uma linha por área na semana: taxa, limiares e zona, das mais críticas às menos."""
+        i, s = int(ano) - int(self.anos[0]), int(semana) - 1
+        df = pd.DataFrame({
+            'area': self.areas,
+            'taxa_semanal': self.valores[:, i, s],
+            'limiar_inferior': self.inferior[:, i, s],
+            'limiar_central': self.central[:, i, s],
+            'limiar_superior': self.superior[:, i, s],
+            'zona': self.zonas[:, i, s],
+        })
+        with np.errstate(invalid="ignore", divide="ignore"):
+            df['razao_limiar'] = df['taxa_semanal'] / df['limiar_superior']
+        return df.sort_values(['zona', 'razao_limiar'], ascending=False, ignore_index=True)
+
+
+def montar_canal(series, metodo="quartis", anos_base=ANOS_BASE):
+    anos, cubo = cubo_semanal(series)
+    limiares = calcular_limiares(cubo, np.arange(len(anos)), metodo, anos_base)
+    return CanalEndemico(series.areas, anos, metodo, cubo, *limiares, classificar(cubo, *limiares))
+
+
+def atualizar_canal(anterior, series, metodo="quartis", anos_base=ANOS_BASE):
+    """
+    Canal para uma série nova reaproveitando `anterior` quando só o último ano mudou
+    ou anos novos entraram (o caso de uma carga semanal): os limiares dos anos já
+    calculados dependem só de anos anteriores a eles, que não mudaram. Qualquer outra
+    mudança (áreas, anos antigos revisados) recalcula tudo.
+    """
+    if anterior is None or anterior.metodo != metodo or not np.array_equal(anterior.areas, series.areas):
+        return montar_canal(series, metodo, anos_base)
+    anos, cubo = cubo_semanal(series)
+    mantidos = len(anterior.anos) - 1  # anos completos do canal anterior, exceto o último
+    if (anos[0] != anterior.anos[0] or len(anos) < len(anterior.anos)
+            or not np.array_equal(cubo[:, :mantidos], anterior.valores[:, :mantidos], equal_nan=True)):
+        return montar_canal(series, metodo, anos_base)
+
+    # os limiares do último ano anterior também ficam (dependem só de anos mantidos); só os anos novos são calculados
+    novos = np.arange(len(anterior.anos), len(anos))
+    limiares = [anterior.inferior, anterior.central, anterior.superior]
+    if len(novos):
+        calculados = calcular_limiares(cubo, novos, metodo, anos_base)
+        limiares = [np.concatenate([velho, novo], axis=1) for velho, novo in zip(limiares, calculados)]
+    return CanalEndemico(series.areas, anos, metodo, cubo, *limiares, classificar(cubo, *limiares))
+
+
+class CanaisPorVersao:
+    """
+    Canais por (município, nível, método) de um processo. Numa versão nova dos dados
+    o canal é atualizado a partir do anterior (atualizar_canal), em vez de refeito do
+    zero; a versão de um município não afeta os canais dos outros.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._canais = {}  # (município, nível, método) -> (versão, canal)
+
+    def obter(self, nivel, metodo, versao, carregar_series, municipio=None):
+        """Canal da versão; carregar_series() (-> SeriesEpi ou None) só roda quando a versão muda."""
+        chave = (municipio, nivel, metodo)
+        with self._lock:
+            guardado = self._canais.get(chave)
+            if guardado is not None and guardado[0] == versao:
+                return guardado[1]
+            series = carregar_series()
+            if series is None:
+                canal = None
+            else:
+                canal = atualizar_canal(guardado[1] if guardado else None, series, metodo)
+            self._canais[chave] = (versao, canal)
+            return canal
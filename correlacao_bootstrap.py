@@ -0,0 +1,134 @@
+"""
+Correlações (Pearson e Spearman) e regressões simples com intervalos de confiança por
+bootstrap, para o laboratório de correlação.
+
+As reamostragens são feitas em lote: um bloco de B amostras vira um array
+(B, n, p) e as B matrizes de correlação saem de um np.matmul só; os postos de
+Spearman (com empates pela média) também são calculados para o bloco inteiro de uma
+vez. Os blocos rodam em paralelo num pool de threads (o NumPy solta o GIL na
+ordenação e na multiplicação de matrizes), com sementes independentes e
+reprodutíveis. Quem chama guarda o resultado por (nível, ano, variáveis, versão):
+o custo é pago uma vez, não a cada rerun.
+"""
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+
+from paralelo import executor_numpy
+
+REAMOSTRAGENS = 2000
+REAMOSTRAGENS_POR_BLOCO = 250
+NIVEL_CONFIANCA = 0.95
+SEMENTE = 20240101
+
+
+def postos_em_lote(amostras):
+    """
+    Postos de cada coluna de cada amostra (B, n, p), com empates recebendo o posto
+    médio (como pandas rank(method='average')). Tudo vetorizado: uma ordenação por
+    série e acumulados para achar o início e o fim de cada grupo de empates.
+    """
+    b, n, p = amostras.shape
+    series = np.moveaxis(amostras, 1, 2).reshape(b * p, n)
+    ordem = np.argsort(series, axis=1, kind="stable")
+    ordenado = np.take_along_axis(series, ordem, axis=1)
+
+    posicao = np.broadcast_to(np.arange(n), ordenado.shape)
+    inicio_grupo = np.ones(ordenado.shape, dtype=bool)
+    inicio_grupo[:, 1:] = ordenado[:, 1:] != ordenado[:, :-1]
+    fim_grupo = np.ones(ordenado.shape, dtype=bool)
+    fim_grupo[:, :-1] = inicio_grupo[:, 1:]
+    primeiro = np.maximum.accumulate(np.where(inicio_grupo, posicao, 0), axis=1)
+    ultimo = np.minimum.accumulate(np.where(fim_grupo, posicao, n - 1)[:, ::-1], axis=1)[:, ::-1]
+
+    postos = np.empty(ordenado.shape)
+    np.put_along_axis(postos, ordem, (primeiro + ultimo) / 2 + 1, axis=1)
+    return np.moveaxis(postos.reshape(b, p, n), 1, 2)
+
+
+def _covariancias(amostras):
+    centrado = amostras - amostras.mean(axis=1, keepdims=True)
+    return np.matmul(np.swapaxes(centrado, 1, 2), centrado)
+
+
+def _correlacoes(covariancias):
+    desvio = np.sqrt(np.diagonal(covariancias, axis1=-2, axis2=-1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return covariancias / (desvio[..., :, None] * desvio[..., None, :])
+
+
+def _inclinacoes(covariancias):
+    # regressão da coluna 0 (alvo) em cada coluna j: cov(j, alvo) / var(j)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return covariancias[..., :, 0] / np.diagonal(covariancias, axis1=-2, axis2=-1)
+
+
+def _bloco(dados, semente, tamanho):
+    """Pearson, Spearman e inclinações de `tamanho` reamostragens (com reposição) das linhas."""
+    gerador = np.random.default_rng(semente)
+    indices = gerador.integers(0, len(dados), size=(tamanho, len(dados)))
+    amostras = dados[indices]
+    cov = _covariancias(amostras)
+    return _correlacoes(cov), _correlacoes(_covariancias(postos_em_lote(amostras))), _inclinacoes(cov)
+
+
+@dataclass(frozen=True)
+class ResultadoCorrelacao:
+    """Matrizes p x p na ordem de `variaveis` (a primeira é o alvo das regressões)."""
+    variaveis: tuple
+    n: int
+    pearson: np.ndarray
+    spearman: np.ndarray
+    pearson_ic: np.ndarray    # (2, p, p): limites inferior e superior
+    spearman_ic: np.ndarray
+    inclinacao: np.ndarray    # (p,) regressão do alvo em cada variável
+    intercepto: np.ndarray
+    inclinacao_ic: np.ndarray  # (2, p)
+    reamostragens: int
+
+    def regressao(self, variavel):
+        j = self.variaveis.index(variavel)
+        return self.inclinacao[j], self.intercepto[j], self.inclinacao_ic[:, j]
+
+
+def _intervalo(valores, nivel):
+    # percentis do bootstrap; reamostragens degeneradas (variância zero) viram NaN e ficam de fora
+    alfa = (1 - nivel) / 2 * 100
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # "All-NaN slice" quando nenhuma reamostragem serve
+        return np.nanpercentile(valores, [alfa, 100 - alfa], axis=0)
+
+
+def correlacoes_com_ic(dados, variaveis, reamostragens=REAMOSTRAGENS, nivel=NIVEL_CONFIANCA, semente=SEMENTE):
+    """
+    Correlações e regressões de `dados` (array n x p, sem NaN; a coluna 0 é o alvo)
+    com intervalos de confiança por bootstrap percentil.
+    """
+    dados = np.asarray(dados, dtype=np.float64)
+    cov = _covariancias(dados[None])[0]
+    media = dados.mean(axis=0)
+    inclinacao = _inclinacoes(cov)
+
+    tamanhos = [REAMOSTRAGENS_POR_BLOCO] * (reamostragens // REAMOSTRAGENS_POR_BLOCO)
+    if reamostragens % REAMOSTRAGENS_POR_BLOCO:
+        tamanhos.append(reamostragens % REAMOSTRAGENS_POR_BLOCO)
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    if len(tamanhos) > 1:
+        blocos = list(executor_numpy().map(_bloco, [dados] * len(tamanhos), sementes, tamanhos))
+    else:
+        blocos = [_bloco(dados, sementes[0], tamanhos[0])]
+    pearson_b, spearman_b, inclinacao_b = (np.concatenate(partes) for partes in zip(*blocos))
+
+    return ResultadoCorrelacao(
+        variaveis=tuple(variaveis),
+        n=len(dados),
+        pearson=_correlacoes(cov),
+        spearman=_correlacoes(_covariancias(postos_em_lote(dados[None])))[0],
+        pearson_ic=_intervalo(pearson_b, nivel),
+        spearman_ic=_intervalo(spearman_b, nivel),
+        inclinacao=inclinacao,
+        intercepto=media[0] - inclinacao * media,
+        inclinacao_ic=_intervalo(inclinacao_b, nivel),
+        reamostragens=reamostragens,
+    )
@@ -0,0 +1,135 @@
+"""
+Correlação cruzada defasada entre o clima e os casos semanais, para todas as áreas
+e todas as defasagens de uma vez.
+
+Para a defasagem k, a correlação é o Pearson entre o clima da semana t e os casos
+da semana t + k, só nas semanas em que as duas séries têm dado. Todas as somas que
+entram no Pearson (número de pares, somas, somas dos quadrados e dos produtos) são
+correlações cruzadas de séries mascaradas (zero onde falta dado), e cada uma sai de
+um produto no domínio da frequência: uma rfft por série, um produto com broadcast
+(variáveis x áreas) e uma irfft. Nenhum laço por área, por variável ou por
+defasagem.
+"""
+import warnings
+from dataclasses import dataclass
+from functools import partial
+from statistics import NormalDist
+
+import numpy as np
+
+DEFASAGEM_MAXIMA = 12  # semanas
+NIVEL_CONFIANCA = 0.95
+MINIMO_PARES = 8
+
+
+@dataclass(frozen=True)
+class CorrelacaoDefasada:
+    """`r` é (variável, área, defasagem); `pares` é (variável, defasagem), igual para todas as áreas."""
+    areas: np.ndarray
+    variaveis: tuple
+    defasagens: np.ndarray
+    r: np.ndarray
+    pares: np.ndarray
+
+    def limite_ruido(self, nivel=NIVEL_CONFIANCA):
+        """
+        |r| que duas séries independentes e sem autocorrelação só ultrapassam com
+        probabilidade 1 - nivel (≈ z / √pares). Séries sazonais passam dele com
+        facilidade: leia como referência, não como teste.
+        """
+        with np.errstate(divide="ignore"):
+            return NormalDist().inv_cdf(0.5 + nivel / 2) / np.sqrt(self.pares)
+
+    def melhor_defasagem(self, variavel):
+        """(defasagem, r) de maior |r| de cada área para a variável; NaN onde não há correlação."""
+        r = self.r[self.variaveis.index(variavel)]
+        valido = np.isfinite(r).any(axis=1)
+        indice = np.argmax(np.where(np.isfinite(r), np.abs(r), -1), axis=1)
+        melhor = r[np.arange(len(r)), indice]
+        return np.where(valido, self.defasagens[indice], np.nan), np.where(valido, melhor, np.nan)
+
+
+def _tamanho_fft(n):
+    return 1 << (n - 1).bit_length()
+
+
+def _padronizar(series, valido):
+    """Centra e escala cada linha pelas semanas válidas; as demais viram zero."""
+    with warnings.catch_warnings():  # linha sem nenhuma semana válida: média NaN, zerada abaixo
+        warnings.simplefilter("ignore", RuntimeWarning)
+        media = series.mean(axis=-1, keepdims=True, where=valido)
+        desvio = series.std(axis=-1, keepdims=True, where=valido)
+    return np.where(valido, (series - media) / np.where(desvio > 0, desvio, 1.0), 0.0)
+
+
+def correlacao_cruzada(a, b, defasagens, n_fft):
+    """
+    c[..., k] = Σ_t a[..., t] b[..., t + k] para k em 0..defasagens, com a e b já
+    transformados (rfft com n_fft >= n + defasagens, para a soma circular não dar a
+    volta).
+    """
+    return np.fft.irfft(np.conj(a) * b, n_fft)[..., :defasagens + 1]
+
+
+def correlacoes_defasadas(semanas_casos, casos, areas, semanas_clima, clima, defasagem_maxima=DEFASAGEM_MAXIMA):
+    """
+    CorrelacaoDefasada entre cada variável de clima e os casos de cada área, com o
+    clima adiantado de 0 a `defasagem_maxima` semanas.
+
+    `semanas_casos` e `semanas_clima` são os domingos (datetime64[D]) das colunas de
+    `casos` (áreas x semanas, ver series_epi.SeriesEpi) e dos vetores de `clima`
+    ({variável: valores por semana}, NaN sem leitura). As séries não precisam cobrir
+    o mesmo período nem ter as semanas contíguas no clima. Defasagens com menos de
+    MINIMO_PARES semanas em comum ficam NaN; None sem variáveis ou sem áreas.
+    """
+    variaveis = tuple(clima)
+    if not variaveis or len(areas) == 0:
+        return None
+    semana_casos = np.asarray(semanas_casos, dtype="datetime64[D]").astype(np.int64) // 7
+    semana_clima = np.asarray(semanas_clima, dtype="datetime64[D]").astype(np.int64) // 7
+    primeira = min(semana_casos.min(), semana_clima.min())
+    n = int(max(semana_casos.max(), semana_clima.max()) - primeira) + 1
+    n_fft = _tamanho_fft(n + defasagem_maxima)
+
+    # eixo comum de semanas; tudo padronizado antes da FFT (o Pearson não muda e as
+    # somas dos quadrados não perdem precisão na subtração)
+    tem_caso = np.zeros(n, dtype=bool)
+    tem_caso[semana_casos - primeira] = True
+    y = np.zeros((len(areas), n))
+    y[:, semana_casos - primeira] = np.asarray(casos, dtype=np.float64)
+    y = _padronizar(y, tem_caso)
+
+    valores = np.array([np.asarray(clima[v], dtype=np.float64) for v in variaveis])
+    tem_clima = np.zeros((len(variaveis), n), dtype=bool)
+    tem_clima[:, semana_clima - primeira] = np.isfinite(valores)
+    x = np.zeros((len(variaveis), n))
+    x[:, semana_clima - primeira] = np.nan_to_num(valores)
+    x = _padronizar(x, tem_clima)
+
+    rfft = partial(np.fft.rfft, n=n_fft)
+    cruzada = partial(correlacao_cruzada, defasagens=defasagem_maxima, n_fft=n_fft)
+    f_mx, f_x, f_x2 = rfft(tem_clima.astype(np.float64)), rfft(x), rfft(x ** 2)
+    f_my, f_y, f_y2 = rfft(tem_caso.astype(np.float64)), rfft(y), rfft(y ** 2)
+
+    pares = np.rint(cruzada(f_mx, f_my))                     # (variável, defasagem)
+    soma_x = cruzada(f_x, f_my)[:, None]                     # (variável, 1, defasagem)
+    soma_x2 = cruzada(f_x2, f_my)[:, None]
+    soma_y = cruzada(f_mx[:, None], f_y[None])               # (variável, área, defasagem)
+    soma_y2 = cruzada(f_mx[:, None], f_y2[None])
+    soma_xy = cruzada(f_x[:, None], f_y[None])
+
+    m = pares[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariancia = soma_xy - soma_x * soma_y / m
+        variancia_x = soma_x2 - soma_x ** 2 / m
+        variancia_y = soma_y2 - soma_y ** 2 / m
+        # resíduo da FFT (~1e-12) numa série constante não vira correlação
+        constante = (variancia_x <= 1e-9 * m) | (variancia_y <= 1e-9 * m) | (m < MINIMO_PARES)
+        r = np.where(constante, np.nan, covariancia / np.sqrt(variancia_x * variancia_y))
+    return CorrelacaoDefasada(
+        areas=np.asarray(areas, dtype=object),
+        variaveis=variaveis,
+        defasagens=np.arange(defasagem_maxima + 1),
+        r=np.clip(r, -1, 1),
+        pares=pares.astype(np.int64),
+    )
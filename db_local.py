@@ -1,35 +1,104 @@
 import sqlite3
 import os
+import argparse
+import csv
+import math
+import time
+from collections import Counter
+
+from geocodificacao import GEOJSON_BAIRROS, IndiceGrade
+from geometria_bairros import exportar_estatico, gerar_niveis, medidas_bairros
+from ingestao_clima import VARIAVEIS_CLIMA, dias_do_municipio
+from ingestao_sinan import COLUNAS_NOTIFICACAO, lotes_normalizados
+from interpolacao_areal import MatrizPesos, assinatura_malhas, calcular_pesos, interpolar, ler_dados_setores
+from snapshot_colunar import exportar_snapshot
+from vizinhanca import calcular_vizinhanca
 
 # --- CONFIGURAÇÕES INICIAIS ---
 DB_FILE = "db_local.db"
 DATA_DIR = "data"
 DB_PATH = os.path.join(DATA_DIR, DB_FILE)
+# banco montado do zero fica aqui até estar completo (ver _publicar_banco)
+DB_STAGING_PATH = os.path.join(DATA_DIR, "db_local.staging.db")
 
-def criar_e_popular_banco():
-    """
-    Cria e popula o banco de dados SQLite com dados oficiais de Ribeirão Preto (2020-2024).
-    
-    Atualizações:
-    - Dados de óbitos detalhados (Dengue vs Outras Causas) conforme SINAN/CSV.
-    - Inclusão da coluna 'ign_branco' para fechar o total de notificações.
-    - Remoção de dados socioeconômicos simulados (agora usa Censo 2010/2022).
-    """
-    
-    # Garante que o diretório existe e remove banco antigo para recriar do zero
-    os.makedirs(DATA_DIR, exist_ok=True)
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
+# código IBGE (6 dígitos, padrão SINAN) do município com os dados de referência embutidos
+# abaixo (censo por região, geometria dos bairros); é o município padrão do painel
+COD_MUNICIPIO = "354340"
+NOME_MUNICIPIO = "Ribeirão Preto"
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+# malha e agregados por setor censitário do IBGE (opcionais): com eles, a população,
+# os domicílios e a renda de cada bairro saem da interpolação areal dos setores
+GEOJSON_SETORES = os.path.join(DATA_DIR, "setores-ribeirao-preto.geojson")
+CSV_SETORES = os.path.join(DATA_DIR, "setores-ribeirao-preto.csv")
+TABELAS_SETORES = ("malha_setores", "pesos_setor_bairro", "censo_setores", "censo_bairros")
 
-    print("Iniciando criação do banco de dados...")
+# séries das estações meteorológicas do município (opcionais, ver ingestao_clima.py),
+# agregadas por mês e por semana epidemiológica ao lado dos casos
+CSV_CLIMA = os.path.join(DATA_DIR, "clima-ribeirao-preto.csv")
+TABELAS_CLIMA = ("clima_diario", "clima_mensal", "clima_semanal")
+
+# ajustes do SQLite para carga em massa: o arquivo é recriado do zero,
+# então não precisamos de journal nem de fsync a cada transação
+PRAGMAS_CARGA = (
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",  # ~256 MB de cache de páginas
+    "PRAGMA locking_mode = EXCLUSIVE",
+)
+
+# carga incremental sobre o banco em uso: WAL deixa o dashboard lendo a versão
+# anterior até o COMMIT, e synchronous=NORMAL é seguro nesse modo
+PRAGMAS_INCREMENTAL = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+)
+
+# chave usada nas tabelas rollup_* para as linhas de "Todos os Anos"
+ANO_TODOS = 0
+
+# tabelas reescritas por uma carga incremental (as demais só mudam na carga completa)
+TABELAS_ATUALIZADAS_INCREMENTAL = (
+    "notificacoes_dengue", "casos_dengue_mensal", "perfil_dengue_anual",
+    "casos_dengue_regiao_anual", "casos_dengue_bairro_anual", "casos_dengue_diario", "dengue_faixa_etaria",
+    "casos_dengue_faixa_area", "rollup_perfil", "rollup_mensal", "rollup_faixa", "rollup_regioes", "rollup_bairros",
+)
+
+# partições (município, ano) tocadas por uma carga, recalculadas por derivar_agregados()
+SQL_PARTICOES_AFETADAS = "SELECT cod_municipio, ano FROM temp.particoes_afetadas"
+
+LOTES_POR_TRANSACAO = 20  # ~1 milhão de linhas por commit com TAMANHO_LOTE padrão
+PONTOS_POR_LOTE_GEOCODIFICACAO = 500_000
+
+
+def _do_municipio(linhas, cod_municipio=COD_MUNICIPIO):
+    """Prefixa cada linha com o código do município (primeira coluna das tabelas particionadas)."""
+    return [(cod_municipio, *linha) for linha in linhas]
+
+
+def _criar_tabelas_referencia(cursor):
+    """
+    Tabelas que não vêm do SINAN (cadastro de municípios, IBGE, mortalidade geral e
+    geometria das regiões). Todas começam pelo código do município: os dados
+    embutidos aqui são os de Ribeirão Preto, os demais municípios entram pelo
+    cadastro (ver cadastrar_municipios).
+    """
+    # ---------------------------------------------------------
+    # TABELA 12: MUNICÍPIOS (partições do banco)
+    # ---------------------------------------------------------
+    cursor.execute("CREATE TABLE municipios (cod_municipio TEXT PRIMARY KEY, nome TEXT, uf TEXT)")
+    cursor.execute("INSERT INTO municipios VALUES (?, ?, 'SP')", (COD_MUNICIPIO, NOME_MUNICIPIO))
 
     # ---------------------------------------------------------
     # TABELA 1: DADOS GERAIS DO MUNICÍPIO
     # ---------------------------------------------------------
-    cursor.execute("CREATE TABLE dados_municipio (indicador TEXT UNIQUE, valor REAL, unidade TEXT)")
+    cursor.execute("""
+    CREATE TABLE dados_municipio (
+        cod_municipio TEXT NOT NULL, indicador TEXT, valor REAL, unidade TEXT,
+        UNIQUE (cod_municipio, indicador)
+    )""")
     dados_gerais = [
         ('População Censo 2022', 698642, 'pessoas'),
         ('População Estimada 2025', 731639, 'pessoas'),
@@ -37,60 +106,26 @@ def criar_e_popular_banco():
         ('Densidade Demográfica 2022', 1073.32, 'hab/km²'),
         ('PIB per capita 2021', 55484.91, 'R$')
     ]
-    cursor.executemany("INSERT INTO dados_municipio VALUES (?, ?, ?)", dados_gerais)
-
-    # ---------------------------------------------------------
-    # TABELA 2: CASOS MENSAIS (Série Histórica)
-    # ---------------------------------------------------------
-    cursor.execute("CREATE TABLE casos_dengue_mensal (ano INTEGER, mes INTEGER, casos INTEGER)")
-    dados_mensais = [
-        (2020, 1, 3043), (2020, 2, 6860), (2020, 3, 5153), (2020, 4, 1929), (2020, 5, 873), (2020, 6, 195), (2020, 7, 65), (2020, 8, 25), (2020, 9, 20), (2020, 10, 12), (2020, 11, 16), (2020, 12, 9),
-        (2021, 1, 42), (2021, 2, 55), (2021, 3, 65), (2021, 4, 109), (2021, 5, 77), (2021, 6, 25), (2021, 7, 19), (2021, 8, 12), (2021, 9, 10), (2021, 10, 16), (2021, 11, 21), (2021, 12, 30),
-        (2022, 1, 68), (2022, 2, 222), (2022, 3, 1103), (2022, 4, 2692), (2022, 5, 2415), (2022, 6, 948), (2022, 7, 282), (2022, 8, 154), (2022, 9, 110), (2022, 10, 100), (2022, 11, 90), (2022, 12, 100),
-        (2023, 1, 471), (2023, 2, 991), (2023, 3, 2686), (2023, 4, 3885), (2023, 5, 2882), (2023, 6, 724), (2023, 7, 164), (2023, 8, 125), (2023, 9, 116), (2023, 10, 167), (2023, 11, 345), (2023, 12, 750),
-        (2024, 1, 3171), (2024, 2, 6644), (2024, 3, 9456), (2024, 4, 10172), (2024, 5, 8824), (2024, 6, 3536), (2024, 7, 1359), (2024, 8, 644), (2024, 9, 420), (2024, 10, 519), (2024, 11, 722), (2024, 12, 1064)
-    ]
-    cursor.executemany("INSERT INTO casos_dengue_mensal VALUES (?, ?, ?)", dados_mensais)
+    cursor.executemany("INSERT INTO dados_municipio VALUES (?, ?, ?, ?)", _do_municipio(dados_gerais))
 
     # ---------------------------------------------------------
-    # TABELA 3: PERFIL ANUAL E DESFECHOS (ATUALIZADO)
-    # Fonte: CSV 'dados dengue obito.csv'
+    # TABELA 4: ÓBITOS GERAIS (Mortalidade Geral da Cidade)
     # ---------------------------------------------------------
     cursor.execute("""
-    CREATE TABLE perfil_dengue_anual (
-        ano INTEGER UNIQUE, 
-        casos_total INTEGER, 
-        casos_masculino INTEGER, 
-        casos_feminino INTEGER, 
-        curados INTEGER,
-        ign_branco INTEGER, -- Coluna adicionada para bater o total
-        obitos_dengue INTEGER,
-        obitos_outras_causas INTEGER,
-        obitos_investigacao INTEGER
+    CREATE TABLE obitos_gerais_anual (
+        cod_municipio TEXT NOT NULL, ano INTEGER, obitos_total INTEGER, UNIQUE (cod_municipio, ano)
     )""")
-    
-    # Dados exatos do CSV oficial (incluindo Ign/Branco):
-    dados_perfil = [
-        # Ano, Total, Masc, Fem, Curados, Ign/Branco, Óbitos Dengue, Ób. Outras, Ób. Inv
-        (2020, 18200, 8273, 9896, 17395, 789, 10, 5, 1),
-        (2021, 481, 222, 259, 345, 133, 1, 2, 0),
-        (2022, 8284, 3892, 4391, 7586, 692, 2, 4, 0),
-        (2023, 13306, 6279, 7023, 12413, 877, 10, 4, 2),
-        (2024, 46531, 21038, 25483, 44246, 2239, 32, 12, 2)
-    ]
-    cursor.executemany("INSERT INTO perfil_dengue_anual VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", dados_perfil)
-
-    # ---------------------------------------------------------
-    # TABELA 4: ÓBITOS GERAIS (Mortalidade Geral da Cidade)
-    # ---------------------------------------------------------
-    cursor.execute("CREATE TABLE obitos_gerais_anual (ano INTEGER UNIQUE, obitos_total INTEGER)")
     dados_obitos_gerais = [(2020, 5484), (2021, 6555), (2022, 5499)]
-    cursor.executemany("INSERT INTO obitos_gerais_anual VALUES (?, ?)", dados_obitos_gerais)
+    cursor.executemany("INSERT INTO obitos_gerais_anual VALUES (?, ?, ?)", _do_municipio(dados_obitos_gerais))
 
     # ---------------------------------------------------------
     # TABELA 5: GEOMETRIA DAS REGIÕES (Lat/Lon)
     # ---------------------------------------------------------
-    cursor.execute("CREATE TABLE regioes_geometria (nome_regiao TEXT UNIQUE, latitude REAL, longitude REAL)")
+    cursor.execute("""
+    CREATE TABLE regioes_geometria (
+        cod_municipio TEXT NOT NULL, nome_regiao TEXT, latitude REAL, longitude REAL,
+        UNIQUE (cod_municipio, nome_regiao)
+    )""")
     regioes_geo = [
         ('Norte', -21.128794, -47.798842),
         ('Leste', -21.184219, -47.757172),
@@ -98,27 +133,14 @@ def criar_e_popular_banco():
         ('Oeste', -21.174825, -47.834542),
         ('Centro', -21.180012, -47.812378)
     ]
-    cursor.executemany("INSERT INTO regioes_geometria VALUES (?, ?, ?)", regioes_geo)
-
-    # ---------------------------------------------------------
-    # TABELA 6: CASOS POR REGIÃO (Anual)
-    # ---------------------------------------------------------
-    cursor.execute("CREATE TABLE casos_dengue_regiao_anual (ano INTEGER, nome_regiao TEXT, casos INTEGER)")
-    dados_regiao = [
-        (2020, 'Norte', 1), (2021, 'Norte', 2), (2022, 'Norte', 1), (2023, 'Norte', 4), (2024, 'Norte', 3),
-        (2020, 'Leste', 18189), (2021, 'Leste', 475), (2022, 'Leste', 8267), (2023, 'Leste', 13280), (2024, 'Leste', 46482),
-        (2020, 'Sul', 3), (2021, 'Sul', 1), (2022, 'Sul', 5), (2023, 'Sul', 10), (2024, 'Sul', 17),
-        (2020, 'Oeste', 6), (2021, 'Oeste', 3), (2022, 'Oeste', 6), (2023, 'Oeste', 7), (2024, 'Oeste', 18),
-        (2020, 'Centro', 1), (2021, 'Centro', 0), (2022, 'Centro', 5), (2023, 'Centro', 5), (2024, 'Centro', 11)
-    ]
-    cursor.executemany("INSERT INTO casos_dengue_regiao_anual VALUES (?, ?, ?)", dados_regiao)
+    cursor.executemany("INSERT INTO regioes_geometria VALUES (?, ?, ?, ?)", _do_municipio(regioes_geo))
 
     # ---------------------------------------------------------
     # TABELA 7: CENSO 2022 (Dados Reais)
     # ---------------------------------------------------------
     cursor.execute("""
     CREATE TABLE censo_2022 (
-        regiao TEXT, area REAL, total_populacao INTEGER, 
+        cod_municipio TEXT NOT NULL, regiao TEXT, area REAL, total_populacao INTEGER,
         populacao_por_km2 REAL, total_domicilios INTEGER
     )""")
     dados_censo_2022 = [
@@ -128,14 +150,14 @@ def criar_e_popular_banco():
         ('Oeste', 91.43, 187748, 2053.27, 80630),
         ('Centro', 2.17, 14890, 6840.61, 10705)
     ]
-    cursor.executemany("INSERT INTO censo_2022 VALUES (?, ?, ?, ?, ?)", dados_censo_2022)
+    cursor.executemany("INSERT INTO censo_2022 VALUES (?, ?, ?, ?, ?, ?)", _do_municipio(dados_censo_2022))
 
     # ---------------------------------------------------------
     # TABELA 8: CENSO 2010 (Dados Socioeconômicos Reais)
     # ---------------------------------------------------------
     cursor.execute("""
     CREATE TABLE censo_2010 (
-        regiao TEXT, renda_per_capita REAL, 
+        cod_municipio TEXT NOT NULL, regiao TEXT, renda_per_capita REAL,
         populacao_negra_pct REAL, anos_de_estudo REAL
     )""")
     dados_censo_2010 = [
@@ -145,18 +167,389 @@ def criar_e_popular_banco():
         ('Oeste', 991, 0.36, 8.5),
         ('Centro', 991, 0.36, 8.5)
     ]
-    cursor.executemany("INSERT INTO censo_2010 VALUES (?, ?, ?, ?)", dados_censo_2010)
+    cursor.executemany("INSERT INTO censo_2010 VALUES (?, ?, ?, ?, ?)", _do_municipio(dados_censo_2010))
+
+
+def _criar_tabelas_casos(cursor):
+    """
+    Tabelas de casos: as notificações individuais e os agregados lidos pelo dashboard,
+    estes particionados por município (cod_municipio, ano, ...).
+    """
+    # ---------------------------------------------------------
+    # TABELA 0: NOTIFICAÇÕES INDIVIDUAIS (SINAN, uma linha por ficha)
+    # ---------------------------------------------------------
+    cursor.execute("""
+    CREATE TABLE notificacoes_dengue (
+        id_notificacao TEXT PRIMARY KEY,
+        id_municipio TEXT,
+        dt_notificacao TEXT,
+        ano INTEGER,
+        mes INTEGER,
+        semana_epi INTEGER,
+        sexo TEXT,
+        idade_anos INTEGER,
+        evolucao INTEGER,   -- 1 cura, 2 óbito dengue, 3 óbito outras causas, 4 em investigação, 9 ign
+        classificacao INTEGER,
+        bairro TEXT,
+        nome_regiao TEXT,
+        latitude REAL,
+        longitude REAL,
+        bairro_geo TEXT     -- bairro do geojson que contém (latitude, longitude); ver geocodificar_notificacoes
+    )""")
+
+    # ---------------------------------------------------------
+    # TABELA 2: CASOS MENSAIS (Série Histórica)
+    # ---------------------------------------------------------
+    cursor.execute("CREATE TABLE casos_dengue_mensal (cod_municipio TEXT NOT NULL, ano INTEGER, mes INTEGER, casos INTEGER)")
+
+    # ---------------------------------------------------------
+    # TABELA 3: PERFIL ANUAL E DESFECHOS (ATUALIZADO)
+    # ---------------------------------------------------------
+    cursor.execute("""
+    CREATE TABLE perfil_dengue_anual (
+        cod_municipio TEXT NOT NULL,
+        ano INTEGER,
+        casos_total INTEGER,
+        casos_masculino INTEGER,
+        casos_feminino INTEGER,
+        curados INTEGER,
+        ign_branco INTEGER, -- Coluna adicionada para bater o total
+        obitos_dengue INTEGER,
+        obitos_outras_causas INTEGER,
+        obitos_investigacao INTEGER,
+        UNIQUE (cod_municipio, ano)
+    )""")
+
+    # ---------------------------------------------------------
+    # TABELA 6: CASOS POR REGIÃO (Anual)
+    # ---------------------------------------------------------
+    cursor.execute("CREATE TABLE casos_dengue_regiao_anual (cod_municipio TEXT NOT NULL, ano INTEGER, nome_regiao TEXT, casos INTEGER)")
+
+    # ---------------------------------------------------------
+    # TABELA 10: CASOS POR BAIRRO (Anual, a partir das notificações geocodificadas)
+    # ---------------------------------------------------------
+    cursor.execute("CREATE TABLE casos_dengue_bairro_anual (cod_municipio TEXT NOT NULL, ano INTEGER, nome_bairro TEXT, casos INTEGER)")
+
+    # ---------------------------------------------------------
+    # TABELA 11: CASOS DIÁRIOS POR REGIÃO E BAIRRO (base das séries por semana epidemiológica)
+    # ---------------------------------------------------------
+    cursor.execute("""
+    CREATE TABLE casos_dengue_diario (
+        cod_municipio TEXT NOT NULL, ano INTEGER, dt_notificacao TEXT, nome_regiao TEXT, nome_bairro TEXT, casos INTEGER
+    )""")
+    _criar_tabela_faixa_area(cursor)
 
     # ---------------------------------------------------------
     # TABELA 9: FAIXA ETÁRIA
     # ---------------------------------------------------------
     cursor.execute("""
     CREATE TABLE dengue_faixa_etaria (
-        ano INTEGER, casos_menor_um_ano INTEGER, casos_1_a_4_anos INTEGER, 
-        casos_5_a_9_anos INTEGER, casos_10_a_14_anos INTEGER, casos_15_a_19_anos INTEGER, 
-        casos_20_a_39_anos INTEGER, casos_40_a_59_anos INTEGER, casos_60_a_64_anos INTEGER, 
+        cod_municipio TEXT NOT NULL, ano INTEGER, casos_menor_um_ano INTEGER, casos_1_a_4_anos INTEGER,
+        casos_5_a_9_anos INTEGER, casos_10_a_14_anos INTEGER, casos_15_a_19_anos INTEGER,
+        casos_20_a_39_anos INTEGER, casos_40_a_59_anos INTEGER, casos_60_a_64_anos INTEGER,
         casos_65_a_69_anos INTEGER, casos_70_a_79_anos INTEGER, casos_maior_80_anos INTEGER
     )""")
+
+
+def _criar_tabela_faixa_area(cursor):
+    """
+    Casos por ano, região, bairro e faixa etária (índice em FAIXAS_ETARIAS), base das
+    taxas padronizadas por idade. Idempotente: bancos anteriores a ela a ganham na
+    carga incremental.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS casos_dengue_faixa_area (
+        cod_municipio TEXT NOT NULL, ano INTEGER, nome_regiao TEXT, nome_bairro TEXT, faixa INTEGER, casos INTEGER
+    )""")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_faixa_area_municipio_ano ON casos_dengue_faixa_area (cod_municipio, ano)")
+
+
+def _criar_tabelas_bairros(cursor, caminho_geojson=GEOJSON_BAIRROS, cod_municipio=COD_MUNICIPIO):
+    """
+    Bairros do geojson do município: área, centro e região (a de regioes_geometria com
+    o ponto mais próximo do centro do bairro), a geometria simplificada e quantizada
+    em níveis de detalhe para o mapa coroplético (ver geometria_bairros.py) e os
+    pares de bairros vizinhos da autocorrelação espacial (ver vizinhanca.py).
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS bairros (
+        cod_municipio TEXT NOT NULL, nome_bairro TEXT, nome_regiao TEXT, area_km2 REAL, latitude REAL, longitude REAL,
+        PRIMARY KEY (cod_municipio, nome_bairro)
+    )""")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS bairros_geometria (
+        cod_municipio TEXT NOT NULL, nivel INTEGER, tolerancia REAL, vertices INTEGER, geojson TEXT,
+        PRIMARY KEY (cod_municipio, nivel)
+    )""")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS vizinhos_bairros (
+        cod_municipio TEXT NOT NULL, nome_bairro TEXT, vizinho TEXT, contiguo INTEGER,
+        PRIMARY KEY (cod_municipio, nome_bairro, vizinho)
+    ) WITHOUT ROWID""")
+    if not os.path.exists(caminho_geojson):
+        print(f"Geojson '{caminho_geojson}' não encontrado: mapa de bairros indisponível.")
+        return
+
+    regioes = cursor.execute(
+        "SELECT nome_regiao, latitude, longitude FROM regioes_geometria WHERE cod_municipio = ?", (cod_municipio,)
+    ).fetchall()
+    linhas = []
+    for nome, area, lat, lon in medidas_bairros(caminho_geojson):
+        regiao = min(regioes, key=lambda r: (r[1] - lat) ** 2 + (r[2] - lon) ** 2)[0] if regioes else None
+        linhas.append((nome, regiao, float(area), float(lat), float(lon)))
+    cursor.execute("DELETE FROM bairros WHERE cod_municipio = ?", (cod_municipio,))
+    cursor.executemany("INSERT INTO bairros VALUES (?, ?, ?, ?, ?, ?)", _do_municipio(linhas, cod_municipio))
+    cursor.execute("DELETE FROM bairros_geometria WHERE cod_municipio = ?", (cod_municipio,))
+    cursor.executemany(
+        "INSERT INTO bairros_geometria VALUES (?, ?, ?, ?, ?)", _do_municipio(gerar_niveis(caminho_geojson), cod_municipio)
+    )
+    cursor.execute("DELETE FROM vizinhos_bairros WHERE cod_municipio = ?", (cod_municipio,))
+    cursor.executemany(
+        "INSERT INTO vizinhos_bairros VALUES (?, ?, ?, ?)",
+        _do_municipio(calcular_vizinhanca(caminho_geojson).registros(), cod_municipio),
+    )
+
+
+def _criar_tabelas_setores(cursor):
+    """
+    Setores censitários e a interpolação deles para os bairros (ver
+    interpolar_setores): variáveis por setor e por bairro em formato longo (uma
+    variável nova do censo não muda o esquema) e a matriz esparsa de pesos
+    setor -> bairro, com a assinatura das malhas que a originaram. Idempotente.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS malha_setores (
+        cod_municipio TEXT PRIMARY KEY, assinatura TEXT, setores INTEGER, pares INTEGER, calculado_em TEXT
+    )""")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS pesos_setor_bairro (
+        cod_municipio TEXT NOT NULL, cod_setor TEXT, nome_bairro TEXT, peso REAL,
+        PRIMARY KEY (cod_municipio, cod_setor, nome_bairro)
+    ) WITHOUT ROWID""")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS censo_setores (
+        cod_municipio TEXT NOT NULL, cod_setor TEXT, variavel TEXT, valor REAL,
+        PRIMARY KEY (cod_municipio, cod_setor, variavel)
+    ) WITHOUT ROWID""")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS censo_bairros (
+        cod_municipio TEXT NOT NULL, nome_bairro TEXT, variavel TEXT, valor REAL,
+        PRIMARY KEY (cod_municipio, nome_bairro, variavel)
+    ) WITHOUT ROWID""")
+
+
+def _criar_tabelas_clima(cursor):
+    """
+    Clima diário do município (média das estações) e os agregados alinhados aos
+    casos: por mês (casos_dengue_mensal) e por semana epidemiológica (séries por SE),
+    com a chuva somada e temperatura e umidade médias. Idempotente.
+    """
+    colunas = ", ".join(f"{variavel} REAL" for variavel in VARIAVEIS_CLIMA)
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS clima_diario (
+        cod_municipio TEXT NOT NULL, data TEXT, ano INTEGER, mes INTEGER, semana_epi INTEGER, inicio_semana TEXT,
+        {colunas},
+        PRIMARY KEY (cod_municipio, data)
+    ) WITHOUT ROWID""")
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS clima_mensal (
+        cod_municipio TEXT NOT NULL, ano INTEGER, mes INTEGER, {colunas}, dias INTEGER,
+        PRIMARY KEY (cod_municipio, ano, mes)
+    ) WITHOUT ROWID""")
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS clima_semanal (
+        cod_municipio TEXT NOT NULL, ano INTEGER, semana_epi INTEGER, inicio_semana TEXT, {colunas}, dias INTEGER,
+        PRIMARY KEY (cod_municipio, ano, semana_epi)
+    ) WITHOUT ROWID""")
+
+
+def ingerir_clima(conn, arquivos_clima, cod_municipio=COD_MUNICIPIO):
+    """
+    Grava os dias das estações (upsert em clima_diario: nos dias já carregados, as
+    variáveis que os arquivos trazem substituem as gravadas e as demais ficam) e refaz
+    clima_mensal e clima_semanal dos municípios tocados. Arquivos sem a coluna
+    cod_municipio são do `cod_municipio`. Devolve os municípios tocados. Não abre
+    transação própria.
+    """
+    _criar_tabelas_clima(conn.cursor())
+    linhas = dias_do_municipio(arquivos_clima, cod_municipio)
+    atualizacoes = ", ".join(f"{variavel} = COALESCE(excluded.{variavel}, {variavel})" for variavel in VARIAVEIS_CLIMA)
+    conn.executemany(f"""
+    INSERT INTO clima_diario VALUES ({", ".join("?" * (6 + len(VARIAVEIS_CLIMA)))})
+    ON CONFLICT(cod_municipio, data) DO UPDATE SET {atualizacoes}
+    """, linhas)
+    municipios = sorted({linha[0] for linha in linhas})
+
+    # meses e semanas com poucos dias de leitura ficam com a média dos dias que há;
+    # a chuva é a soma desses dias (a coluna `dias` diz quantos)
+    agregados = ", ".join(
+        f"{'SUM' if variavel == 'chuva_mm' else 'AVG'}({variavel})" for variavel in VARIAVEIS_CLIMA
+    )
+    for municipio in municipios:
+        conn.execute("DELETE FROM clima_mensal WHERE cod_municipio = ?", (municipio,))
+        conn.execute(f"""
+        INSERT INTO clima_mensal
+        SELECT cod_municipio, ano, mes, {agregados}, COUNT(*) FROM clima_diario
+        WHERE cod_municipio = ? GROUP BY cod_municipio, ano, mes
+        """, (municipio,))
+        conn.execute("DELETE FROM clima_semanal WHERE cod_municipio = ?", (municipio,))
+        conn.execute(f"""
+        INSERT INTO clima_semanal
+        SELECT cod_municipio, semana_epi / 100, semana_epi, MIN(inicio_semana), {agregados}, COUNT(*) FROM clima_diario
+        WHERE cod_municipio = ? GROUP BY cod_municipio, semana_epi
+        """, (municipio,))
+    print(f"Clima: {len(linhas):,} dias de {len(arquivos_clima)} arquivo(s) para {len(municipios)} município(s).")
+    return municipios
+
+
+def _copiar_pesos_anteriores(conn, caminho_anterior=DB_PATH):
+    """
+    Na carga completa o banco nasce vazio: os pesos setor -> bairro do banco em uso
+    são copiados para que interpolar_setores() os reaproveite se as malhas não
+    mudaram (a assinatura decide).
+    """
+    if not os.path.exists(caminho_anterior):
+        return
+    anterior = sqlite3.connect(f"file:{os.path.abspath(caminho_anterior)}?mode=ro", uri=True)
+    try:
+        malhas = anterior.execute("SELECT * FROM malha_setores").fetchall()
+        pesos = anterior.execute("SELECT * FROM pesos_setor_bairro").fetchall()
+    except sqlite3.OperationalError:  # banco anterior à interpolação por setores
+        return
+    finally:
+        anterior.close()
+    conn.executemany("INSERT OR REPLACE INTO malha_setores VALUES (?, ?, ?, ?, ?)", malhas)
+    conn.executemany("INSERT OR REPLACE INTO pesos_setor_bairro VALUES (?, ?, ?, ?)", pesos)
+
+
+def interpolar_setores(conn, caminho_malha, caminho_dados, cod_municipio=COD_MUNICIPIO, caminho_geojson=GEOJSON_BAIRROS):
+    """
+    Interpola as variáveis dos setores censitários (CSV de agregados do IBGE) para os
+    bairros do município e grava o resultado em censo_bairros.
+
+    A sobreposição das malhas (cara) só é refeita quando a assinatura do geojson dos
+    setores ou do dos bairros muda; senão, a matriz de pesos gravada é relida e cada
+    variável custa um produto esparso (ver interpolacao_areal.py). Não abre transação
+    própria.
+    """
+    _criar_tabelas_setores(conn.cursor())
+    inicio = time.perf_counter()
+    assinatura = assinatura_malhas(caminho_malha, caminho_geojson)
+    guardada = conn.execute(
+        "SELECT assinatura FROM malha_setores WHERE cod_municipio = ?", (cod_municipio,)
+    ).fetchone()
+    if guardada is not None and guardada[0] == assinatura:
+        matriz = MatrizPesos.de_registros(conn.execute(
+            "SELECT cod_setor, nome_bairro, peso FROM pesos_setor_bairro WHERE cod_municipio = ?", (cod_municipio,)
+        ).fetchall())
+        origem = "pesos reaproveitados"
+    else:
+        matriz = calcular_pesos(caminho_malha, caminho_geojson)
+        conn.execute("DELETE FROM pesos_setor_bairro WHERE cod_municipio = ?", (cod_municipio,))
+        conn.executemany(
+            "INSERT INTO pesos_setor_bairro VALUES (?, ?, ?, ?)", _do_municipio(matriz.registros(), cod_municipio)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO malha_setores VALUES (?, ?, ?, ?, datetime('now'))",
+            (cod_municipio, assinatura, len(matriz.setores), len(matriz.peso)),
+        )
+        origem = "sobreposição recalculada"
+
+    dados = ler_dados_setores(caminho_dados)
+    conn.execute("DELETE FROM censo_setores WHERE cod_municipio = ?", (cod_municipio,))
+    conn.executemany("INSERT INTO censo_setores VALUES (?, ?, ?, ?)", _do_municipio(
+        [(setor, variavel, valor) for setor, registro in dados.items() for variavel, valor in registro.items()],
+        cod_municipio,
+    ))
+    por_bairro = interpolar(matriz, dados)
+    conn.execute("DELETE FROM censo_bairros WHERE cod_municipio = ?", (cod_municipio,))
+    conn.executemany("INSERT INTO censo_bairros VALUES (?, ?, ?, ?)", _do_municipio(
+        [
+            (bairro, variavel, float(valor))
+            for variavel, valores in por_bairro.items()
+            for bairro, valor in zip(matriz.bairros, valores)
+            if math.isfinite(valor)
+        ],
+        cod_municipio,
+    ))
+    print(f"Interpolação areal: {len(dados):,} setores, {len(por_bairro)} variável(is) para "
+          f"{len(matriz.bairros)} bairros ({origem}, {time.perf_counter() - inicio:.1f}s)")
+
+
+def _exportar_geometria_estatica(caminho_banco=DB_PATH):
+    """Copia os níveis de bairros_geometria de cada município para static/, servidos ao navegador como arquivos."""
+    conn = sqlite3.connect(caminho_banco)
+    niveis = conn.execute(
+        "SELECT cod_municipio, nivel, tolerancia, vertices, geojson FROM bairros_geometria ORDER BY cod_municipio, nivel"
+    ).fetchall()
+    conn.close()
+    for cod_municipio in sorted({linha[0] for linha in niveis}):
+        exportar_estatico([linha[1:] for linha in niveis if linha[0] == cod_municipio], cod_municipio)
+
+
+def _verificar_esquema(cursor):
+    """
+    A carga incremental só roda sobre bancos já particionados por município: os
+    montados antes disso (sem cod_municipio) precisam da carga completa.
+    """
+    colunas = {linha[1] for linha in cursor.execute("PRAGMA table_info(casos_dengue_mensal)")}
+    if "cod_municipio" not in colunas:
+        raise RuntimeError(
+            f"'{DB_FILE}' foi montado antes do particionamento por município: "
+            "refaça a carga completa (python db_local.py <arquivos do SINAN>)."
+        )
+
+
+def _criar_indices_chaves(cursor):
+    """
+    Chaves naturais das tabelas agregadas, usadas pelos upserts (ON CONFLICT). Todas
+    começam pelo município: cada partição fica contígua no índice, e ler ou recalcular
+    um município não passa pelas linhas dos outros. Idempotente.
+    """
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_mensal_municipio_ano_mes ON casos_dengue_mensal (cod_municipio, ano, mes)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_regiao_municipio_ano_nome ON casos_dengue_regiao_anual (cod_municipio, ano, nome_regiao)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_faixa_municipio_ano ON dengue_faixa_etaria (cod_municipio, ano)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_bairro_municipio_ano_nome ON casos_dengue_bairro_anual (cod_municipio, ano, nome_bairro)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_diario_municipio_ano ON casos_dengue_diario (cod_municipio, ano)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_censo_2022_municipio ON censo_2022 (cod_municipio, regiao)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_censo_2010_municipio ON censo_2010 (cod_municipio, regiao)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notificacoes_municipio_ano ON notificacoes_dengue (id_municipio, ano, mes)")
+
+
+def _inserir_agregados_oficiais(cursor):
+    """
+    Séries oficiais de Ribeirão Preto (2020-2024) digitadas a partir do SINAN/CSV.
+    Usadas quando o banco é montado sem as exportações individuais de notificação.
+    """
+    dados_mensais = [
+        (2020, 1, 3043), (2020, 2, 6860), (2020, 3, 5153), (2020, 4, 1929), (2020, 5, 873), (2020, 6, 195), (2020, 7, 65), (2020, 8, 25), (2020, 9, 20), (2020, 10, 12), (2020, 11, 16), (2020, 12, 9),
+        (2021, 1, 42), (2021, 2, 55), (2021, 3, 65), (2021, 4, 109), (2021, 5, 77), (2021, 6, 25), (2021, 7, 19), (2021, 8, 12), (2021, 9, 10), (2021, 10, 16), (2021, 11, 21), (2021, 12, 30),
+        (2022, 1, 68), (2022, 2, 222), (2022, 3, 1103), (2022, 4, 2692), (2022, 5, 2415), (2022, 6, 948), (2022, 7, 282), (2022, 8, 154), (2022, 9, 110), (2022, 10, 100), (2022, 11, 90), (2022, 12, 100),
+        (2023, 1, 471), (2023, 2, 991), (2023, 3, 2686), (2023, 4, 3885), (2023, 5, 2882), (2023, 6, 724), (2023, 7, 164), (2023, 8, 125), (2023, 9, 116), (2023, 10, 167), (2023, 11, 345), (2023, 12, 750),
+        (2024, 1, 3171), (2024, 2, 6644), (2024, 3, 9456), (2024, 4, 10172), (2024, 5, 8824), (2024, 6, 3536), (2024, 7, 1359), (2024, 8, 644), (2024, 9, 420), (2024, 10, 519), (2024, 11, 722), (2024, 12, 1064)
+    ]
+    cursor.executemany("INSERT INTO casos_dengue_mensal VALUES (?, ?, ?, ?)", _do_municipio(dados_mensais))
+
+    # Dados exatos do CSV oficial 'dados dengue obito.csv' (incluindo Ign/Branco):
+    dados_perfil = [
+        # Ano, Total, Masc, Fem, Curados, Ign/Branco, Óbitos Dengue, Ób. Outras, Ób. Inv
+        (2020, 18200, 8273, 9896, 17395, 789, 10, 5, 1),
+        (2021, 481, 222, 259, 345, 133, 1, 2, 0),
+        (2022, 8284, 3892, 4391, 7586, 692, 2, 4, 0),
+        (2023, 13306, 6279, 7023, 12413, 877, 10, 4, 2),
+        (2024, 46531, 21038, 25483, 44246, 2239, 32, 12, 2)
+    ]
+    cursor.executemany("INSERT INTO perfil_dengue_anual VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", _do_municipio(dados_perfil))
+
+    dados_regiao = [
+        (2020, 'Norte', 1), (2021, 'Norte', 2), (2022, 'Norte', 1), (2023, 'Norte', 4), (2024, 'Norte', 3),
+        (2020, 'Leste', 18189), (2021, 'Leste', 475), (2022, 'Leste', 8267), (2023, 'Leste', 13280), (2024, 'Leste', 46482),
+        (2020, 'Sul', 3), (2021, 'Sul', 1), (2022, 'Sul', 5), (2023, 'Sul', 10), (2024, 'Sul', 17),
+        (2020, 'Oeste', 6), (2021, 'Oeste', 3), (2022, 'Oeste', 6), (2023, 'Oeste', 7), (2024, 'Oeste', 18),
+        (2020, 'Centro', 1), (2021, 'Centro', 0), (2022, 'Centro', 5), (2023, 'Centro', 5), (2024, 'Centro', 11)
+    ]
+    cursor.executemany("INSERT INTO casos_dengue_regiao_anual VALUES (?, ?, ?, ?)", _do_municipio(dados_regiao))
+
     dados_dengue_faixa_etaria = [
         (2020, 120, 671, 1180, 1354, 1480, 6813, 4579, 735, 521, 547, 200),
         (2021, 1, 9, 19, 27, 33, 177, 151, 31, 13, 15, 5),
@@ -164,11 +557,655 @@ def criar_e_popular_banco():
         (2023, 78, 392, 1066, 1155, 1005, 4752, 3248, 515, 428, 484, 181),
         (2024, 310, 1417, 3226, 3541, 3721, 16955, 11474, 1897, 1497, 1732, 761)
     ]
-    cursor.executemany("INSERT INTO dengue_faixa_etaria VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", dados_dengue_faixa_etaria)
+    cursor.executemany("INSERT INTO dengue_faixa_etaria VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", _do_municipio(dados_dengue_faixa_etaria))
 
-    print(f"Banco de dados '{DB_FILE}' criado e atualizado com sucesso!")
-    conn.commit()
+
+def _criar_particoes_afetadas(conn):
+    conn.execute("""
+    CREATE TEMP TABLE IF NOT EXISTS particoes_afetadas (
+        cod_municipio TEXT, ano INTEGER, PRIMARY KEY (cod_municipio, ano)
+    )""")
+
+
+def cadastrar_municipios(conn, caminho_csv):
+    """
+    Cadastra (ou atualiza) municípios a partir de um CSV com as colunas cod_municipio
+    (IBGE, 6 ou 7 dígitos), nome, uf e, opcionais, populacao e area_km2, que viram
+    indicadores de dados_municipio. As notificações já gravadas de um município novo
+    entram em temp.particoes_afetadas, para derivar_agregados() montar a partição dele.
+    Devolve os códigos cadastrados. Não abre transação própria.
+    """
+    with open(caminho_csv, newline="", encoding="utf-8-sig") as arquivo:
+        amostra = arquivo.read(4096)
+        arquivo.seek(0)
+        linhas = list(csv.DictReader(arquivo, dialect=csv.Sniffer().sniff(amostra, delimiters=",;")))
+
+    _criar_particoes_afetadas(conn)
+    codigos = []
+    for linha in linhas:
+        cod_municipio = (linha.get("cod_municipio") or "").strip()[:6]
+        if not cod_municipio.isdigit():
+            continue
+        conn.execute("""
+        INSERT INTO municipios VALUES (?, ?, ?)
+        ON CONFLICT(cod_municipio) DO UPDATE SET nome = excluded.nome, uf = excluded.uf
+        """, (cod_municipio, (linha.get("nome") or cod_municipio).strip(), (linha.get("uf") or "").strip() or None))
+
+        indicadores = []
+        populacao, area = linha.get("populacao"), linha.get("area_km2")
+        if populacao:
+            indicadores.append(('População Censo 2022', float(populacao), 'pessoas'))
+        if area:
+            indicadores.append(('Área Territorial', float(area), 'km²'))
+        if populacao and area and float(area) > 0:
+            indicadores.append(('Densidade Demográfica 2022', round(float(populacao) / float(area), 2), 'hab/km²'))
+        conn.executemany("""
+        INSERT INTO dados_municipio VALUES (?, ?, ?, ?)
+        ON CONFLICT(cod_municipio, indicador) DO UPDATE SET valor = excluded.valor, unidade = excluded.unidade
+        """, _do_municipio(indicadores, cod_municipio))
+
+        conn.execute("""
+        INSERT OR IGNORE INTO temp.particoes_afetadas
+        SELECT DISTINCT id_municipio, ano FROM notificacoes_dengue WHERE id_municipio = ?
+        """, (cod_municipio,))
+        codigos.append(cod_municipio)
+    print(f"{len(codigos)} município(s) cadastrado(s) de '{caminho_csv}'.")
+    return codigos
+
+
+def ingerir_notificacoes(conn, arquivos_sinan, commits_parciais=True):
+    """
+    Carrega as exportações do SINAN (CSV/DBF) em notificacoes_dengue em streaming.
+
+    As linhas são lidas e normalizadas em lotes (executemany) e gravadas com upsert
+    na chave natural (id_notificacao): fichas reenviadas numa exportação nova
+    substituem a versão anterior. Linhas sem data ou sem número de notificação ficam
+    de fora (não há como distingui-las) e são contadas no resumo. As partições (município, ano) tocadas ficam em
+    temp.particoes_afetadas para que derivar_agregados() recalcule apenas elas.
+
+    Com `commits_parciais=False` a transação fica a cargo de quem chama (carga incremental).
+    """
+    colunas = ", ".join(COLUNAS_NOTIFICACAO)
+    marcadores = ", ".join("?" for _ in COLUNAS_NOTIFICACAO)
+    atualizacoes = ", ".join(f"{c} = excluded.{c}" for c in COLUNAS_NOTIFICACAO[1:])
+    # ficha reenviada pode trazer coordenada nova: volta para a fila da geocodificação
+    atualizacoes += ", bairro_geo = NULL"
+    sql_upsert = (
+        f"INSERT INTO notificacoes_dengue ({colunas}) VALUES ({marcadores}) "
+        f"ON CONFLICT(id_notificacao) DO UPDATE SET {atualizacoes}"
+    )
+    indice_municipio = COLUNAS_NOTIFICACAO.index("id_municipio")
+    indice_ano = COLUNAS_NOTIFICACAO.index("ano")
+
+    _criar_particoes_afetadas(conn)
+
+    total = 0
+    descartes = Counter()
+    inicio = time.perf_counter()
+    if commits_parciais:
+        conn.execute("BEGIN")
+    for i, lote in enumerate(lotes_normalizados(arquivos_sinan, descartes=descartes), start=1):
+        conn.executemany(sql_upsert, lote)
+        particoes = {(registro[indice_municipio], registro[indice_ano]) for registro in lote}
+        conn.executemany("INSERT OR IGNORE INTO temp.particoes_afetadas VALUES (?, ?)",
+                         [particao for particao in particoes if particao[0] is not None])
+        total += len(lote)
+        if i % LOTES_POR_TRANSACAO == 0:
+            if commits_parciais:
+                conn.execute("COMMIT")
+                conn.execute("BEGIN")
+            print(f"  {total:,} notificações carregadas ({time.perf_counter() - inicio:.0f}s)")
+    if commits_parciais:
+        conn.execute("COMMIT")
+
+    print(f"Total: {total:,} notificações em {time.perf_counter() - inicio:.1f}s")
+    for motivo, quantidade in sorted(descartes.items()):
+        print(f"  {quantidade:,} linha(s) descartada(s): {motivo}")
+    return total
+
+
+def geocodificar_notificacoes(conn, caminho_geojson=GEOJSON_BAIRROS, cod_municipio=COD_MUNICIPIO):
+    """
+    Preenche bairro_geo das notificações com coordenadas, por ponto-em-polígono contra
+    os bairros do geojson do município (índice em grade + ray casting em NumPy, ver
+    geocodificacao.py).
+
+    Só entram as fichas ainda sem bairro das partições do município em
+    temp.particoes_afetadas, em lotes de PONTOS_POR_LOTE_GEOCODIFICACAO. Deve rodar
+    antes de derivar_agregados(), que esvazia essa tabela. Não abre transação própria.
+    """
+    if not os.path.exists(caminho_geojson):
+        print(f"Geojson '{caminho_geojson}' não encontrado: notificações não atribuídas a bairros.")
+        return 0
+
+    indice = IndiceGrade.do_geojson(caminho_geojson)
+    leitura = conn.execute("""
+    SELECT rowid, longitude, latitude FROM notificacoes_dengue
+    WHERE id_municipio = :mun
+      AND ano IN (SELECT ano FROM temp.particoes_afetadas WHERE cod_municipio = :mun)
+      AND bairro_geo IS NULL AND latitude IS NOT NULL AND longitude IS NOT NULL
+    """, {"mun": cod_municipio})
+    total = atribuidas = 0
+    inicio = time.perf_counter()
+    while True:
+        linhas = leitura.fetchmany(PONTOS_POR_LOTE_GEOCODIFICACAO)
+        if not linhas:
+            break
+        rowids, lon, lat = zip(*linhas)
+        bairros = indice.localizar(lon, lat)
+        encontrados = bairros >= 0
+        conn.executemany(
+            "UPDATE notificacoes_dengue SET bairro_geo = ? WHERE rowid = ?",
+            zip(indice.nomes_de(bairros[encontrados]), (r for r, achou in zip(rowids, encontrados) if achou)),
+        )
+        total += len(linhas)
+        atribuidas += int(encontrados.sum())
+    if total:
+        print(f"Geocodificação: {atribuidas:,} de {total:,} notificações dentro de algum bairro "
+              f"({time.perf_counter() - inicio:.1f}s)")
+    return atribuidas
+
+
+def derivar_agregados(conn):
+    """
+    Recalcula em SQL as tabelas agregadas lidas pelo dashboard a partir das notificações.
+
+    Só as partições (município, ano) listadas em temp.particoes_afetadas são
+    recalculadas, com upsert nas chaves naturais (município, ano, mes/região): numa
+    carga semanal o custo acompanha o tamanho do lote novo, não o do histórico nem o
+    número de municípios. Notificações de municípios fora do cadastro (tabela
+    municipios) são ignoradas. Devolve os municípios recalculados. Não abre transação
+    própria.
+    """
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM temp.particoes_afetadas WHERE cod_municipio NOT IN (SELECT cod_municipio FROM municipios)")
+    municipios = [cod for (cod,) in cursor.execute("SELECT DISTINCT cod_municipio FROM temp.particoes_afetadas ORDER BY 1")]
+    afetados = f"(id_municipio, ano) IN ({SQL_PARTICOES_AFETADAS})"
+
+    cursor.execute(f"""
+    INSERT INTO casos_dengue_mensal (cod_municipio, ano, mes, casos)
+    SELECT id_municipio, ano, mes, COUNT(*) FROM notificacoes_dengue
+    WHERE {afetados}
+    GROUP BY id_municipio, ano, mes
+    ON CONFLICT(cod_municipio, ano, mes) DO UPDATE SET casos = excluded.casos
+    """)
+
+    cursor.execute(f"""
+    INSERT INTO perfil_dengue_anual
+    SELECT
+        id_municipio, ano, COUNT(*),
+        SUM(sexo = 'M'), SUM(sexo = 'F'),
+        SUM(evolucao = 1),
+        SUM(evolucao IS NULL OR evolucao = 9),
+        SUM(evolucao = 2), SUM(evolucao = 3), SUM(evolucao = 4)
+    FROM notificacoes_dengue
+    WHERE {afetados}
+    GROUP BY id_municipio, ano
+    ON CONFLICT(cod_municipio, ano) DO UPDATE SET
+        casos_total = excluded.casos_total,
+        casos_masculino = excluded.casos_masculino,
+        casos_feminino = excluded.casos_feminino,
+        curados = excluded.curados,
+        ign_branco = excluded.ign_branco,
+        obitos_dengue = excluded.obitos_dengue,
+        obitos_outras_causas = excluded.obitos_outras_causas,
+        obitos_investigacao = excluded.obitos_investigacao
+    """)
+
+    # regiões sem nenhuma notificação no ano também aparecem (com zero casos)
+    cursor.execute("""
+    INSERT INTO casos_dengue_regiao_anual (cod_municipio, ano, nome_regiao, casos)
+    SELECT a.cod_municipio, a.ano, geo.nome_regiao, COUNT(n.id_notificacao)
+    FROM temp.particoes_afetadas a
+    JOIN regioes_geometria geo ON geo.cod_municipio = a.cod_municipio
+    LEFT JOIN notificacoes_dengue n
+        ON n.id_municipio = a.cod_municipio AND n.ano = a.ano AND n.nome_regiao = geo.nome_regiao
+    WHERE true
+    GROUP BY a.cod_municipio, a.ano, geo.nome_regiao
+    ON CONFLICT(cod_municipio, ano, nome_regiao) DO UPDATE SET casos = excluded.casos
+    """)
+
+    # bairros: recontagem completa das partições afetadas (um bairro pode ter zerado)
+    cursor.execute(f"DELETE FROM casos_dengue_bairro_anual WHERE (cod_municipio, ano) IN ({SQL_PARTICOES_AFETADAS})")
+    cursor.execute(f"""
+    INSERT INTO casos_dengue_bairro_anual (cod_municipio, ano, nome_bairro, casos)
+    SELECT id_municipio, ano, bairro_geo, COUNT(*) FROM notificacoes_dengue
+    WHERE {afetados} AND bairro_geo IS NOT NULL
+    GROUP BY id_municipio, ano, bairro_geo
+    """)
+
+    # casos por dia, região e bairro: recontagem completa das partições afetadas, como acima
+    cursor.execute(f"DELETE FROM casos_dengue_diario WHERE (cod_municipio, ano) IN ({SQL_PARTICOES_AFETADAS})")
+    cursor.execute(f"""
+    INSERT INTO casos_dengue_diario (cod_municipio, ano, dt_notificacao, nome_regiao, nome_bairro, casos)
+    SELECT id_municipio, ano, dt_notificacao, nome_regiao, bairro_geo, COUNT(*) FROM notificacoes_dengue
+    WHERE {afetados}
+    GROUP BY id_municipio, ano, dt_notificacao, nome_regiao, bairro_geo
+    """)
+
+    # casos por área e faixa etária (mesmos cortes de dengue_faixa_etaria), idem
+    cursor.execute(f"DELETE FROM casos_dengue_faixa_area WHERE (cod_municipio, ano) IN ({SQL_PARTICOES_AFETADAS})")
+    cursor.execute(f"""
+    INSERT INTO casos_dengue_faixa_area (cod_municipio, ano, nome_regiao, nome_bairro, faixa, casos)
+    SELECT id_municipio, ano, nome_regiao, bairro_geo, faixa, COUNT(*) FROM (
+        SELECT id_municipio, ano, nome_regiao, bairro_geo, CASE
+            WHEN idade_anos < 1 THEN 0 WHEN idade_anos <= 4 THEN 1 WHEN idade_anos <= 9 THEN 2
+            WHEN idade_anos <= 14 THEN 3 WHEN idade_anos <= 19 THEN 4 WHEN idade_anos <= 39 THEN 5
+            WHEN idade_anos <= 59 THEN 6 WHEN idade_anos <= 64 THEN 7 WHEN idade_anos <= 69 THEN 8
+            WHEN idade_anos <= 79 THEN 9 ELSE 10 END AS faixa
+        FROM notificacoes_dengue
+        WHERE {afetados} AND idade_anos IS NOT NULL
+    )
+    GROUP BY id_municipio, ano, nome_regiao, bairro_geo, faixa
+    """)
+
+    cursor.execute(f"""
+    INSERT INTO dengue_faixa_etaria
+    SELECT
+        id_municipio, ano,
+        SUM(idade_anos < 1), SUM(idade_anos BETWEEN 1 AND 4),
+        SUM(idade_anos BETWEEN 5 AND 9), SUM(idade_anos BETWEEN 10 AND 14), SUM(idade_anos BETWEEN 15 AND 19),
+        SUM(idade_anos BETWEEN 20 AND 39), SUM(idade_anos BETWEEN 40 AND 59), SUM(idade_anos BETWEEN 60 AND 64),
+        SUM(idade_anos BETWEEN 65 AND 69), SUM(idade_anos BETWEEN 70 AND 79), SUM(idade_anos >= 80)
+    FROM notificacoes_dengue
+    WHERE {afetados}
+    GROUP BY id_municipio, ano
+    ON CONFLICT(cod_municipio, ano) DO UPDATE SET
+        casos_menor_um_ano = excluded.casos_menor_um_ano,
+        casos_1_a_4_anos = excluded.casos_1_a_4_anos,
+        casos_5_a_9_anos = excluded.casos_5_a_9_anos,
+        casos_10_a_14_anos = excluded.casos_10_a_14_anos,
+        casos_15_a_19_anos = excluded.casos_15_a_19_anos,
+        casos_20_a_39_anos = excluded.casos_20_a_39_anos,
+        casos_40_a_59_anos = excluded.casos_40_a_59_anos,
+        casos_60_a_64_anos = excluded.casos_60_a_64_anos,
+        casos_65_a_69_anos = excluded.casos_65_a_69_anos,
+        casos_70_a_79_anos = excluded.casos_70_a_79_anos,
+        casos_maior_80_anos = excluded.casos_maior_80_anos
+    """)
+
+    cursor.execute("DELETE FROM temp.particoes_afetadas")
+    return municipios
+
+
+def construir_rollups(conn, municipios=None):
+    """
+    Monta as tabelas rollup_* lidas pelos filtros do dashboard: uma linha por município
+    e ano e mais as linhas de "Todos os Anos" (ano = ANO_TODOS), com a taxa de
+    incidência já calculada. Trocar o filtro de ano vira uma busca pela chave primária
+    (cod_municipio, ano, ...), sem groupby no pandas a cada interação.
+
+    Sem `municipios`, as tabelas são refeitas do zero (carga completa); com uma lista,
+    só as partições desses municípios são apagadas e remontadas, e as dos demais nem
+    são lidas. Lê só as tabelas agregadas (não as notificações). Não abre transação
+    própria.
+    """
+    cursor = conn.cursor()
+    rollups = ("rollup_perfil", "rollup_mensal", "rollup_faixa", "rollup_regioes", "rollup_bairros")
+    if municipios is None:
+        for tabela in rollups:
+            cursor.execute(f"DROP TABLE IF EXISTS {tabela}")
+        municipios = [cod for (cod,) in cursor.execute("SELECT cod_municipio FROM municipios")]
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS municipios_rollup (cod_municipio TEXT PRIMARY KEY)")
+    cursor.execute("DELETE FROM temp.municipios_rollup")
+    cursor.executemany("INSERT INTO temp.municipios_rollup VALUES (?)", [(cod,) for cod in municipios])
+    selecionados = "cod_municipio IN (SELECT cod_municipio FROM temp.municipios_rollup)"
+
+    colunas_perfil = [
+        "casos_total", "casos_masculino", "casos_feminino", "curados", "ign_branco",
+        "obitos_dengue", "obitos_outras_causas", "obitos_investigacao",
+    ]
+    colunas_faixa = [
+        linha[1] for linha in cursor.execute("PRAGMA table_info(dengue_faixa_etaria)")
+        if linha[1] not in ("cod_municipio", "ano")
+    ]
+    soma_perfil = ", ".join(f"SUM({c})" for c in colunas_perfil)
+    soma_faixa = ", ".join(f"SUM({c})" for c in colunas_faixa)
+    params = {"todos": ANO_TODOS}
+
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS rollup_perfil (
+        cod_municipio TEXT NOT NULL, ano INTEGER,
+        {", ".join(f"{c} INTEGER" for c in colunas_perfil)}, obitos_gerais INTEGER,
+        PRIMARY KEY (cod_municipio, ano)
+    ) WITHOUT ROWID""")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rollup_mensal (
+        cod_municipio TEXT NOT NULL, ano INTEGER, mes INTEGER, casos INTEGER,
+        PRIMARY KEY (cod_municipio, ano, mes)
+    ) WITHOUT ROWID""")
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS rollup_faixa (
+        cod_municipio TEXT NOT NULL, ano INTEGER, {", ".join(f"{c} INTEGER" for c in colunas_faixa)},
+        PRIMARY KEY (cod_municipio, ano)
+    ) WITHOUT ROWID""")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rollup_regioes (
+        cod_municipio TEXT NOT NULL, ano INTEGER, nome_regiao TEXT, casos INTEGER,
+        total_populacao INTEGER, densidade_pop REAL,
+        renda_per_capita REAL, populacao_negra_pct REAL, anos_de_estudo REAL,
+        latitude REAL, longitude REAL, taxa_incidencia REAL,
+        PRIMARY KEY (cod_municipio, ano, nome_regiao)
+    ) WITHOUT ROWID""")
+    # índice de cobertura para consultas por região (série de uma região em todos os anos)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_rollup_regioes_nome
+    ON rollup_regioes (cod_municipio, nome_regiao, ano, casos, taxa_incidencia)
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rollup_bairros (
+        cod_municipio TEXT NOT NULL, ano INTEGER, nome_bairro TEXT, nome_regiao TEXT, casos INTEGER,
+        total_populacao REAL, renda_per_capita REAL,
+        latitude REAL, longitude REAL, taxa_incidencia REAL,
+        PRIMARY KEY (cod_municipio, ano, nome_bairro)
+    ) WITHOUT ROWID""")
+    for tabela in rollups:
+        cursor.execute(f"DELETE FROM {tabela} WHERE {selecionados}")
+
+    cursor.execute(f"""
+    INSERT INTO rollup_perfil
+    SELECT p.*, o.obitos_total FROM perfil_dengue_anual p
+    LEFT JOIN obitos_gerais_anual o ON o.cod_municipio = p.cod_municipio AND o.ano = p.ano
+    WHERE p.{selecionados}
+    UNION ALL
+    SELECT p.cod_municipio, :todos, {soma_perfil},
+        (SELECT SUM(obitos_total) FROM obitos_gerais_anual o WHERE o.cod_municipio = p.cod_municipio)
+    FROM perfil_dengue_anual p
+    WHERE p.{selecionados}
+    GROUP BY p.cod_municipio
+    """, params)
+
+    cursor.execute(f"""
+    INSERT INTO rollup_mensal
+    SELECT cod_municipio, ano, mes, casos FROM casos_dengue_mensal WHERE {selecionados}
+    UNION ALL
+    SELECT cod_municipio, :todos, mes, SUM(casos) FROM casos_dengue_mensal
+    WHERE {selecionados} GROUP BY cod_municipio, mes
+    """, params)
+
+    cursor.execute(f"""
+    INSERT INTO rollup_faixa
+    SELECT * FROM dengue_faixa_etaria WHERE {selecionados}
+    UNION ALL
+    SELECT cod_municipio, :todos, {soma_faixa} FROM dengue_faixa_etaria
+    WHERE {selecionados} GROUP BY cod_municipio
+    """, params)
+
+    # mesmo cruzamento com censo e geometria que o dashboard fazia, já com a incidência
+    cursor.execute(f"""
+    INSERT INTO rollup_regioes
+    SELECT
+        cr.cod_municipio, cr.ano, cr.nome_regiao, cr.casos,
+        c22.total_populacao, c22.populacao_por_km2,
+        c10.renda_per_capita, c10.populacao_negra_pct, c10.anos_de_estudo,
+        geo.latitude, geo.longitude,
+        cr.casos * 100000.0 / NULLIF(c22.total_populacao, 0)
+    FROM (
+        SELECT cod_municipio, ano, nome_regiao, casos FROM casos_dengue_regiao_anual WHERE {selecionados}
+        UNION ALL
+        SELECT cod_municipio, :todos, nome_regiao, SUM(casos) FROM casos_dengue_regiao_anual
+        WHERE {selecionados} GROUP BY cod_municipio, nome_regiao
+    ) cr
+    LEFT JOIN regioes_geometria geo ON geo.cod_municipio = cr.cod_municipio AND geo.nome_regiao = cr.nome_regiao
+    LEFT JOIN censo_2022 c22 ON c22.cod_municipio = cr.cod_municipio AND c22.regiao = cr.nome_regiao
+    LEFT JOIN censo_2010 c10 ON c10.cod_municipio = cr.cod_municipio AND c10.regiao = cr.nome_regiao
+    WHERE cr.nome_regiao IS NOT NULL
+    """, params)
+
+    # bairros: todos os do geojson em cada ano com notificação geocodificada (zero se
+    # não houver casos). A população é estimada pela densidade do Censo 2022 da região
+    # do bairro vezes a área do polígono; a renda é a da região.
+    cursor.execute(f"""
+    INSERT INTO rollup_bairros
+    SELECT
+        a.cod_municipio, a.ano, b.nome_bairro, b.nome_regiao, COALESCE(cb.casos, 0),
+        COALESCE(cs.populacao, b.area_km2 * c22.populacao_por_km2), COALESCE(cs.renda_per_capita, c10.renda_per_capita),
+        b.latitude, b.longitude,
+        COALESCE(cb.casos, 0) * 100000.0 / NULLIF(COALESCE(cs.populacao, b.area_km2 * c22.populacao_por_km2), 0)
+    FROM (
+        SELECT DISTINCT cod_municipio, ano FROM casos_dengue_bairro_anual WHERE {selecionados}
+        UNION ALL
+        SELECT DISTINCT cod_municipio, :todos FROM casos_dengue_bairro_anual WHERE {selecionados}
+    ) a
+    JOIN bairros b ON b.cod_municipio = a.cod_municipio
+    LEFT JOIN (
+        SELECT cod_municipio, ano, nome_bairro, casos FROM casos_dengue_bairro_anual WHERE {selecionados}
+        UNION ALL
+        SELECT cod_municipio, :todos, nome_bairro, SUM(casos) FROM casos_dengue_bairro_anual
+        WHERE {selecionados} GROUP BY cod_municipio, nome_bairro
+    ) cb ON cb.cod_municipio = a.cod_municipio AND cb.ano = a.ano AND cb.nome_bairro = b.nome_bairro
+    LEFT JOIN (
+        SELECT cod_municipio, nome_bairro,
+               MAX(CASE WHEN variavel = 'populacao' THEN valor END) AS populacao,
+               MAX(CASE WHEN variavel = 'renda_per_capita' THEN valor END) AS renda_per_capita
+        FROM censo_bairros WHERE {selecionados} GROUP BY cod_municipio, nome_bairro
+    ) cs ON cs.cod_municipio = b.cod_municipio AND cs.nome_bairro = b.nome_bairro
+    LEFT JOIN censo_2022 c22 ON c22.cod_municipio = b.cod_municipio AND c22.regiao = b.nome_regiao
+    LEFT JOIN censo_2010 c10 ON c10.cod_municipio = b.cod_municipio AND c10.regiao = b.nome_regiao
+    """, params)
+
+
+def _particionada(cursor, tabela):
+    return any(linha[1] == "cod_municipio" for linha in cursor.execute(f"PRAGMA table_info({tabela})"))
+
+
+def registrar_versoes(cursor, tabelas=None, municipios=None):
+    """
+    Grava em versao_tabelas uma versão nova (relógio em ns, sempre crescente entre
+    cargas) para as tabelas informadas, ou para todas quando `tabelas` é None.
+
+    Tabelas particionadas têm uma versão por município: só os de `municipios` (todos
+    os cadastrados, quando None) ganham versão nova, e o cache dos demais segue
+    válido. Tabelas sem partição usam cod_municipio = ''. O dashboard compara essas
+    versões para recarregar só o que mudou.
+    """
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS versao_tabelas (
+        tabela TEXT, cod_municipio TEXT, versao INTEGER, atualizado_em TEXT,
+        PRIMARY KEY (tabela, cod_municipio)
+    )""")
+    if tabelas is None:
+        tabelas = [nome for (nome,) in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name <> 'versao_tabelas'"
+        ).fetchall()]
+    if municipios is None:
+        municipios = [cod for (cod,) in cursor.execute("SELECT cod_municipio FROM municipios").fetchall()]
+    versao = time.time_ns()
+    linhas = [
+        (tabela, cod_municipio, versao)
+        for tabela in tabelas
+        for cod_municipio in (municipios if _particionada(cursor, tabela) else [""])
+    ]
+    cursor.executemany("""
+    INSERT INTO versao_tabelas VALUES (?, ?, ?, datetime('now'))
+    ON CONFLICT(tabela, cod_municipio) DO UPDATE SET versao = excluded.versao, atualizado_em = excluded.atualizado_em
+    """, linhas)
+
+
+def _publicar_banco():
+    """
+    Torna o banco montado em DB_STAGING_PATH visível num único passo.
+
+    Se já existe um banco em uso, o conteúdo é copiado para ele com a API de backup
+    do SQLite (em modo WAL): quem estiver lendo continua vendo a versão anterior até
+    a cópia terminar, e nunca encontra um arquivo ausente ou pela metade.
+    """
+    if not os.path.exists(DB_PATH):
+        os.replace(DB_STAGING_PATH, DB_PATH)
+        return
+
+    origem = sqlite3.connect(DB_STAGING_PATH)
+    destino = sqlite3.connect(DB_PATH)
+    destino.execute("PRAGMA journal_mode = WAL")
+    origem.backup(destino)
+    destino.close()
+    origem.close()
+    os.remove(DB_STAGING_PATH)
+
+
+def criar_e_popular_banco(arquivos_sinan=None, cadastro_municipios=None, setores=None, clima=None):
+    """
+    Cria e popula o banco de dados SQLite com dados oficiais de Ribeirão Preto (2020-2024).
+
+    Atualizações:
+    - Dados de óbitos detalhados (Dengue vs Outras Causas) conforme SINAN/CSV.
+    - Inclusão da coluna 'ign_branco' para fechar o total de notificações.
+    - Remoção de dados socioeconômicos simulados (agora usa Censo 2010/2022).
+    - Ingestão das notificações individuais do SINAN (CSV/DBF) em streaming: quando
+      `arquivos_sinan` é informado, os agregados são derivados em SQL a partir delas.
+    - O banco é montado num arquivo temporário e publicado de uma vez (ver _publicar_banco).
+    - Ao final, grava o snapshot colunar (Arrow) em data/snapshot/ para leitura por mmap.
+    - Tabelas particionadas por município (cod_municipio): com `cadastro_municipios`
+      (CSV, ver cadastrar_municipios), as notificações dos outros municípios da DRS
+      também viram partições próprias.
+    - Com `setores` (malha geojson e CSV de agregados por setor censitário, ou os
+      arquivos padrão em data/), a população e a renda dos bairros vêm da interpolação
+      areal dos setores, e não mais da densidade da macrorregião.
+    - Com `clima` (CSVs das estações meteorológicas, ou o arquivo padrão em data/),
+      chuva, temperatura e umidade por dia, mês e semana epidemiológica.
+    """
+
+    # Garante que o diretório existe e descarta restos de uma montagem interrompida
+    os.makedirs(DATA_DIR, exist_ok=True)
+    if os.path.exists(DB_STAGING_PATH):
+        os.remove(DB_STAGING_PATH)
+
+    conn = sqlite3.connect(DB_STAGING_PATH, isolation_level=None)
+    for pragma in PRAGMAS_CARGA:
+        conn.execute(pragma)
+    cursor = conn.cursor()
+
+    print("Iniciando criação do banco de dados...")
+
+    cursor.execute("BEGIN")
+    _criar_tabelas_referencia(cursor)
+    _criar_tabelas_bairros(cursor)
+    _criar_tabelas_setores(cursor)
+    _criar_tabelas_clima(cursor)
+    _criar_tabelas_casos(cursor)
+    if not arquivos_sinan:
+        _inserir_agregados_oficiais(cursor)
+    if cadastro_municipios:
+        cadastrar_municipios(conn, cadastro_municipios)
+    cursor.execute("COMMIT")
+
+    if arquivos_sinan:
+        print(f"Ingerindo {len(arquivos_sinan)} arquivo(s) do SINAN...")
+        ingerir_notificacoes(conn, arquivos_sinan)
+
+    # índices criados depois da carga: bem mais rápido do que mantê-los linha a linha
+    cursor.execute("BEGIN")
+    _criar_indices_chaves(cursor)
+    if arquivos_sinan:
+        geocodificar_notificacoes(conn)
+        derivar_agregados(conn)
+    if setores is None and os.path.exists(GEOJSON_SETORES) and os.path.exists(CSV_SETORES):
+        setores = (GEOJSON_SETORES, CSV_SETORES)
+    if setores:
+        _copiar_pesos_anteriores(conn)
+        interpolar_setores(conn, *setores)
+    if clima is None and os.path.exists(CSV_CLIMA):
+        clima = [CSV_CLIMA]
+    if clima:
+        ingerir_clima(conn, clima)
+    construir_rollups(conn)
+    registrar_versoes(cursor)
+    cursor.execute("COMMIT")
+
+    conn.execute("PRAGMA journal_mode = WAL")
     conn.close()
+    _publicar_banco()
+    exportar_snapshot(DB_PATH)
+    _exportar_geometria_estatica()
+    print(f"Banco de dados '{DB_FILE}' criado e atualizado com sucesso!")
+
+
+def atualizar_banco(arquivos_sinan, cadastro_municipios=None, setores=None, clima=None):
+    """
+    Carga incremental: aplica um lote novo de exportações do SINAN (e/ou um cadastro
+    de municípios) sobre o banco em uso.
+
+    As notificações entram por upsert, só as partições (município, ano) tocadas são
+    recalculadas e só os municípios tocados ganham versão nova, então incluir um
+    município não invalida o cache dos outros. Tudo acontece numa única transação em
+    modo WAL: o dashboard passa da versão anterior para a nova de uma vez, sem
+    reprocessar o histórico.
+
+    Com `setores` (malha, CSV), as variáveis dos setores censitários são
+    reinterpoladas para os bairros de Ribeirão Preto e os rollups dele refeitos; a
+    sobreposição das malhas é reaproveitada se elas não mudaram. Com `clima` (CSVs
+    das estações), os dias novos entram por upsert e os agregados de clima dos
+    municípios tocados são refeitos.
+    """
+    if not os.path.exists(DB_PATH):
+        print(f"Banco '{DB_FILE}' não encontrado: fazendo a carga completa.")
+        criar_e_popular_banco(arquivos_sinan, cadastro_municipios, setores, clima)
+        return
+
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    for pragma in PRAGMAS_INCREMENTAL:
+        conn.execute(pragma)
+    cursor = conn.cursor()
+
+    print(f"Atualizando '{DB_FILE}' com {len(arquivos_sinan)} arquivo(s) do SINAN...")
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        _verificar_esquema(cursor)
+        _criar_tabela_faixa_area(cursor)
+        _criar_indices_chaves(cursor)
+        _criar_particoes_afetadas(conn)
+        cadastrados = cadastrar_municipios(conn, cadastro_municipios) if cadastro_municipios else []
+        tabelas = TABELAS_ATUALIZADAS_INCREMENTAL + (("municipios", "dados_municipio") if cadastrados else ())
+        total = ingerir_notificacoes(conn, arquivos_sinan, commits_parciais=False) if arquivos_sinan else 0
+        geocodificar_notificacoes(conn)
+        municipios = set(derivar_agregados(conn)) | set(cadastrados)
+        if setores:
+            interpolar_setores(conn, *setores)
+            tabelas += TABELAS_SETORES
+            municipios.add(COD_MUNICIPIO)
+        else:
+            _criar_tabelas_setores(cursor)  # bancos anteriores à interpolação: os rollups leem censo_bairros
+        # o clima não entra nos rollups: só as tabelas dele ganham versão nova
+        municipios_clima = ingerir_clima(conn, clima) if clima else []
+        _criar_tabelas_clima(cursor)
+        municipios = sorted(municipios)
+        construir_rollups(conn, municipios)
+        if municipios:
+            registrar_versoes(cursor, tabelas, municipios)
+        if municipios_clima:
+            registrar_versoes(cursor, TABELAS_CLIMA, municipios_clima)
+        cursor.execute("COMMIT")
+    except BaseException:
+        cursor.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    if municipios:
+        exportar_snapshot(DB_PATH, tabelas, municipios)
+    if municipios_clima:
+        exportar_snapshot(DB_PATH, TABELAS_CLIMA, municipios_clima)
+    _exportar_geometria_estatica()
+    print(f"Banco de dados '{DB_FILE}' atualizado com sucesso ({total:,} notificações, "
+          f"{len(municipios)} município(s) recalculado(s))!")
 
 if __name__ == '__main__':
-    criar_e_popular_banco()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Cria ou atualiza o banco local do dashboard.")
+    parser.add_argument("arquivos_sinan", nargs="*", help="exportações do SINAN/DataSUS (.csv ou .dbf)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="aplica os arquivos sobre o banco existente em vez de recriá-lo")
+    parser.add_argument("--municipios", metavar="CSV",
+                        help="cadastro de municípios (cod_municipio, nome, uf[, populacao, area_km2])")
+    parser.add_argument("--setores", nargs=2, metavar=("MALHA", "CSV"),
+                        help="malha dos setores censitários (geojson com CD_SETOR) e agregados por setor, "
+                             f"interpolados para os bairros (padrão: {GEOJSON_SETORES} e {CSV_SETORES}, se existirem)")
+    parser.add_argument("--clima", nargs="+", metavar="CSV",
+                        help="séries das estações meteorológicas (CSV do INMET ou data, chuva_mm, temperatura, "
+                             f"umidade...) de Ribeirão Preto ou da coluna cod_municipio (padrão: {CSV_CLIMA}, se existir)")
+    args = parser.parse_args()
+
+    if args.incremental:
+        if not args.arquivos_sinan and not args.municipios and not args.setores and not args.clima:
+            parser.error("--incremental exige ao menos um arquivo do SINAN, --municipios, --setores ou --clima")
+        atualizar_banco(args.arquivos_sinan, args.municipios, args.setores, args.clima)
+    else:
+        criar_e_popular_banco(args.arquivos_sinan, args.municipios, args.setores, args.clima)
@@ -0,0 +1,60 @@
+"""
+Figuras com todos os anos de uma vez, para trocar de ano no navegador.
+
+Os traços de cada ano vão para a mesma figura e um slider (método "update" do
+Plotly) alterna qual grupo fica visível. Diferente de frames/animate, isso funciona
+mesmo quando cada ano tem um número diferente de traços (ex.: barras coloridas por
+categoria). A troca de ano acontece no navegador, sem rerun do Streamlit.
+"""
+PREFIXO_SLIDER = "Ano: "
+
+
+def figura_com_anos(figuras, prefixo=PREFIXO_SLIDER):
+    """
+    Junta {rótulo do ano: figura} numa figura com slider; o primeiro rótulo começa ativo.
+    O layout é o da primeira figura; o título de cada ano vai junto com o passo do slider.
+    """
+    import plotly.graph_objects as go
+
+    rotulos = list(figuras)
+    fig = go.Figure(layout=figuras[rotulos[0]].layout)
+    faixas = []
+    for rotulo in rotulos:
+        inicio = len(fig.data)
+        fig.add_traces(list(figuras[rotulo].data))
+        faixas.append((inicio, len(fig.data)))
+
+    passos = []
+    for rotulo, (inicio, fim) in zip(rotulos, faixas):
+        visivel = [inicio <= i < fim for i in range(len(fig.data))]
+        layout_ano = {}
+        if figuras[rotulo].layout.title.text:
+            layout_ano["title.text"] = figuras[rotulo].layout.title.text
+        passos.append(dict(method="update", label=str(rotulo), args=[{"visible": visivel}, layout_ano]))
+
+    fig.update_layout(sliders=[dict(active=0, steps=passos, currentvalue=dict(prefix=prefixo), pad=dict(t=50))])
+    for traco, visivel in zip(fig.data, passos[0]["args"][0]["visible"]):
+        traco.visible = visivel
+    return fig
+
+
+def ativar_ano(fig_dict, rotulo):
+    """
+    Deixa ativo o passo do slider de `rotulo` num dict de figura (saída de figura_com_anos,
+    já desserializada). Só mexe em 'visible' e no título: não reconstrói nada.
+    """
+    slider = fig_dict["layout"]["sliders"][0]
+    indice = next((i for i, passo in enumerate(slider["steps"]) if passo["label"] == str(rotulo)), None)
+    if indice is None:
+        return fig_dict
+    visivel, layout_ano = slider["steps"][indice]["args"]
+    for traco, mostrar in zip(fig_dict["data"], visivel["visible"]):
+        traco["visible"] = mostrar
+    for caminho, valor in layout_ano.items():
+        destino = fig_dict["layout"]
+        *pais, chave = caminho.split(".")
+        for pai in pais:
+            destino = destino.setdefault(pai, {})
+        destino[chave] = valor
+    slider["active"] = indice
+    return fig_dict
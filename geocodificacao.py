@@ -0,0 +1,154 @@
+"""
+Atribuição de pontos (notificações geocodificadas) aos bairros do geojson, sem GIS.
+
+Os polígonos ficam num índice em grade: cada célula guarda os polígonos cuja caixa
+envolvente a toca. Os pontos são agrupados por célula e testados só contra esses
+candidatos, com ray casting (regra par-ímpar) vetorizado em NumPy sobre blocos de
+pontos x arestas. Milhões de pontos por minuto num processo só.
+"""
+import json
+import os
+
+import numpy as np
+
+GEOJSON_BAIRROS = os.path.join("data", "mapa-bairros-ribeirao-preto.geojson")
+CAMPO_NOME = "NOME"
+
+# limite de elementos (pontos x arestas) por bloco do ray casting, para conter a memória
+ELEMENTOS_POR_BLOCO = 4_000_000
+SEM_BAIRRO = -1
+
+
+def carregar_bairros(caminho=GEOJSON_BAIRROS, campo_nome=CAMPO_NOME):
+    """
+    Lê o geojson e devolve (nomes, partes): `nomes` na ordem das feições e `partes` como
+    lista de (índice do bairro, [anéis]) — um item por Polygon e um por parte de
+    MultiPolygon. Cada anel é um array (n, 2) de lon/lat, fechado.
+    """
+    with open(caminho, encoding="utf-8") as arquivo:
+        geojson = json.load(arquivo)
+
+    nomes, partes = [], []
+    for feicao in geojson["features"]:
+        geometria = feicao.get("geometry") or {}
+        if geometria.get("type") == "Polygon":
+            poligonos = [geometria["coordinates"]]
+        elif geometria.get("type") == "MultiPolygon":
+            poligonos = geometria["coordinates"]
+        else:
+            continue
+        indice = len(nomes)
+        nomes.append(str(feicao["properties"][campo_nome]).strip())
+        for aneis in poligonos:
+            aneis = [np.asarray(anel, dtype=np.float64)[:, :2] for anel in aneis]
+            aneis = [anel if np.array_equal(anel[0], anel[-1]) else np.vstack([anel, anel[:1]]) for anel in aneis]
+            partes.append((indice, aneis))
+    return nomes, partes
+
+
+def arestas(aneis):
+    """Arestas de todos os anéis de um polígono (furos incluídos: a paridade trata deles)."""
+    origem = np.concatenate([anel[:-1] for anel in aneis])
+    destino = np.concatenate([anel[1:] for anel in aneis])
+    return origem[:, 0], origem[:, 1], destino[:, 0], destino[:, 1]
+
+
+def pontos_no_poligono(x, y, arestas):
+    """
+    Ray casting vetorizado: True para os pontos (x, y) dentro do polígono.
+    Conta, para cada ponto, as arestas cruzadas por um raio horizontal à direita.
+    """
+    xi, yi, xj, yj = arestas
+    dentro = np.zeros(len(x), dtype=bool)
+    bloco = max(1, ELEMENTOS_POR_BLOCO // max(len(xi), 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inclinacao = (xj - xi) / (yj - yi)  # arestas horizontais nunca passam no 1º teste
+        for inicio in range(0, len(x), bloco):
+            px = x[inicio:inicio + bloco, None]
+            py = y[inicio:inicio + bloco, None]
+            cruza = ((yi > py) != (yj > py)) & (px < xi + (py - yi) * inclinacao)
+            dentro[inicio:inicio + bloco] = np.count_nonzero(cruza, axis=1) % 2 == 1
+    return dentro
+
+
+class IndiceGrade:
+    """Índice espacial em grade uniforme sobre as caixas envolventes dos polígonos."""
+
+    def __init__(self, nomes, partes, celulas=None):
+        self.nomes = list(nomes)
+        self.bairro_da_parte = np.array([indice for indice, _ in partes], dtype=np.int64)
+        self.arestas = [arestas(aneis) for _, aneis in partes]
+        caixas = []
+        for _, aneis in partes:
+            vertices = np.concatenate(aneis)
+            caixas.append([*vertices.min(axis=0), *vertices.max(axis=0)])
+        self.caixas = caixas = np.array(caixas, dtype=np.float64).reshape(-1, 4)
+
+        # ~4 células por polígono em cada eixo: poucas candidatas por célula
+        self.n = celulas or max(8, int(np.ceil(np.sqrt(len(partes)) * 4)))
+        self.x0, self.y0 = caixas[:, 0].min(), caixas[:, 1].min()
+        self.dx = (caixas[:, 2].max() - self.x0) / self.n or 1.0
+        self.dy = (caixas[:, 3].max() - self.y0) / self.n or 1.0
+
+        # listas de candidatas por célula em formato CSR (inicio/candidatas)
+        por_celula = [[] for _ in range(self.n * self.n)]
+        for parte, (bx0, by0, bx1, by1) in enumerate(caixas):
+            i0, i1 = self._coluna(bx0), self._coluna(bx1)
+            j0, j1 = self._linha(by0), self._linha(by1)
+            for j in range(j0, j1 + 1):
+                for i in range(i0, i1 + 1):
+                    por_celula[j * self.n + i].append(parte)
+        self.inicio = np.cumsum([0] + [len(c) for c in por_celula])
+        self.candidatas = np.array([p for c in por_celula for p in c], dtype=np.int64)
+
+    @classmethod
+    def do_geojson(cls, caminho=GEOJSON_BAIRROS, campo_nome=CAMPO_NOME):
+        return cls(*carregar_bairros(caminho, campo_nome))
+
+    def _coluna(self, x):
+        return np.clip(((np.asarray(x) - self.x0) // self.dx).astype(np.int64), 0, self.n - 1)
+
+    def _linha(self, y):
+        return np.clip(((np.asarray(y) - self.y0) // self.dy).astype(np.int64), 0, self.n - 1)
+
+    def localizar(self, lon, lat):
+        """
+        Índice do bairro (em self.nomes) de cada ponto, ou SEM_BAIRRO (-1) para pontos
+        fora de todos os polígonos ou sem coordenada.
+        """
+        x = np.asarray(lon, dtype=np.float64)
+        y = np.asarray(lat, dtype=np.float64)
+        resultado = np.full(len(x), SEM_BAIRRO, dtype=np.int64)
+
+        validos = np.flatnonzero(
+            np.isfinite(x) & np.isfinite(y)
+            & (x >= self.x0) & (x <= self.x0 + self.dx * self.n)
+            & (y >= self.y0) & (y <= self.y0 + self.dy * self.n)
+        )
+        if not len(validos):
+            return resultado
+
+        celula = self._linha(y[validos]) * self.n + self._coluna(x[validos])
+        ordem = np.argsort(celula, kind="stable")
+        pontos = validos[ordem]
+        celulas, inicios = np.unique(celula[ordem], return_index=True)
+        fins = np.append(inicios[1:], len(pontos))
+
+        for c, ini, fim in zip(celulas, inicios, fins):
+            pendentes = pontos[ini:fim]
+            for parte in self.candidatas[self.inicio[c]:self.inicio[c + 1]]:
+                bx0, by0, bx1, by1 = self.caixas[parte]
+                px, py = x[pendentes], y[pendentes]
+                na_caixa = np.flatnonzero((px >= bx0) & (px <= bx1) & (py >= by0) & (py <= by1))
+                if not len(na_caixa):
+                    continue
+                dentro = na_caixa[pontos_no_poligono(px[na_caixa], py[na_caixa], self.arestas[parte])]
+                resultado[pendentes[dentro]] = self.bairro_da_parte[parte]
+                pendentes = np.delete(pendentes, dentro)
+                if not len(pendentes):
+                    break
+        return resultado
+
+    def nomes_de(self, indices):
+        """Converte o resultado de localizar() em nomes de bairro (None fora dos bairros)."""
+        return [self.nomes[i] if i != SEM_BAIRRO else None for i in indices]
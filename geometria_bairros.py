@@ -0,0 +1,145 @@
+"""
+Geometria dos bairros preparada uma vez, na montagem do banco, para o mapa coroplético.
+
+Os polígonos do geojson são simplificados (Douglas-Peucker) em alguns níveis de
+detalhe e as coordenadas são quantizadas (arredondadas a CASAS_DECIMAIS, com vértices
+repetidos removidos). Cada nível vira um FeatureCollection compacto, com o nome do
+bairro no `id` da feição e sem propriedades: o valor de cada bairro vai separado, na
+figura, e só ele muda quando o ano ou o indicador mudam.
+"""
+import json
+import os
+
+import numpy as np
+
+from geocodificacao import GEOJSON_BAIRROS, carregar_bairros
+
+# tolerância de simplificação (graus) de cada nível: 0 = só quantizado;
+# 0.0001° ≈ 10 m e 0.0005° ≈ 50 m na latitude de Ribeirão Preto
+NIVEIS_DETALHE = (0.0, 0.0001, 0.0005)
+CASAS_DECIMAIS = 5  # ≈ 1 m
+# mais vértices que isso e o mapa usa um nível mais simplificado
+ORCAMENTO_VERTICES = 20_000
+
+# pasta servida pelo Streamlit em app/static/ (server.enableStaticServing)
+DIR_ESTATICO = "static"
+ARQUIVO_ESTATICO = "bairros_{municipio}_nivel{nivel}.json"
+
+KM_POR_GRAU = 111.32
+
+
+def _douglas_peucker(pontos, tolerancia):
+    manter = np.zeros(len(pontos), dtype=bool)
+    manter[[0, -1]] = True
+    pilha = [(0, len(pontos) - 1)]
+    while pilha:
+        i, j = pilha.pop()
+        if j <= i + 1:
+            continue
+        a, segmento = pontos[i], pontos[j] - pontos[i]
+        meio = pontos[i + 1:j] - a
+        norma = np.hypot(*segmento)
+        if norma == 0:
+            distancia = np.hypot(meio[:, 0], meio[:, 1])
+        else:
+            distancia = np.abs(segmento[0] * meio[:, 1] - segmento[1] * meio[:, 0]) / norma
+        k = int(np.argmax(distancia))
+        if distancia[k] > tolerancia:
+            manter[i + 1 + k] = True
+            pilha += [(i, i + 1 + k), (i + 1 + k, j)]
+    return pontos[manter]
+
+
+def simplificar_anel(anel, tolerancia):
+    """
+    Simplifica um anel fechado. Ele é partido no vértice mais distante do primeiro,
+    para que o Douglas-Peucker tenha dois trechos abertos. Um anel que ficaria
+    degenerado (menos de 4 vértices) volta inalterado.
+    """
+    if tolerancia <= 0 or len(anel) <= 4:
+        return anel
+    k = int(np.argmax(np.hypot(*(anel - anel[0]).T)))
+    if k == 0:
+        return anel
+    resultado = np.vstack([_douglas_peucker(anel[:k + 1], tolerancia), _douglas_peucker(anel[k:], tolerancia)[1:]])
+    return resultado if len(resultado) >= 4 else anel
+
+
+def quantizar_anel(anel, casas=CASAS_DECIMAIS):
+    anel = np.round(anel, casas)
+    repetido = np.r_[False, np.all(anel[1:] == anel[:-1], axis=1)]
+    anel = anel[~repetido]
+    return anel if len(anel) >= 4 else None
+
+
+def _feicoes(nomes, partes, tolerancia, casas):
+    por_bairro = {}
+    for indice, aneis in partes:
+        novos = [quantizar_anel(simplificar_anel(anel, tolerancia), casas) for anel in aneis]
+        if novos[0] is None:  # polígono menor que a quantização
+            continue
+        por_bairro.setdefault(indice, []).append([anel.tolist() for anel in novos if anel is not None])
+    feicoes, vertices = [], 0
+    for indice, poligonos in por_bairro.items():
+        vertices += sum(len(anel) for poligono in poligonos for anel in poligono)
+        if len(poligonos) == 1:
+            geometria = {"type": "Polygon", "coordinates": poligonos[0]}
+        else:
+            geometria = {"type": "MultiPolygon", "coordinates": poligonos}
+        feicoes.append({"type": "Feature", "id": nomes[indice], "properties": {}, "geometry": geometria})
+    return feicoes, vertices
+
+
+def gerar_niveis(caminho=GEOJSON_BAIRROS, niveis=NIVEIS_DETALHE, casas=CASAS_DECIMAIS):
+    """
+    Lista de (nível, tolerância, nº de vértices, geojson serializado), do mais
+    detalhado ao mais simplificado.
+    """
+    nomes, partes = carregar_bairros(caminho)
+    resultado = []
+    for nivel, tolerancia in enumerate(niveis):
+        feicoes, vertices = _feicoes(nomes, partes, tolerancia, casas)
+        texto = json.dumps({"type": "FeatureCollection", "features": feicoes}, ensure_ascii=False, separators=(",", ":"))
+        resultado.append((nivel, tolerancia, vertices, texto))
+    return resultado
+
+
+def escolher_nivel(niveis, orcamento=ORCAMENTO_VERTICES):
+    """Nível mais detalhado que cabe no orçamento de vértices (ou o mais simples de todos)."""
+    for nivel, _, vertices, _ in niveis:
+        if vertices <= orcamento:
+            return nivel
+    return niveis[-1][0]
+
+
+def _area_km2(anel, lat_ref):
+    x = anel[:, 0] * KM_POR_GRAU * np.cos(np.radians(lat_ref))
+    y = anel[:, 1] * KM_POR_GRAU
+    return abs(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])) / 2
+
+
+def medidas_bairros(caminho=GEOJSON_BAIRROS):
+    """(nome, área em km², latitude, longitude do centro) de cada bairro do geojson."""
+    nomes, partes = carregar_bairros(caminho)
+    medidas = {}
+    for indice, aneis in partes:
+        lat_ref = aneis[0][:, 1].mean()
+        area = _area_km2(aneis[0], lat_ref) - sum(_area_km2(furo, lat_ref) for furo in aneis[1:])
+        centro = aneis[0][:-1].mean(axis=0)
+        anterior = medidas.get(indice)
+        if anterior is None or area > anterior[1]:  # centro da maior parte
+            medidas[indice] = (area + (anterior[0] if anterior else 0), area, centro)
+        else:
+            medidas[indice] = (anterior[0] + area, anterior[1], anterior[2])
+    return [(nomes[i], total, centro[1], centro[0]) for i, (total, _, centro) in medidas.items()]
+
+
+def exportar_estatico(niveis, municipio, diretorio=DIR_ESTATICO):
+    """Grava cada nível do município em static/, de onde o navegador o baixa uma vez e guarda em cache."""
+    os.makedirs(diretorio, exist_ok=True)
+    for nivel, _, _, texto in niveis:
+        destino = os.path.join(diretorio, ARQUIVO_ESTATICO.format(municipio=municipio, nivel=nivel))
+        temporario = destino + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+        os.replace(temporario, destino)
@@ -0,0 +1,49 @@
+"""
+KPIs do período (os cards do RESUMO), sem dependência de Streamlit ou Plotly:
+a página e a API JSON (api_dados.py) calculam os mesmos números daqui.
+"""
+import pandas as pd
+
+# KPI -> coluna de rollup_perfil / df_historico
+COLUNAS_KPI = {
+    'total_casos': 'casos_total',
+    'curados': 'curados',
+    'obitos_dengue': 'obitos_dengue',
+    'obitos_outras_causas': 'obitos_outras_causas',
+    'ign_branco': 'ign_branco',
+    'obitos_investigacao': 'obitos_investigacao',
+}
+# KPIs comparados com o ano anterior e se subir é ruim (casos, óbitos) ou bom (curados)
+DELTAS_KPI = {'total_casos': 'ruim', 'curados': 'bom', 'obitos_dengue': 'ruim'}
+
+
+def calcular_delta(atual, anterior):
+    """(diferença, variação em %) contra o ano anterior, ou None sem base de comparação."""
+    if anterior is None or pd.isna(anterior) or anterior == 0:
+        return None
+    diferenca = atual - anterior
+    return diferenca, diferenca / anterior * 100
+
+
+def kpis_periodo(df_perfil, df_historico, ano):
+    """
+    Totais do período e, para um ano específico, a variação dos KPIs de DELTAS_KPI
+    contra o ano anterior: {'deltas': {kpi: {'anterior', 'diferenca', 'percentual', 'tipo'}}}.
+    """
+    try:
+        kpis = {kpi: int(df_perfil[coluna].iloc[0]) for kpi, coluna in COLUNAS_KPI.items()}
+    except Exception:
+        kpis = dict.fromkeys(COLUNAS_KPI, 0)
+    kpis['sem_desfecho'] = kpis['ign_branco'] + kpis['obitos_investigacao']
+
+    kpis['deltas'] = {}
+    if ano != "Todos os Anos":
+        df_prev = df_historico[df_historico['ano'] == int(ano) - 1]
+        if not df_prev.empty:
+            for kpi, tipo in DELTAS_KPI.items():
+                anterior = int(df_prev[COLUNAS_KPI[kpi]].iloc[0])
+                delta = calcular_delta(kpis[kpi], anterior)
+                if delta is not None:
+                    kpis['deltas'][kpi] = {'anterior': anterior, 'diferenca': delta[0],
+                                           'percentual': round(delta[1], 1), 'tipo': tipo}
+    return kpis
@@ -0,0 +1,151 @@
+"""
+Leitura das séries das estações meteorológicas (chuva, temperatura e umidade).
+
+Aceita o CSV horário do INMET (BDMEP/dados históricos: linhas de metadados antes do
+cabeçalho, ; como separador, vírgula decimal, -9999 para dado ausente) e CSVs
+diários simples com colunas data, chuva_mm, temperatura, temp_min, temp_max e
+umidade. Registros horários viram diários (chuva somada, temperatura e umidade
+médias, extremos de temperatura) e, com várias estações no mesmo município, os
+dias são a média das estações com dado.
+"""
+import csv
+import unicodedata
+from collections import defaultdict
+from datetime import timedelta
+
+from ingestao_sinan import CODIFICACAO_PADRAO, data_de, decimal_de
+from series_epi import semana_epi_de
+
+# variáveis gravadas em clima_diario (na mesma ordem das tuplas, depois da data)
+VARIAVEIS_CLIMA = ("chuva_mm", "temperatura", "temp_min", "temp_max", "umidade")
+
+# variável -> prefixos aceitos no cabeçalho (sem acento, em maiúsculas), em ordem de
+# preferência; cada coluna serve a uma variável só, e as de extremos vêm antes para
+# que "TEMPERATURA MAXIMA..." não seja lida como temperatura média
+_COLUNAS_CLIMA = (
+    ("data", ("DATA",)),
+    ("municipio", ("COD MUNICIPIO", "CODIGO MUNICIPIO")),
+    ("chuva_mm", ("PRECIPITACAO TOTAL", "PRECIPITACAO", "CHUVA")),
+    ("temp_max", ("TEMPERATURA MAXIMA", "TEMP MAX")),
+    ("temp_min", ("TEMPERATURA MINIMA", "TEMP MIN")),
+    ("temperatura", ("TEMPERATURA DO AR", "TEMPERATURA MEDIA", "TEMP MEDIA", "TEMPERATURA", "TEMP")),
+    ("umidade", ("UMIDADE RELATIVA DO AR, HORARIA", "UMIDADE RELATIVA", "UMIDADE")),
+)
+# o INMET grava -9999 nas horas sem leitura
+_AUSENTE = -9999
+
+
+def _normalizar_coluna(nome):
+    sem_acento = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode()
+    return " ".join(sem_acento.replace("_", " ").upper().split())
+
+
+def mapear_colunas(cabecalho):
+    """{variável: índice da coluna} reconhecidas no cabeçalho (ver _COLUNAS_CLIMA)."""
+    nomes = [_normalizar_coluna(coluna) for coluna in cabecalho]
+    usadas, indices = set(), {}
+    for variavel, prefixos in _COLUNAS_CLIMA:
+        for prefixo in prefixos:
+            indice = next((i for i, nome in enumerate(nomes) if i not in usadas and nome.startswith(prefixo)), None)
+            if indice is not None:
+                indices[variavel] = indice
+                usadas.add(indice)
+                break
+    return indices
+
+
+def _codificacao(caminho):
+    # o INMET exporta em latin-1; planilhas salvas hoje em dia costumam vir em UTF-8 (com BOM)
+    with open(caminho, "rb") as arquivo:
+        amostra = arquivo.read(64 * 1024)
+    try:
+        amostra.decode("utf-8")
+        return "utf-8-sig"
+    except UnicodeDecodeError as erro:
+        # a amostra pode ter cortado um caractere no meio
+        return "utf-8-sig" if erro.start >= len(amostra) - 3 else CODIFICACAO_PADRAO
+
+
+def _linhas(caminho, encoding):
+    """Linhas do CSV a partir do cabeçalho (a primeira linha com uma coluna DATA que não seja metadado)."""
+    with open(caminho, newline="", encoding=encoding or _codificacao(caminho), errors="replace") as arquivo:
+        amostra = arquivo.read(64 * 1024)
+        arquivo.seek(0)
+        # os metadados do INMET (REGIAO:;SE) confundem o Sniffer: o ; ganha quando aparece
+        delimitador = ";" if ";" in amostra else ","
+        leitor = csv.reader(arquivo, delimiter=delimitador)
+        for linha in leitor:
+            if any(_normalizar_coluna(c).startswith("DATA") and not c.strip().endswith(":") for c in linha):
+                yield linha
+                yield from leitor
+                return
+
+
+def ler_estacao(caminho, encoding=None):
+    """
+    {(cod_municipio ou None, data): {variável: valor}} de um arquivo de estação, já
+    agregado por dia. Sem coluna de município no arquivo, a chave leva None. Sem
+    `encoding`, UTF-8 ou latin-1 conforme o conteúdo.
+    """
+    linhas = _linhas(caminho, encoding)
+    indices = mapear_colunas(next(linhas, []))
+    if "data" not in indices:
+        raise ValueError(f"'{caminho}': cabeçalho sem coluna de data.")
+
+    somas = defaultdict(lambda: defaultdict(float))
+    contagens = defaultdict(lambda: defaultdict(int))
+    extremos = defaultdict(dict)
+    for linha in linhas:
+        if len(linha) <= indices["data"]:
+            continue
+        dia = data_de(linha[indices["data"]].replace("/", "-"))
+        if dia is None:
+            continue
+        municipio = None
+        if "municipio" in indices and indices["municipio"] < len(linha):
+            municipio = linha[indices["municipio"]].strip()[:6] or None
+        chave = (municipio, dia)
+        for variavel in VARIAVEIS_CLIMA:
+            if variavel not in indices or indices[variavel] >= len(linha):
+                continue
+            valor = decimal_de(linha[indices[variavel]])
+            if valor is None or valor <= _AUSENTE:
+                continue
+            if variavel == "temp_max":
+                extremos[chave][variavel] = max(valor, extremos[chave].get(variavel, valor))
+            elif variavel == "temp_min":
+                extremos[chave][variavel] = min(valor, extremos[chave].get(variavel, valor))
+            else:
+                somas[chave][variavel] += valor
+                contagens[chave][variavel] += 1
+
+    diarios = {}
+    for chave in somas.keys() | extremos.keys():
+        registro = dict(extremos.get(chave, {}))
+        for variavel, soma in somas.get(chave, {}).items():
+            # chuva do dia é a soma das horas; o resto, a média das leituras
+            registro[variavel] = soma if variavel == "chuva_mm" else soma / contagens[chave][variavel]
+        diarios[chave] = registro
+    return diarios
+
+
+def dias_do_municipio(caminhos, cod_municipio, encoding=None):
+    """
+    Tuplas (cod_municipio, data, ano, mes, semana_epi, inicio_semana, *VARIAVEIS_CLIMA)
+    com a média diária das estações dos arquivos. Arquivos sem coluna de município
+    são atribuídos a `cod_municipio`.
+    """
+    por_dia = defaultdict(lambda: defaultdict(list))
+    for caminho in caminhos:
+        for (municipio, dia), registro in ler_estacao(caminho, encoding).items():
+            for variavel, valor in registro.items():
+                por_dia[(municipio or cod_municipio, dia)][variavel].append(valor)
+
+    linhas = []
+    for (municipio, dia), valores in sorted(por_dia.items()):
+        inicio = dia - timedelta(days=(dia.weekday() + 1) % 7)  # domingo da SE
+        linhas.append((
+            municipio, dia.isoformat(), dia.year, dia.month, semana_epi_de(dia), inicio.isoformat(),
+            *(sum(valores[v]) / len(valores[v]) if valores.get(v) else None for v in VARIAVEIS_CLIMA),
+        ))
+    return linhas
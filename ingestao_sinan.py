@@ -0,0 +1,206 @@
+import csv
+import os
+from datetime import date, datetime
+from itertools import islice
+
+from series_epi import semana_epi_de
+
+# --- CONFIGURAÇÕES DA INGESTÃO ---
+TAMANHO_LOTE = 50_000          # linhas por executemany
+CODIFICACAO_PADRAO = "latin-1"  # exportações do DataSUS/TabWin não vêm em UTF-8
+
+# colunas gravadas na tabela notificacoes_dengue (na mesma ordem das tuplas)
+COLUNAS_NOTIFICACAO = (
+    "id_notificacao", "id_municipio", "dt_notificacao", "ano", "mes", "semana_epi",
+    "sexo", "idade_anos", "evolucao", "classificacao", "bairro", "nome_regiao",
+    "latitude", "longitude",
+)
+
+# colunas de coordenadas das exportações geocodificadas (a ficha do SINAN não as traz)
+_COLUNAS_LATITUDE = ("LATITUDE", "NU_LATITUDE", "LAT")
+_COLUNAS_LONGITUDE = ("LONGITUDE", "NU_LONGITUDE", "LON", "LNG")
+
+# distritos de saúde do SINAN municipal -> nomes de região usados no painel
+_REGIOES_DISTRITO = {
+    "NORTE": "Norte", "SUL": "Sul", "LESTE": "Leste", "OESTE": "Oeste",
+    "CENTRO": "Centro", "CENTRAL": "Centro",
+}
+
+_FORMATOS_DATA = ("%Y-%m-%d", "%d/%m/%Y", "%Y%m%d", "%d-%m-%Y")
+
+
+def ler_registros(caminho, encoding=CODIFICACAO_PADRAO):
+    """
+    Itera sobre as linhas brutas de uma exportação do SINAN (CSV ou DBF), uma por vez.
+
+    As chaves são devolvidas em maiúsculas (NU_NOTIFIC, DT_NOTIFIC, CS_SEXO...), que é
+    o padrão dos arquivos do DataSUS. Nada é carregado inteiro na memória.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == ".dbf":
+        yield from _ler_dbf(caminho, encoding)
+    else:
+        yield from _ler_csv(caminho, encoding)
+
+
+def _ler_csv(caminho, encoding):
+    with open(caminho, newline="", encoding=encoding, errors="replace") as arquivo:
+        amostra = arquivo.read(64 * 1024)
+        arquivo.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;|\t")
+        except csv.Error:
+            dialeto = csv.excel
+        leitor = csv.reader(arquivo, dialeto)
+        cabecalho = [coluna.strip().upper() for coluna in next(leitor, [])]
+        for linha in leitor:
+            yield dict(zip(cabecalho, linha))
+
+
+def _ler_dbf(caminho, encoding):
+    try:
+        from dbfread import DBF
+    except ImportError as erro:
+        raise RuntimeError("Leitura de arquivos .dbf requer o pacote 'dbfread' (pip install dbfread).") from erro
+
+    # load=False mantém a leitura em streaming, registro a registro
+    for registro in DBF(caminho, encoding=encoding, load=False, char_decode_errors="replace"):
+        yield {chave.upper(): valor for chave, valor in registro.items()}
+
+
+def _texto(valor):
+    if valor is None:
+        return ""
+    return str(valor).strip()
+
+
+def _inteiro(valor):
+    texto = _texto(valor)
+    if not texto:
+        return None
+    try:
+        return int(float(texto))
+    except ValueError:
+        return None
+
+
+def decimal_de(valor):
+    """Número de um campo texto, com vírgula ou ponto decimal; None se vazio ou inválido."""
+    texto = _texto(valor).replace(",", ".")
+    if not texto:
+        return None
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+
+def _coordenada(bruto, colunas, limite):
+    for coluna in colunas:
+        valor = decimal_de(bruto.get(coluna))
+        if valor is not None:
+            return valor if -limite <= valor <= limite and valor != 0 else None
+    return None
+
+
+def data_de(valor):
+    """
+    Data (date) de um campo do SINAN ou de planilha: datetime/date, AAAA-MM-DD,
+    DD/MM/AAAA, AAAAMMDD ou DD-MM-AAAA; None se não reconhecida.
+    """
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = _texto(valor)[:10]
+    for formato in _FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _idade_em_anos(valor):
+    """
+    Decodifica NU_IDADE_N do SINAN: o 1º dígito é a unidade (1=hora, 2=dia, 3=mês, 4=ano)
+    e os demais são o valor. Idades abaixo de um ano viram 0.
+    """
+    codigo = _inteiro(valor)
+    if codigo is None or codigo < 1000:
+        return None
+    unidade, quantidade = divmod(codigo, 1000)
+    if unidade == 4:
+        return quantidade
+    if unidade in (1, 2, 3):
+        return 0
+    return None
+
+
+def _semana_epi(bruto, dt_notificacao):
+    # SEM_NOT vem como AAAASS; na falta dele calculamos a SE (domingo a sábado) da notificação
+    semana = _inteiro(bruto.get("SEM_NOT"))
+    if semana and semana > 100000:
+        return semana
+    if dt_notificacao is None:
+        return None
+    return semana_epi_de(dt_notificacao)
+
+
+def normalizar_registro(bruto, descartes=None):
+    """
+    Converte uma linha bruta do SINAN na tupla de COLUNAS_NOTIFICACAO.
+
+    Retorna None para linhas sem data ou sem número de notificação: não entram em
+    nenhuma contagem e, com `descartes` (um Counter), são contadas por motivo.
+    A chave (id_notificacao) é o município notificador + NU_NOTIFIC + a data, porque
+    o SINAN numera as fichas por município notificador; o de residência só define a
+    partição (id_municipio).
+    """
+    dt_notificacao = data_de(bruto.get("DT_NOTIFIC"))
+    numero = _texto(bruto.get("NU_NOTIFIC"))
+    if dt_notificacao is None or not numero:
+        if descartes is not None:
+            descartes["sem data de notificação" if dt_notificacao is None else "sem NU_NOTIFIC"] += 1
+        return None
+
+    id_municipio = _texto(bruto.get("ID_MN_RESI") or bruto.get("ID_MUNICIP"))[:6]
+    # exportações sem a coluna do notificador (ex.: recortes municipais) usam a residência
+    notificador = _texto(bruto.get("ID_MUNICIP"))[:6] or id_municipio
+    id_notificacao = f"{notificador}-{numero}-{dt_notificacao.isoformat()}"
+
+    sexo = _texto(bruto.get("CS_SEXO")).upper()[:1] or None
+    distrito = _texto(bruto.get("NM_REGIAO") or bruto.get("REGIAO") or bruto.get("DISTRITO")).upper()
+
+    return (
+        id_notificacao,
+        id_municipio or None,
+        dt_notificacao.isoformat(),
+        dt_notificacao.year,
+        dt_notificacao.month,
+        _semana_epi(bruto, dt_notificacao),
+        sexo,
+        _idade_em_anos(bruto.get("NU_IDADE_N")),
+        _inteiro(bruto.get("EVOLUCAO")),
+        _inteiro(bruto.get("CLASSI_FIN")),
+        _texto(bruto.get("NM_BAIRRO")).upper() or None,
+        _REGIOES_DISTRITO.get(distrito),
+        _coordenada(bruto, _COLUNAS_LATITUDE, 90),
+        _coordenada(bruto, _COLUNAS_LONGITUDE, 180),
+    )
+
+
+def lotes_normalizados(caminhos, tamanho_lote=TAMANHO_LOTE, encoding=CODIFICACAO_PADRAO, descartes=None):
+    """
+    Gera listas de até `tamanho_lote` tuplas normalizadas a partir de vários arquivos.
+    Só um lote fica em memória por vez, independente do tamanho das exportações.
+    Linhas descartadas são contadas em `descartes` (ver normalizar_registro).
+    """
+    for caminho in caminhos:
+        registros = (normalizar_registro(bruto, descartes) for bruto in ler_registros(caminho, encoding))
+        registros = (registro for registro in registros if registro is not None)
+        while True:
+            lote = list(islice(registros, tamanho_lote))
+            if not lote:
+                break
+            yield lote
@@ -0,0 +1,141 @@
+"""
+Medição de desempenho por execução (rerun) do dashboard.
+
+Cada execução do script ganha uma `Execucao`, que cronometra seções nomeadas
+(carga de dados, filtragem, construção de cada figura, envio de cada gráfico) e
+conta acertos e faltas de cache. No fim da execução o registro vai, como uma linha
+JSON, para o arquivo de log e fica disponível para o painel de depuração da sidebar.
+
+O custo é de alguns time.perf_counter() por seção e uma linha de arquivo por
+execução, pequeno o bastante para ficar ligado em produção. O arquivo não cresce sem
+limite: ao passar de LIMITE_LOG_MB, vira "<arquivo>.1" (substituindo o anterior) e
+um arquivo novo começa, então o log ocupa no máximo cerca de duas vezes o limite.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# arquivo JSONL com uma linha por execução; RIBEIRAO_LOG_DESEMPENHO="" desliga o log
+ARQUIVO_LOG = os.environ.get("RIBEIRAO_LOG_DESEMPENHO", os.path.join("logs", "desempenho.jsonl"))
+# tamanho a partir do qual o log é rotacionado para "<arquivo>.1"
+LIMITE_LOG_MB = float(os.environ.get("RIBEIRAO_LOG_DESEMPENHO_MB", "5"))
+
+_local = threading.local()
+_lock_arquivo = threading.Lock()
+
+
+class Execucao:
+    """Medições de uma execução do script (uma sessão, um rerun)."""
+
+    def __init__(self, sessao, rerun, **contexto):
+        self.sessao = sessao
+        self.rerun = rerun
+        self.contexto = contexto
+        self.inicio = time.perf_counter()
+        self.secoes = {}     # nome -> ms (somados, se a seção se repetir)
+        self.graficos = {}   # nome -> {'bytes', 'construir_ms', 'emitir_ms', 'cache'}
+        self.cache = {'acertos': 0, 'faltas': 0}
+        self.faltas_recursos = []  # funções st.cache_resource cujo corpo rodou nesta execução
+        self.total_ms = None
+
+    @contextmanager
+    def secao(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.secoes[nome] = self.secoes.get(nome, 0.0) + (time.perf_counter() - inicio) * 1000
+
+    def medir_construcao(self, nome, construir):
+        """
+        Envolve o construir() de uma figura ou frame memoizado: se ele rodar, conta uma
+        falta e cronometra a seção "construir:<nome>"; se não rodar, foi um acerto.
+        """
+        self.cache['acertos'] += 1
+
+        def construir_medido():
+            self.cache['acertos'] -= 1
+            self.cache['faltas'] += 1
+            with self.secao(f"construir:{nome}"):
+                return construir()
+        return construir_medido
+
+    def registrar_grafico(self, nome, tamanho, emitir_ms):
+        self.graficos[nome] = {
+            'bytes': tamanho,
+            'construir_ms': round(self.secoes.get(f"construir:{nome}", 0.0), 2),
+            'emitir_ms': round(emitir_ms, 2),
+            'cache': 'falta' if f"construir:{nome}" in self.secoes else 'acerto',
+        }
+
+    def como_dict(self):
+        total_ms = self.total_ms if self.total_ms is not None else (time.perf_counter() - self.inicio) * 1000
+        return {
+            'instante': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'sessao': self.sessao,
+            'rerun': self.rerun,
+            **self.contexto,
+            'total_ms': round(total_ms, 2),
+            'secoes': {nome: round(ms, 2) for nome, ms in self.secoes.items()},
+            'graficos': self.graficos,
+            'cache': dict(self.cache),
+            'faltas_recursos': list(self.faltas_recursos),
+            'bytes_graficos': sum(g['bytes'] for g in self.graficos.values()),
+        }
+
+    def finalizar(self, **extras):
+        """Fecha a execução, grava a linha do log e devolve o registro."""
+        self.total_ms = (time.perf_counter() - self.inicio) * 1000
+        registro = {**self.como_dict(), **extras}
+        gravar_registro(registro)
+        _local.execucao = None
+        return registro
+
+
+def iniciar(sessao, rerun, **contexto):
+    """Começa a medição da execução atual (uma por thread: o Streamlit roda cada sessão numa thread)."""
+    _local.execucao = Execucao(sessao, rerun, **contexto)
+    return _local.execucao
+
+
+def atual():
+    return getattr(_local, 'execucao', None)
+
+
+def marcar_falta(recurso):
+    """Chamado dentro do corpo de funções em st.cache_resource: só roda quando o cache falha."""
+    execucao = atual()
+    if execucao is not None:
+        execucao.faltas_recursos.append(recurso)
+
+
+def registrar_tempos(prefixo, tempos):
+    """Soma tempos medidos fora da thread da execução (ex.: carga paralela) como seções "<prefixo>:<nome>"."""
+    execucao = atual()
+    if execucao is not None:
+        for nome, ms in tempos.items():
+            chave = f"{prefixo}:{nome}"
+            execucao.secoes[chave] = execucao.secoes.get(chave, 0.0) + ms
+
+
+def gravar_registro(registro, caminho=None, limite_mb=None):
+    """Acrescenta o registro ao log JSONL, rotacionando para "<caminho>.1" ao passar de `limite_mb`."""
+    caminho = ARQUIVO_LOG if caminho is None else caminho
+    limite_mb = LIMITE_LOG_MB if limite_mb is None else limite_mb
+    if not caminho:
+        return
+    linha = json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+    try:
+        with _lock_arquivo:
+            pasta = os.path.dirname(caminho)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            with open(caminho, "a", encoding="utf-8") as arquivo:
+                arquivo.write(linha)
+                tamanho = arquivo.tell()
+            if limite_mb > 0 and tamanho >= limite_mb * 1024 * 1024:
+                os.replace(caminho, caminho + ".1")
+    except OSError:
+        pass  # medir nunca pode derrubar o dashboard
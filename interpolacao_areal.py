@@ -0,0 +1,192 @@
+"""
+Interpolação areal dos setores censitários do IBGE para os bairros, sem GIS.
+
+A parte cara é a sobreposição das duas malhas: cada setor é amostrado numa grade
+regular dentro da sua caixa envolvente, os pontos que caem no setor são localizados
+nos bairros (índice em grade + ray casting, ver geocodificacao.py) e a fração da
+área do setor em cada bairro vira um peso. Os pesos formam uma matriz esparsa
+setores x bairros (em COO: linha, coluna, peso) que fica gravada no banco junto com
+a assinatura dos dois geojson.
+
+Com a matriz pronta, interpolar qualquer variável é um produto matriz esparsa x
+vetor (um np.bincount): variáveis novas do censo ou uma carga nova de dados por setor
+não refazem a sobreposição, só uma mudança nos limites dos setores ou dos bairros.
+"""
+import csv
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from geocodificacao import SEM_BAIRRO, IndiceGrade, arestas, carregar_bairros, pontos_no_poligono
+
+CAMPO_SETOR = "CD_SETOR"
+# pontos por eixo na grade de cada setor (32 x 32 = 1024 amostras na caixa envolvente)
+AMOSTRAS_POR_EIXO = 32
+
+# nomes das colunas dos agregados por setor do IBGE (Censo 2022) -> nome no banco;
+# as demais colunas numéricas entram com o próprio nome
+COLUNAS_SETOR = {
+    'cd_setor': 'cod_setor',
+    'v0001': 'populacao',
+    'v0002': 'domicilios',
+}
+# contagens: o bairro recebe a soma ponderada pela área; as demais variáveis (renda
+# per capita, médias) são médias ponderadas pela população interpolada. A pirâmide
+# etária entra como contagens pop_<faixa> (faixas de padronizacao_etaria.py)
+VARIAVEIS_EXTENSIVAS = ('populacao', 'domicilios')
+PREFIXO_PIRAMIDE = 'pop_'
+
+
+def normalizar_setor(codigo):
+    # os arquivos de 2022 trazem o código às vezes com um "P" (prévia) no fim
+    return str(codigo).strip().upper().removesuffix("P")
+
+
+@dataclass(frozen=True)
+class MatrizPesos:
+    """
+    Pesos setor -> bairro em formato COO: `peso[k]` é a fração da área do setor
+    `setores[linha[k]]` que está no bairro `bairros[coluna[k]]`. A soma de uma linha
+    é menor que 1 quando parte do setor fica fora de todos os bairros.
+    """
+    setores: tuple
+    bairros: tuple
+    linha: np.ndarray
+    coluna: np.ndarray
+    peso: np.ndarray
+
+    def aplicar(self, valores):
+        """Produto W^T x: vetor por setor (na ordem de `setores`) -> vetor por bairro."""
+        valores = np.nan_to_num(np.asarray(valores, dtype=np.float64))
+        return np.bincount(self.coluna, weights=self.peso * valores[self.linha], minlength=len(self.bairros))
+
+    def registros(self):
+        """(cod_setor, nome_bairro, peso) de cada par com peso, para gravar no banco."""
+        return [
+            (self.setores[i], self.bairros[j], float(p))
+            for i, j, p in zip(self.linha.tolist(), self.coluna.tolist(), self.peso)
+        ]
+
+    @classmethod
+    def de_registros(cls, registros):
+        """Reconstrói a matriz a partir das linhas (cod_setor, nome_bairro, peso) do banco."""
+        setores, bairros, pesos = zip(*registros) if registros else ((), (), ())
+        codigos_setor, linha = np.unique(np.array(setores, dtype=object), return_inverse=True)
+        codigos_bairro, coluna = np.unique(np.array(bairros, dtype=object), return_inverse=True)
+        return cls(
+            tuple(codigos_setor), tuple(codigos_bairro),
+            linha.astype(np.int64), coluna.astype(np.int64), np.asarray(pesos, dtype=np.float64),
+        )
+
+
+def assinatura_malhas(*caminhos):
+    """SHA-1 do conteúdo dos arquivos de geometria: muda só se algum limite mudar."""
+    sha = hashlib.sha1()
+    for caminho in caminhos:
+        with open(caminho, "rb") as arquivo:
+            for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+                sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _amostras_da_parte(aneis, n=AMOSTRAS_POR_EIXO):
+    """
+    Centros de uma grade n x n na caixa envolvente da parte que caem dentro dela, e a
+    área (em graus²) que cada ponto representa. Uma parte fina demais para a grade
+    fica representada pelo centro dos vértices, com a área da própria caixa.
+    """
+    vertices = aneis[0]
+    (x0, y0), (x1, y1) = vertices.min(axis=0), vertices.max(axis=0)
+    dx, dy = (x1 - x0) / n, (y1 - y0) / n
+    gx, gy = np.meshgrid(x0 + dx * (np.arange(n) + 0.5), y0 + dy * (np.arange(n) + 0.5))
+    x, y = gx.ravel(), gy.ravel()
+    dentro = pontos_no_poligono(x, y, arestas(aneis))
+    if not dentro.any():
+        centro = vertices[:-1].mean(axis=0)
+        return centro[:1], centro[1:], (x1 - x0) * (y1 - y0)
+    return x[dentro], y[dentro], dx * dy
+
+
+def calcular_pesos(caminho_setores, caminho_bairros, campo_setor=CAMPO_SETOR, amostras=AMOSTRAS_POR_EIXO):
+    """
+    Sobreposição setores x bairros por amostragem: MatrizPesos com a fração da área de
+    cada setor em cada bairro. Setores com várias partes (MultiPolygon) somam as
+    áreas de todas elas.
+    """
+    setores, partes = carregar_bairros(caminho_setores, campo_setor)
+    setores = [normalizar_setor(codigo) for codigo in setores]
+    indice = IndiceGrade.do_geojson(caminho_bairros)
+
+    xs, ys, setor_do_ponto, area_do_ponto = [], [], [], []
+    for setor, aneis in partes:
+        x, y, area = _amostras_da_parte(aneis, amostras)
+        xs.append(x)
+        ys.append(y)
+        setor_do_ponto.append(np.full(len(x), setor, dtype=np.int64))
+        area_do_ponto.append(np.full(len(x), area))
+    x, y = np.concatenate(xs), np.concatenate(ys)
+    setor_do_ponto, area_do_ponto = np.concatenate(setor_do_ponto), np.concatenate(area_do_ponto)
+
+    bairro = indice.localizar(x, y)
+    area_setor = np.bincount(setor_do_ponto, weights=area_do_ponto, minlength=len(setores))
+    no_bairro = bairro != SEM_BAIRRO
+    par = setor_do_ponto[no_bairro] * len(indice.nomes) + bairro[no_bairro]
+    pares, area_par = np.unique(par, return_inverse=True)
+    area_par = np.bincount(area_par, weights=area_do_ponto[no_bairro])
+    linha, coluna = np.divmod(pares, len(indice.nomes))
+    return MatrizPesos(tuple(setores), tuple(indice.nomes), linha, coluna, area_par / area_setor[linha])
+
+
+def ler_dados_setores(caminho_csv):
+    """
+    {cod_setor: {variável: valor}} de um CSV de agregados por setor (separador ; e
+    decimal com vírgula, como nos arquivos do IBGE, ou o CSV padrão). Valores vazios
+    ou sigilosos ("X") ficam de fora.
+    """
+    with open(caminho_csv, newline="", encoding="utf-8-sig") as arquivo:
+        amostra = arquivo.read(4096)
+        arquivo.seek(0)
+        leitor = csv.DictReader(arquivo, dialect=csv.Sniffer().sniff(amostra, delimiters=",;"))
+        nomes = {coluna: COLUNAS_SETOR.get(coluna.strip().lower(), coluna.strip().lower()) for coluna in leitor.fieldnames}
+        dados = {}
+        for linha in leitor:
+            valores = {nomes[coluna]: texto for coluna, texto in linha.items() if coluna is not None}
+            codigo = valores.pop('cod_setor', None)
+            if not codigo:
+                continue
+            registro = {}
+            for variavel, texto in valores.items():
+                texto = (texto or "").strip()
+                if "," in texto:  # 1.234,5 -> 1234.5
+                    texto = texto.replace(".", "").replace(",", ".")
+                try:
+                    registro[variavel] = float(texto)
+                except ValueError:
+                    continue
+            dados[normalizar_setor(codigo)] = registro
+    return dados
+
+
+def interpolar(matriz, dados_setores):
+    """
+    {variável: array por bairro (na ordem de matriz.bairros)} a partir de
+    {cod_setor: {variável: valor}}. Contagens são somadas pelos pesos de área; as
+    outras variáveis viram médias ponderadas pela população interpolada (NaN no
+    bairro sem população com o dado).
+    """
+    variaveis = sorted({variavel for registro in dados_setores.values() for variavel in registro})
+    valores = {
+        variavel: np.array([dados_setores.get(setor, {}).get(variavel, np.nan) for setor in matriz.setores])
+        for variavel in variaveis
+    }
+    populacao = valores.get('populacao', np.ones(len(matriz.setores)))
+    resultado = {}
+    for variavel, valor in valores.items():
+        if variavel in VARIAVEIS_EXTENSIVAS or variavel.startswith(PREFIXO_PIRAMIDE):
+            resultado[variavel] = matriz.aplicar(valor)
+        else:
+            peso = np.where(np.isfinite(valor), np.nan_to_num(populacao), 0.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                resultado[variavel] = matriz.aplicar(peso * np.nan_to_num(valor)) / matriz.aplicar(peso)
+    return resultado
@@ -0,0 +1,116 @@
+"""
+Taxas de incidência padronizadas por idade (métodos direto e indireto), com
+intervalos de confiança, para comparar áreas com pirâmides etárias diferentes.
+
+Tudo é calculado de uma vez sobre arrays (área x ano x faixa etária): as somas por
+faixa, os pesos da população padrão e os limites dos intervalos são operações NumPy
+com broadcast, então padronizar centenas de bairros em todos os anos custa o mesmo
+que padronizar um. Os intervalos usam a aproximação de Wilson-Hilferty para os
+quantis da gama (sem scipy): Fay-Feuer na taxa direta e Byar na razão de incidência
+padronizada (indireta).
+"""
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+
+# faixas de dengue_faixa_etaria (colunas casos_<faixa>), na ordem das colunas
+FAIXAS_ETARIAS = (
+    'menor_um_ano', '1_a_4_anos', '5_a_9_anos', '10_a_14_anos', '15_a_19_anos', '20_a_39_anos',
+    '40_a_59_anos', '60_a_64_anos', '65_a_69_anos', '70_a_79_anos', 'maior_80_anos',
+)
+# população padrão da OMS (2000-2025, Ahmad et al.) reagrupada nas faixas acima, em
+# % do total; o grupo 0-4 anos foi repartido 1/5 para menores de um ano e 4/5 para 1-4
+POPULACAO_PADRAO_OMS = np.array([1.772, 7.088, 8.69, 8.60, 8.47, 30.91, 22.55, 3.72, 2.96, 3.73, 1.545])
+
+NIVEL_CONFIANCA = 0.95
+POR_HABITANTES = 100_000
+
+
+@dataclass(frozen=True)
+class TaxasPadronizadas:
+    """
+    Arrays (área, ano) na ordem de `areas` e `anos`; os intervalos têm um eixo a mais
+    na frente (limites inferior e superior). Taxas por POR_HABITANTES.
+    """
+    areas: tuple
+    anos: tuple
+    casos: np.ndarray
+    populacao: np.ndarray
+    bruta: np.ndarray
+    direta: np.ndarray
+    direta_ic: np.ndarray
+    esperados: np.ndarray
+    razao: np.ndarray      # razão de incidência padronizada (observados / esperados)
+    razao_ic: np.ndarray
+    indireta: np.ndarray   # razão x taxa bruta de referência (todas as áreas no ano)
+    indireta_ic: np.ndarray
+
+    def do_ano(self, ano):
+        """Índice do ano no eixo 1 (ValueError se ele não estiver nos dados)."""
+        return self.anos.index(ano)
+
+
+def _quantil_gama(forma, p, escala=1.0):
+    # Wilson-Hilferty: G(a, p) ≈ a (1 - 1/(9a) + z_p / (3 √a))³; forma 0 -> 0
+    z = NormalDist().inv_cdf(p)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        a = np.asarray(forma, dtype=np.float64)
+        quantil = a * np.clip(1 - 1 / (9 * a) + z / (3 * np.sqrt(a)), 0, None) ** 3 * escala
+    return np.where(a > 0, quantil, 0.0)
+
+
+def padronizar(casos, populacao, padrao=POPULACAO_PADRAO_OMS, nivel=NIVEL_CONFIANCA, por=POR_HABITANTES,
+               areas=(), anos=()):
+    """
+    Taxas bruta, padronizada direta e indireta de cada (área, ano).
+
+    `casos` é (área, ano, faixa); `populacao` é qualquer array que faça broadcast com
+    ele, tipicamente (área, 1, faixa) — a pirâmide do censo repetida em todos os anos.
+    `padrao` são os pesos da população padrão por faixa. A referência do método
+    indireto são as taxas por faixa de todas as áreas somadas em cada ano. Faixas sem
+    população na área não entram nas taxas dela.
+    """
+    casos = np.asarray(casos, dtype=np.float64)
+    populacao = np.broadcast_to(np.asarray(populacao, dtype=np.float64), casos.shape)
+    pesos = np.asarray(padrao, dtype=np.float64) / np.sum(padrao)
+    alfa = (1 - nivel) / 2
+    com_populacao = populacao > 0
+    casos_validos = np.where(com_populacao, casos, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        taxa_faixa = np.where(com_populacao, casos / populacao, 0.0)
+        observados = casos_validos.sum(axis=-1)
+        pessoas = populacao.sum(axis=-1)
+        bruta = observados / pessoas
+
+        # direto: soma das taxas por faixa ponderadas pela população padrão (Fay-Feuer)
+        direta = (pesos * taxa_faixa).sum(axis=-1)
+        variancia = (pesos ** 2 * np.where(com_populacao, casos / populacao ** 2, 0.0)).sum(axis=-1)
+        peso_maximo = np.where(com_populacao, pesos / populacao, 0.0).max(axis=-1)
+        inferior = np.where(direta > 0, _quantil_gama(direta ** 2 / variancia, alfa, variancia / direta), 0.0)
+        forma_superior = (direta + peso_maximo) ** 2 / (variancia + peso_maximo ** 2)
+        superior = _quantil_gama(forma_superior, 1 - alfa, (variancia + peso_maximo ** 2) / (direta + peso_maximo))
+
+        # indireto: taxas por faixa da referência (todas as áreas) aplicadas à pirâmide de cada área (Byar)
+        taxa_referencia = casos_validos.sum(axis=0, keepdims=True) / populacao.sum(axis=0, keepdims=True)
+        esperados = (populacao * np.nan_to_num(taxa_referencia)).sum(axis=-1)
+        razao = observados / esperados
+        razao_ic = np.stack([
+            _quantil_gama(observados, alfa) / esperados,
+            _quantil_gama(observados + 1, 1 - alfa) / esperados,
+        ])
+        bruta_referencia = observados.sum(axis=0) / pessoas.sum(axis=0)
+
+    return TaxasPadronizadas(
+        areas=tuple(areas), anos=tuple(anos),
+        casos=observados, populacao=pessoas,
+        bruta=bruta * por,
+        direta=direta * por,
+        direta_ic=np.stack([inferior, superior]) * por,
+        esperados=esperados,
+        razao=razao,
+        razao_ic=razao_ic,
+        indireta=razao * bruta_referencia * por,
+        indireta_ic=razao_ic * bruta_referencia * por,
+    )
@@ -0,0 +1,88 @@
+"""
+Páginas do dashboard, uma por módulo, importadas só quando são visitadas.
+
+Assim o RESUMO não paga a importação do que só as outras páginas usam (ex.: plotly.express,
+que carrega pandas e os templates do Plotly; o RESUMO desenha com plotly.graph_objects), e um
+worker novo desenha a primeira tela mais cedo.
+"""
+import importlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# título da página (como aparece no menu) -> módulo que a renderiza
+PAGINAS = {
+    "📄 RESUMO": "paginas.resumo",
+    "🗺️ Análise Geográfica": "paginas.geografica",
+    "📈 Análise Temporal e de Perfil": "paginas.temporal",
+    "🔬 Análise de Correlação": "paginas.correlacao",
+}
+
+# dependências pesadas pré-carregadas pelo aquecimento (as ausentes são ignoradas)
+MODULOS_PESADOS = ("plotly.express", "plotly.graph_objects")
+
+INICIO_PROCESSO = time.perf_counter()
+_aquecimento = {'iniciado': False}
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ContextoPagina:
+    """Tudo o que uma página precisa para renderizar o filtro atual."""
+    ano_selecionado: Any
+    periodo_titulo: str
+    df_perfil_filtrado: Any
+    df_mensal_filtrado: Any
+    df_faixa_filtrada: Any
+    df_regioes_filtrado: Any
+    df_bairros_filtrado: Any
+    df_historico: Any
+    df_municipio: Any
+    figura: Callable
+    frame: Callable
+    grafico: Callable
+    grafico_por_ano: Callable  # (nome, construir(df), nome do frame do recorte, **opções)
+    geometria_bairros: Callable  # () -> URL do geojson em static/ ou o geojson (dict)
+    series_epi: Callable  # ('regioes' | 'bairros') -> SeriesEpi ou None
+    canal_endemico: Callable  # (nível, 'quartis' | 'media_dp') -> CanalEndemico ou None
+    correlacoes: Callable  # (nível, variáveis) -> (DataFrame das áreas, ResultadoCorrelacao ou None)
+    taxas_padronizadas: Callable  # (nível, 'oms' | 'municipio') -> TaxasPadronizadas ou None
+    correlacao_clima: Callable  # ('municipio' | 'regioes' | 'bairros') -> CorrelacaoDefasada ou None
+    clima_mensal: Callable  # () -> DataFrame de casos e clima por mês (vazio sem clima)
+    autocorrelacao_espacial: Callable  # () -> AutocorrelacaoEspacial dos bairros ou None
+
+
+def carregar_pagina(titulo):
+    """Importa (na primeira visita) e devolve o módulo da página."""
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(PAGINAS[titulo])
+    decorrido = time.perf_counter() - inicio
+    if decorrido > 0.05:
+        logger.info("página %s importada em %.0f ms", titulo, decorrido * 1000)
+    return modulo
+
+
+def _aquecer():
+    inicio = time.perf_counter()
+    for nome in (*MODULOS_PESADOS, *PAGINAS.values()):
+        try:
+            importlib.import_module(nome)
+        except ImportError:
+            continue
+    logger.info("aquecimento das páginas concluído em %.0f ms", (time.perf_counter() - inicio) * 1000)
+
+
+def aquecer_em_segundo_plano():
+    """
+    Importa as demais páginas e suas dependências numa thread de fundo, uma vez por
+    processo. Deve ser chamado depois da primeira tela já ter sido desenhada.
+    """
+    with _lock:
+        if _aquecimento['iniciado']:
+            return
+        _aquecimento['iniciado'] = True
+    threading.Thread(target=_aquecer, name="aquecimento-paginas", daemon=True).start()
@@ -0,0 +1,260 @@
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+# variável -> rótulo; a incidência é sempre a primeira (alvo das regressões)
+VARIAVEIS = {
+    'taxa_incidencia': 'Incidência Dengue',
+    'renda_per_capita': 'Renda Média',
+    'densidade_pop': 'Densidade Pop.',
+    'populacao_negra_pct': 'População Negra (%)',
+    'anos_de_estudo': 'Anos de Estudo',
+    'moradores_por_domicilio': 'Moradores por Domicílio',
+}
+FATORES = [v for v in VARIAVEIS if v != 'taxa_incidencia']
+# rótulo exibido -> variável: os seletores mostram os rótulos como opções
+FATORES_POR_ROTULO = {VARIAVEIS[v]: v for v in FATORES}
+NIVEIS_CORRELACAO = {"Regiões": 'regioes', "Bairros": 'bairros'}
+ROTULO_AREA = {'regioes': 'Região', 'bairros': 'Bairro'}
+# clima das estações (casos x clima com defasagem em semanas)
+VARIAVEIS_CLIMA = {
+    'chuva_mm': 'Chuva (mm)',
+    'temperatura': 'Temperatura Média (°C)',
+    'temp_min': 'Temperatura Mínima (°C)',
+    'temp_max': 'Temperatura Máxima (°C)',
+    'umidade': 'Umidade Relativa (%)',
+}
+CLIMA_POR_ROTULO = {rotulo: variavel for variavel, rotulo in VARIAVEIS_CLIMA.items()}
+NIVEIS_CLIMA = {"Município": 'municipio', "Regiões": 'regioes', "Bairros": 'bairros'}
+
+
+def _texto_ic(valor, inferior, superior):
+    if np.isnan(valor):
+        return "—"
+    if np.isnan(inferior) or np.isnan(superior):
+        return f"{valor:.2f}"
+    return f"{valor:.2f} [{inferior:.2f}; {superior:.2f}]"
+
+
+def fig_matriz(resultado, coeficiente):
+    """Heatmap do coeficiente ('pearson' ou 'spearman') com o IC de bootstrap em cada célula."""
+    matriz = getattr(resultado, coeficiente)
+    ic = getattr(resultado, f"{coeficiente}_ic")
+    rotulos = [VARIAVEIS[v] for v in resultado.variaveis]
+    texto = [
+        [_texto_ic(matriz[i, j], ic[0, i, j], ic[1, i, j]).replace(" [", "<br>[") for j in range(len(rotulos))]
+        for i in range(len(rotulos))
+    ]
+    fig = go.Figure(go.Heatmap(
+        z=matriz, x=rotulos, y=rotulos, text=texto, texttemplate="%{text}",
+        colorscale='RdBu_r', zmin=-1, zmax=1,
+        hovertemplate="%{y} × %{x}<br>%{text}<extra></extra>",
+    ))
+    fig.update_layout(title="Pearson (r)" if coeficiente == 'pearson' else "Spearman (ρ)", yaxis_autorange='reversed')
+    return fig
+
+
+def fig_regressao(df, resultado, eixo_x, nivel):
+    """Dispersão com a reta de mínimos quadrados já ajustada (sem trendline, que refaria o ajuste)."""
+    inclinacao, intercepto, _ = resultado.regressao(eixo_x)
+    fig = px.scatter(
+        df, x=eixo_x, y='taxa_incidencia', size='total_populacao', hover_name='area', size_max=60,
+        color='area' if nivel == 'regioes' else None,
+        labels={'taxa_incidencia': 'Incidência (Casos/100k)', eixo_x: VARIAVEIS[eixo_x], 'area': ROTULO_AREA[nivel]},
+    )
+    if np.isfinite(inclinacao):
+        x = np.array([df[eixo_x].min(), df[eixo_x].max()])
+        fig.add_trace(go.Scatter(
+            x=x, y=intercepto + inclinacao * x, mode='lines', name='Tendência (MQO)',
+            line=dict(color='#444', dash='dash'),
+        ))
+    return fig
+
+
+def renderizar(ctx):
+    """Página 🔬 Análise de Correlação: matrizes com IC, regressão, tabela por área e defasagem do clima."""
+    st.markdown("---")
+    st.header("🔬 Laboratório de Correlação (Estudo Ecológico)")
+
+
+    # restaurar explicação do primeiro código (breve)
+    st.markdown("""
+    <div class="explanation-box">
+        <b>O que é esta análise?</b><br>
+        Um estudo ecológico que busca associações estatísticas entre o ambiente (bairro) e a doença.<br>
+        <b>Metodologia:</b> Calculamos os coeficientes de Pearson (r) e de Spearman (ρ, por postos), com intervalos de confiança de 95% por bootstrap.<br>
+        <b>Como interpretar:</b>
+        <ul>
+            <li><b>Matriz (Heatmap):</b> Cores quentes (azul) indicam que os dados "andam juntos" (ex: Mais Chuva = Mais Dengue). Cores frias (vermelho) indicam o oposto. Entre colchetes, o intervalo de confiança: se ele cruza o zero, a associação pode ser acaso.</li>
+            <li><b>Gráfico de Dispersão (Regressão):</b> Cada ponto é uma área. A linha mostra a tendência. Se a linha sobe, a correlação é positiva.</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("---")
+    nivel = NIVEIS_CORRELACAO[st.radio("Nível de análise:", options=list(NIVEIS_CORRELACAO), horizontal=True)]
+    rotulos = st.multiselect(
+        "Fatores sociais:", options=list(FATORES_POR_ROTULO), default=list(FATORES_POR_ROTULO),
+    )
+    fatores = [FATORES_POR_ROTULO[rotulo] for rotulo in rotulos] or FATORES
+    variaveis = ('taxa_incidencia', *fatores)
+    df, resultado = ctx.correlacoes(nivel, variaveis)
+    renderizar_correlacoes(ctx, df, resultado, nivel, fatores, variaveis)
+    renderizar_clima(ctx)
+
+
+def renderizar_correlacoes(ctx, df, resultado, nivel, fatores, variaveis):
+    """
+    Matrizes de Pearson e Spearman, regressão do fator escolhido e tabela por área. Sem
+    resultado (menos de 3 áreas), só avisos, mas o seletor do eixo X continua na tela.
+    """
+    grafico = ctx.grafico
+    frame = ctx.frame
+
+    st.subheader(f"1. Matriz de Correlação (Visão Geral) ({ctx.periodo_titulo})")
+    if resultado is None:
+        st.warning("Dados insuficientes para a análise de correlação neste nível (são necessárias ao menos 3 áreas com todas as variáveis).")
+    else:
+        seletor = (nivel, variaveis)
+        col_pearson, col_spearman = st.columns(2)
+        with col_pearson:
+            grafico('matriz_pearson', lambda: fig_matriz(resultado, 'pearson'), seletor=seletor, width='stretch')
+        with col_spearman:
+            grafico('matriz_spearman', lambda: fig_matriz(resultado, 'spearman'), seletor=seletor, width='stretch')
+        st.caption(
+            f"{resultado.n} áreas. Intervalos de confiança de 95% por bootstrap percentil "
+            f"({resultado.reamostragens} reamostragens das áreas)."
+            + (" Com tão poucas áreas, os intervalos são largos: leia-os como exploratórios." if resultado.n < 10 else "")
+        )
+
+    st.divider()
+
+    st.subheader(f"2. Detalhe da Regressão (Teste de Hipótese) ({ctx.periodo_titulo})")
+    eixo_x_selecionado = FATORES_POR_ROTULO[
+        st.selectbox("Escolha o Fator Social (Eixo X):", options=[VARIAVEIS[f] for f in fatores])
+    ]
+    if resultado is None:
+        st.warning("Dados insuficientes para gerar regressão.")
+        return
+    j = resultado.variaveis.index(eixo_x_selecionado)
+    inclinacao, _, ic_inclinacao = resultado.regressao(eixo_x_selecionado)
+    col_r, col_rho, col_b = st.columns(3)
+    col_r.metric("Coeficiente Pearson (r)", _texto_ic(resultado.pearson[0, j], *resultado.pearson_ic[:, 0, j]))
+    col_rho.metric("Coeficiente Spearman (ρ)", _texto_ic(resultado.spearman[0, j], *resultado.spearman_ic[:, 0, j]))
+    col_b.metric("Inclinação (casos/100k por unidade)", _texto_ic(inclinacao, *ic_inclinacao))
+
+    grafico(
+        'regressao', lambda: fig_regressao(df, resultado, eixo_x_selecionado, nivel),
+        seletor=(nivel, variaveis, eixo_x_selecionado), width='stretch',
+    )
+
+    st.markdown("---")
+    st.info("Nota: 'Incidência' é o cálculo de casos por 100 mil habitantes. 'Total de Casos' é o número absoluto de notificações.")
+    st.subheader(f"Tabela de Dados por {ROTULO_AREA[nivel]} ({ctx.periodo_titulo})")
+    def construir_df_ranking():
+        df_ranking = df[['area', 'casos', 'taxa_incidencia', eixo_x_selecionado]].sort_values('taxa_incidencia', ascending=False)
+        df_ranking.columns = [ROTULO_AREA[nivel], 'Total de Casos', 'Incidência / 100k', VARIAVEIS[eixo_x_selecionado]]
+        df_ranking['Incidência / 100k'] = df_ranking['Incidência / 100k'].round(0).astype('Int64')
+        return df_ranking
+
+    df_ranking = frame('ranking', construir_df_ranking, seletor=(nivel, variaveis, eixo_x_selecionado))
+    st.dataframe(df_ranking, use_container_width=True, hide_index=True, column_config={
+            "Incidência / 100k": st.column_config.NumberColumn(format="%.0f"),
+            "Total de Casos": st.column_config.NumberColumn(format="%d")
+        }
+    )
+
+
+def fig_defasagem(correlacao, variavel):
+    """r por defasagem: barras para uma área só, heatmap áreas x defasagens para várias."""
+    v = correlacao.variaveis.index(variavel)
+    limite = correlacao.limite_ruido()[v]
+    if len(correlacao.areas) == 1:
+        fig = go.Figure(go.Bar(
+            x=correlacao.defasagens, y=correlacao.r[v, 0], marker_color='#1f77b4',
+            customdata=correlacao.pares[v], hovertemplate="%{x} semana(s): r = %{y:.2f} (%{customdata} semanas)<extra></extra>",
+        ))
+        for sinal in (1, -1):
+            fig.add_trace(go.Scatter(
+                x=correlacao.defasagens, y=sinal * limite, mode='lines', showlegend=sinal == 1,
+                name='Limite do acaso (95%)', line=dict(color='#888', dash='dot'),
+            ))
+        fig.update_layout(yaxis_range=[-1, 1], yaxis_title="Correlação (r)")
+    else:
+        _, melhor = correlacao.melhor_defasagem(variavel)
+        ordem = np.argsort(-np.nan_to_num(melhor, nan=-2))
+        fig = go.Figure(go.Heatmap(
+            z=correlacao.r[v, ordem], x=correlacao.defasagens, y=correlacao.areas[ordem],
+            colorscale='RdBu_r', zmin=-1, zmax=1,
+            hovertemplate="%{y}, %{x} semana(s): r = %{z:.2f}<extra></extra>",
+        ))
+        fig.update_layout(yaxis_autorange='reversed', height=max(400, 22 * len(ordem)))
+    fig.update_layout(
+        title=f"{VARIAVEIS_CLIMA[variavel]} × casos semanais", xaxis_title="Defasagem (semanas de antecedência do clima)",
+    )
+    return fig
+
+
+def fig_clima_mensal(df, variavel):
+    """Casos por mês (barras) e a variável de clima do mês (linha, eixo da direita)."""
+    rotulo = df['ano'].astype(str) + "-" + df['mes'].astype(str).str.zfill(2)
+    fig = go.Figure(go.Bar(x=rotulo, y=df['casos'], name="Casos", marker_color='#d62728', opacity=0.6))
+    fig.add_trace(go.Scatter(x=rotulo, y=df[variavel], name=VARIAVEIS_CLIMA[variavel], yaxis='y2', line=dict(color='#1f77b4')))
+    fig.update_layout(
+        yaxis=dict(title="Casos"), yaxis2=dict(title=VARIAVEIS_CLIMA[variavel], overlaying='y', side='right'),
+        legend=dict(orientation='h'), hovermode='x unified',
+    )
+    return fig
+
+
+def renderizar_clima(ctx):
+    """Correlação defasada entre o clima das estações e os casos semanais (série inteira, todas as áreas)."""
+    st.markdown("---")
+    st.subheader("3. Clima e Dengue: Correlação com Defasagem")
+    nivel = NIVEIS_CLIMA[st.radio("Nível:", options=list(NIVEIS_CLIMA), horizontal=True, key="nivel_clima")]
+    correlacao = ctx.correlacao_clima(nivel)
+    df_mensal = ctx.clima_mensal()
+    if correlacao is None and df_mensal.empty:
+        st.info(
+            "Sem dados de clima: carregue as séries das estações meteorológicas com "
+            "`python db_local.py --incremental --clima arquivo.csv` (ver README)."
+        )
+        return
+
+    if correlacao is not None:
+        disponiveis = [v for v in VARIAVEIS_CLIMA if v in correlacao.variaveis]
+    else:
+        disponiveis = [v for v in VARIAVEIS_CLIMA if v in df_mensal.columns and df_mensal[v].notna().any()]
+    variavel = CLIMA_POR_ROTULO[
+        st.selectbox("Variável de clima:", options=[VARIAVEIS_CLIMA[v] for v in disponiveis], key="variavel_clima")
+    ]
+    if correlacao is None:
+        st.warning("Sem casos semanais neste nível: a correlação defasada depende das notificações do SINAN.")
+    else:
+        ctx.grafico('defasagem_clima', lambda: fig_defasagem(correlacao, variavel), seletor=(nivel, variavel), width='stretch')
+        st.caption(
+            "Pearson entre o clima da semana t e os casos da semana t + defasagem, na série inteira "
+            "(todos os anos), só nas semanas com leitura. A linha pontilhada é o |r| que séries "
+            "independentes raramente ultrapassam; como clima e casos são sazonais, parte da "
+            "correlação vem da estação do ano, e não de causa e efeito."
+        )
+        if len(correlacao.areas) > 1:
+            def construir_tabela():
+                import pandas as pd
+
+                defasagem, r = correlacao.melhor_defasagem(variavel)
+                return pd.DataFrame({
+                    ROTULO_AREA[nivel]: correlacao.areas, "Defasagem (semanas)": defasagem, "r": r,
+                }).sort_values("r", key=np.abs, ascending=False)
+
+            st.dataframe(
+                ctx.frame('defasagem_clima_tabela', construir_tabela, seletor=(nivel, variavel)),
+                width='stretch', hide_index=True, column_config={
+                    "Defasagem (semanas)": st.column_config.NumberColumn(format="%d"),
+                    "r": st.column_config.NumberColumn(format="%.2f"),
+                },
+            )
+
+    if not df_mensal.empty and variavel in df_mensal.columns:
+        ctx.grafico('clima_mensal', lambda: fig_clima_mensal(df_mensal, variavel), seletor=variavel, width='stretch')
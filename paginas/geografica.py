@@ -0,0 +1,302 @@
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from acesso_dados import chave_ano
+from autocorrelacao_espacial import NIVEL_SIGNIFICANCIA, QUADRANTES
+
+NIVEIS_MAPA = {"Regiões": 'regioes', "Bairros": 'bairros'}
+AVISOS_MAPA = {
+    "Regiões": (
+        "Este mapa representa **pontos geográficos aproximados das regiões**, "
+        "e o tamanho da bolha indica a quantidade de casos. "
+        "As cores representam o indicador selecionado no menu acima."
+    ),
+    "Bairros": (
+        "Este mapa mostra os **limites dos bairros**, coloridos pelo indicador "
+        "selecionado no menu acima; passe o mouse sobre um bairro para ver os casos."
+    ),
+}
+# cores dos quadrantes do LISA (0 = não significativo), na ordem de autocorrelacao_espacial.QUADRANTES
+CORES_QUADRANTES = {0: "#d9d9d9", 1: "#d7191c", 2: "#abd9e9", 3: "#2c7bb6", 4: "#fdae61"}
+PADROES_ETARIOS = {
+    "População padrão da OMS": 'oms',
+    "Pirâmide etária do município": 'municipio',
+}
+
+
+def renderizar(ctx):
+    """Página 🗺️ Análise Geográfica: mapa das regiões (bolhas) ou dos bairros (coroplético)."""
+    periodo_titulo = ctx.periodo_titulo
+    df_regioes_filtrado = ctx.df_regioes_filtrado
+    df_bairros_filtrado = ctx.df_bairros_filtrado
+
+    st.markdown("---")
+    # título e aviso dependem do nível do mapa, escolhido mais abaixo
+    topo = st.container()
+
+    # restaurar explicação detalhada do primeiro código
+    st.markdown("""
+    <div class="explanation-box">
+        <b>Objetivo:</b> Identificar onde a doença está mais concentrada.<br>
+        <b>Metodologia:</b> Cruzamos as notificações georreferenciadas por bairro (agrupadas em regiões) com a população do Censo 2022.<br>
+        <b>Cálculos:</b>
+        <ul>
+            <li><b>Taxa de Incidência:</b> (Casos ÷ População) × 100.000. É a medida padrão da OMS para comparar regiões de tamanhos diferentes.</li>
+            <li><b>Cor:</b> Representa a intensidade do indicador (ex: áreas em amarelo maior número e em roxo menor número).</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("---")
+    # opcoes do seletor de cores do mapa (restaurado)
+    opcoes_cor = {
+        'taxa_incidencia': 'Taxa de Incidência (Casos/100k)',
+        'renda_per_capita': 'Renda Média (R$)',
+    }
+
+    map_color_var = st.selectbox("Colorir mapa por:", list(opcoes_cor.keys()), format_func=lambda x: opcoes_cor[x])
+    nivel_mapa = st.radio("Nível do mapa:", ["Regiões", "Bairros"], horizontal=True)
+    with topo:
+        st.header(f"🗺️ Análise Geográfica por {nivel_mapa} ({periodo_titulo})")
+        st.info(AVISOS_MAPA[nivel_mapa])
+
+    if nivel_mapa == "Bairros":
+        renderizar_mapa_bairros(ctx, df_bairros_filtrado, map_color_var, opcoes_cor)
+        renderizar_autocorrelacao(ctx, df_bairros_filtrado)
+    else:
+        renderizar_mapa_regioes(ctx, df_regioes_filtrado, map_color_var)
+    renderizar_taxas_padronizadas(ctx, NIVEIS_MAPA[nivel_mapa])
+
+
+def renderizar_mapa_regioes(ctx, df_regioes_filtrado, map_color_var):
+    """Mapa de bolhas das regiões: tamanho pelos casos e cor pelo indicador."""
+    def construir_fig_map():
+        # define a escala de cor (verde/azul para social, vermelho para doenca)
+        if map_color_var in ['renda_per_capita', 'taxa_incidencia']:
+            scale = px.colors.sequential.Viridis
+        else:
+            scale = px.colors.sequential.Reds
+        
+        # plota o mapa de bolhas
+        fig_map = px.scatter_map(df_regioes_filtrado, 
+            lat="latitude", lon="longitude",
+            size="casos", color=map_color_var,
+            hover_name="nome_regiao",
+            hover_data={"casos": True, "taxa_incidencia": ":.0f", map_color_var: ':.2f'},
+            color_continuous_scale=scale, size_max=50, zoom=10.5, map_style="carto-positron"
+        )
+        # garante tamanho minimo da bolha para nao sumir
+        fig_map.update_traces(marker=dict(sizemin=8))
+        fig_map.update_layout(uirevision=True) # para garantir que o mapa não “trave” depois do zoom
+        return fig_map
+
+    ctx.grafico('mapa', construir_fig_map, seletor=map_color_var, width='stretch')
+
+
+def renderizar_mapa_bairros(ctx, df_bairros_filtrado, map_color_var, opcoes_cor):
+    """
+    Coroplético dos bairros do geojson. A geometria vem pronta do banco (simplificada e
+    quantizada) e, quando servida como arquivo estático, a figura leva só a URL: trocar
+    de ano ou de indicador reenvia apenas os valores por bairro.
+    """
+    geometria = ctx.geometria_bairros()
+    if geometria is None or df_bairros_filtrado.empty:
+        st.warning(
+            "Sem casos por bairro para este período: o mapa de bairros depende de "
+            "notificações geocodificadas (colunas LATITUDE/LONGITUDE na carga do SINAN)."
+        )
+        return
+    st.caption(
+        "População e renda dos bairros interpoladas dos setores censitários quando eles "
+        "foram carregados; nos demais, população pela densidade do Censo 2022 da região × "
+        "área do polígono e renda média da região."
+    )
+
+    def construir_fig_bairros():
+        import plotly.graph_objects as go
+
+        fig = go.Figure(go.Choroplethmap(
+            geojson=geometria, featureidkey="id",
+            locations=df_bairros_filtrado['nome_bairro'], z=df_bairros_filtrado[map_color_var],
+            customdata=df_bairros_filtrado[['casos', 'nome_regiao']],
+            colorscale="Viridis", marker_opacity=0.75, marker_line_width=0.5,
+            colorbar_title=opcoes_cor[map_color_var],
+            hovertemplate=(
+                "<b>%{location}</b> (%{customdata[1]})<br>"
+                f"{opcoes_cor[map_color_var]}: %{{z:,.2f}}<br>Casos: %{{customdata[0]}}<extra></extra>"
+            ),
+        ))
+        fig.update_layout(
+            map=dict(
+                style="carto-positron", zoom=12.5,
+                center=dict(lat=df_bairros_filtrado['latitude'].mean(), lon=df_bairros_filtrado['longitude'].mean()),
+            ),
+            margin=dict(l=0, r=0, t=0, b=0), height=600, uirevision=True,
+        )
+        return fig
+
+    ctx.grafico('mapa_bairros', construir_fig_bairros, seletor=map_color_var, width='stretch')
+
+
+def fig_lisa(resultado, j, geometria, centro):
+    """Mapa dos quadrantes do LISA no ano (índice j): um traço por quadrante, para a legenda."""
+    import plotly.graph_objects as go
+
+    rotulos = {0: "Não significativo", **QUADRANTES}
+    areas = np.array(resultado.areas, dtype=object)
+    fig = go.Figure()
+    for quadrante, rotulo in rotulos.items():
+        selecionado = resultado.quadrante[j] == quadrante
+        if not selecionado.any():
+            continue
+        fig.add_trace(go.Choroplethmap(
+            geojson=geometria, featureidkey="id", locations=areas[selecionado],
+            z=np.full(selecionado.sum(), quadrante), customdata=resultado.lisa_p[j, selecionado],
+            colorscale=[[0, CORES_QUADRANTES[quadrante]], [1, CORES_QUADRANTES[quadrante]]], showscale=False,
+            marker_opacity=0.75, marker_line_width=0.5, name=rotulo, showlegend=True,
+            hovertemplate=f"<b>%{{location}}</b><br>{rotulo}<br>p = %{{customdata:.3f}}<extra></extra>",
+        ))
+    fig.update_layout(
+        map=dict(style="carto-positron", zoom=12.5, center=centro),
+        margin=dict(l=0, r=0, t=0, b=0), height=500, uirevision=True,
+        legend=dict(yanchor="top", y=0.98, xanchor="left", x=0.01),
+    )
+    return fig
+
+
+def renderizar_autocorrelacao(ctx, df_bairros_filtrado):
+    """
+    I de Moran global, mapa LISA e aglomerados da varredura de Kulldorff dos bairros no
+    ano selecionado. Tudo vem calculado de uma vez para todos os anos (ver
+    autocorrelacao_espacial.py).
+    """
+    st.markdown("---")
+    st.subheader("Autocorrelação espacial e aglomerados")
+    resultado = ctx.autocorrelacao_espacial()
+    ano = chave_ano(ctx.ano_selecionado)
+    geometria = ctx.geometria_bairros()
+    if resultado is None or ano not in resultado.anos or geometria is None:
+        st.info(
+            "Sem dados para a autocorrelação espacial: é preciso a carga do SINAN com "
+            "notificações geocodificadas e o banco montado com a vizinhança dos bairros."
+        )
+        return
+    j = resultado.do_ano(ano)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("I de Moran global", f"{resultado.moran[j]:.3f}", help="Esperado sem autocorrelação: "
+                f"{resultado.moran_esperado:.3f}. Positivo: bairros vizinhos com incidências parecidas.")
+    col2.metric("p-valor (permutação)", f"{resultado.moran_p[j]:.3f}")
+    col3.metric("Aglomerados significativos", sum(a.p_valor <= NIVEL_SIGNIFICANCIA for a in resultado.aglomerados[j]))
+    st.caption(
+        f"Taxa de incidência dos bairros com vizinhos por contiguidade (ou, em bairros isolados, "
+        f"os centros mais próximos). Significância por {resultado.replicas} permutações: no LISA, "
+        f"bairros com p ≤ {NIVEL_SIGNIFICANCIA} (sem correção para comparações múltiplas). "
+        "Alto-Alto: bairro e vizinhos acima da média (hotspot); Baixo-Baixo: abaixo (coldspot)."
+    )
+    centro = dict(lat=df_bairros_filtrado['latitude'].mean(), lon=df_bairros_filtrado['longitude'].mean())
+    ctx.grafico('mapa_lisa', lambda: fig_lisa(resultado, j, geometria, centro), width='stretch')
+
+    st.markdown("**Varredura espacial (Kulldorff, Poisson)**")
+    st.caption(
+        "Janelas circulares em torno de cada bairro, até 50% da população; p-valor por "
+        f"Monte Carlo ({resultado.replicas} redistribuições dos casos pela população). "
+        "Aglomerados secundários não se sobrepõem aos anteriores."
+    )
+    if not resultado.aglomerados[j]:
+        st.info("Nenhuma janela com excesso de casos neste período.")
+        return
+
+    def construir_tabela():
+        import pandas as pd
+
+        return pd.DataFrame([{
+            "Centro": a.centro,
+            "Bairros": ", ".join(a.areas),
+            "Casos": a.casos,
+            "Esperados": a.esperados,
+            "Risco relativo": a.risco_relativo,
+            "Log-verossimilhança": a.razao_verossimilhanca,
+            "p-valor": a.p_valor,
+        } for a in resultado.aglomerados[j]])
+
+    tabela = ctx.frame('tabela_aglomerados', construir_tabela)
+    st.dataframe(tabela, width='stretch', hide_index=True, column_config={
+        "Esperados": st.column_config.NumberColumn(format="%.1f"),
+        "Risco relativo": st.column_config.NumberColumn(format="%.2f"),
+        "Log-verossimilhança": st.column_config.NumberColumn(format="%.1f"),
+        "p-valor": st.column_config.NumberColumn(format="%.3f"),
+    })
+
+
+def fig_taxas_padronizadas(taxas, j, rotulo_area):
+    """Taxa padronizada direta de cada área no ano (índice j), com o IC em barras de erro."""
+    import plotly.graph_objects as go
+
+    ordem = np.argsort(taxas.direta[:, j])[::-1]
+    direta = taxas.direta[ordem, j]
+    inferior, superior = taxas.direta_ic[0, ordem, j], taxas.direta_ic[1, ordem, j]
+    fig = go.Figure(go.Bar(
+        x=[taxas.areas[i] for i in ordem], y=direta,
+        error_y=dict(type='data', array=superior - direta, arrayminus=direta - inferior),
+        customdata=np.column_stack([taxas.bruta[ordem, j], inferior, superior]),
+        hovertemplate=(
+            "<b>%{x}</b><br>Padronizada: %{y:,.1f} [%{customdata[1]:,.1f}; %{customdata[2]:,.1f}]"
+            "<br>Bruta: %{customdata[0]:,.1f}<extra></extra>"
+        ),
+    ))
+    fig.update_layout(xaxis_title=rotulo_area, yaxis_title="Casos / 100k (padronizada)", height=450)
+    return fig
+
+
+def renderizar_taxas_padronizadas(ctx, nivel):
+    """
+    Taxas padronizadas por idade (direta e indireta) das áreas do nível no ano
+    selecionado: tiram da comparação o efeito das pirâmides etárias diferentes.
+    """
+    st.markdown("---")
+    st.subheader("Taxas padronizadas por idade")
+    rotulo_padrao = st.radio("População padrão:", list(PADROES_ETARIOS), horizontal=True, key="padrao_etario")
+    padrao = PADROES_ETARIOS[rotulo_padrao]
+    taxas = ctx.taxas_padronizadas(nivel, padrao)
+    ano = chave_ano(ctx.ano_selecionado)
+    if taxas is None or ano not in taxas.anos:
+        st.info(
+            "Sem dados para padronizar por idade: é preciso a carga do SINAN (idade dos casos) "
+            "e os setores censitários com a pirâmide etária (colunas pop_<faixa>, ver README)."
+        )
+        return
+    j = taxas.do_ano(ano)
+    st.caption(
+        "Direta: taxas por faixa etária da área aplicadas à população padrão, com IC 95% "
+        "(Fay-Feuer). Indireta: razão de incidência padronizada (RIP = observados ÷ esperados "
+        "pelas taxas por faixa de todo o município, IC 95% de Byar) × taxa bruta do município. "
+        "Só entram os casos com idade informada."
+    )
+    rotulo_area = "Região" if nivel == 'regioes' else "Bairro"
+    ctx.grafico('taxas_padronizadas', lambda: fig_taxas_padronizadas(taxas, j, rotulo_area),
+                seletor=(nivel, padrao), width='stretch')
+
+    def construir_tabela():
+        import pandas as pd
+
+        return pd.DataFrame({
+            rotulo_area: taxas.areas,
+            "Casos": taxas.casos[:, j].astype(int),
+            "Bruta / 100k": taxas.bruta[:, j],
+            "Padronizada / 100k": taxas.direta[:, j],
+            "IC inferior": taxas.direta_ic[0, :, j],
+            "IC superior": taxas.direta_ic[1, :, j],
+            "Esperados": taxas.esperados[:, j],
+            "RIP": taxas.razao[:, j],
+            "RIP inferior": taxas.razao_ic[0, :, j],
+            "RIP superior": taxas.razao_ic[1, :, j],
+            "Indireta / 100k": taxas.indireta[:, j],
+        }).sort_values("Padronizada / 100k", ascending=False)
+
+    tabela = ctx.frame('tabela_taxas_padronizadas', construir_tabela, seletor=(nivel, padrao))
+    st.dataframe(tabela, width='stretch', hide_index=True, column_config={
+        coluna: st.column_config.NumberColumn(format="%.2f" if coluna.startswith("RIP") else "%.1f")
+        for coluna in tabela.columns if coluna not in (rotulo_area, "Casos")
+    })
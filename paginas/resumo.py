@@ -0,0 +1,216 @@
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from indicadores import calcular_delta, kpis_periodo
+
+
+# helper delta html
+def gerar_delta_html(atual, anterior, tipo="ruim"):
+    delta = calcular_delta(atual, anterior)
+    if delta is None:
+        return ""
+    
+    diff, pct = delta
+    symbol = "⬆" if diff > 0 else "⬇"
+    
+    if tipo == "ruim": # Casos/Óbitos: Vermelho se subir
+        color = "#d62728" if diff > 0 else "#2ca02c"
+    else: # Cura: Verde se subir
+        color = "#2ca02c" if diff > 0 else "#d62728"
+        
+    return f'<div class="delta-indicator" style="color: {color}">{symbol} {abs(pct):.1f}% vs. ano anterior</div>'
+
+
+def fig_ranking_risco(df_regioes_filtrado):
+    df_outras_regioes = df_regioes_filtrado[df_regioes_filtrado['nome_regiao'] != 'Leste']
+    df_risco_rank = df_outras_regioes.sort_values('taxa_incidencia', ascending=True)
+
+    # graph_objects direto (sem plotly.express): a primeira tela não paga a importação do px
+    fig_risco = go.Figure(go.Bar(
+        x=df_risco_rank['taxa_incidencia'],
+        y=df_risco_rank['nome_regiao'],
+        orientation='h',
+        text=df_risco_rank['taxa_incidencia'].round(0).astype(int),
+        marker=dict(color=df_risco_rank['renda_per_capita'], coloraxis='coloraxis'),
+        customdata=df_risco_rank['renda_per_capita'],
+        hovertemplate="%{y}<br>Incidência: %{x:,.0f}<br>Renda: R$ %{customdata:,.0f}<extra></extra>",
+    ))
+    fig_risco.update_layout(
+        title="Correlação: Incidência x Renda (Exceto Leste)",
+        yaxis={'categoryorder':'total ascending', 'title': "Região"}, 
+        xaxis={'title': "Incidência / 100 mil hab."},
+        coloraxis=dict(colorscale="Inferno_r", colorbar=dict(title="Renda Média (R$)")),
+        height=450 
+    ) 
+    fig_risco.update_traces(textposition='outside')
+    return fig_risco
+
+
+def renderizar(ctx):
+    """Página 📄 RESUMO: KPIs do período, histórico anual e incidência regional."""
+    ano_selecionado = ctx.ano_selecionado
+    periodo_titulo = ctx.periodo_titulo
+    df_perfil_filtrado = ctx.df_perfil_filtrado
+    df_regioes_filtrado = ctx.df_regioes_filtrado
+    df_historico = ctx.df_historico
+    df_municipio = ctx.df_municipio
+    grafico = ctx.grafico
+    grafico_por_ano = ctx.grafico_por_ano
+
+    st.markdown("---")
+    st.header("📄 Resumo e Análise de casos totais" if ano_selecionado == "Todos os Anos" else f"📄 Resumo e Análise: {periodo_titulo}")
+    
+    # Texto explicativo (restaurado do primeiro código)
+    st.markdown("""
+    <div class="explanation-box">
+        <b>O que é este Painel?</b><br>
+        Uma ferramenta de inteligência epidemiológica que analisa a Dengue em Ribeirão Preto, cruzando dados de Saúde com dados Socioeconômicos e Demográficos.
+        <br><br>
+        <b>Objetivo:</b>Este painel busca entender se há correlação entre a incidência de casos de Dengue por bairros de Ribeirão Preto e a presença de fatores de risco socioambientais, como a existência de terrenos baldios, pontos de descarte irregular de lixo e a densidade populacional nos últimos 5 anos.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    # Dados demográficos exibidos apenas para "Todos os Anos" (mantido)
+    if ano_selecionado == "Todos os Anos":
+        st.subheader("Dados Demográficos (Contexto da Cidade)")
+        # municípios cadastrados por CSV podem não ter todos os indicadores: "—" no lugar
+        indicadores = dict(zip(df_municipio['indicador'], df_municipio['valor']))
+        pop_censo = indicadores.get('População Censo 2022')
+        pop_estimada = indicadores.get('População Estimada 2025')
+        densidade = indicadores.get('Densidade Demográfica 2022')
+        texto_pop_censo = f"{int(pop_censo):,}".replace(",", ".") if pop_censo is not None else "—"
+        texto_pop_estimada = f"{int(pop_estimada):,}".replace(",", ".") if pop_estimada is not None else "—"
+        texto_densidade = f"{densidade:,.2f} hab/km²".replace(",", ".") if densidade is not None else "—"
+
+        col_pop1, col_pop2, col_pop3 = st.columns(3)
+        with col_pop1: 
+            st.markdown(f'<div class="kpi-card" style="border-left: 5px solid #1f77b4;"><h3>População (Censo 2022)</h3><p style="color:#1f77b4">{texto_pop_censo}</p></div>', unsafe_allow_html=True)
+        with col_pop2: 
+            st.markdown(f'<div class="kpi-card" style="border-left: 5px solid #ff7f0e;"><h3>População (Estimada 2025)</h3><p style="color:#ff7f0e">{texto_pop_estimada}</p></div>', unsafe_allow_html=True)
+        with col_pop3: 
+            st.markdown(f'<div class="kpi-card" style="border-left: 5px solid #2ca02c;"><h3>Densidade Demográfica</h3><p style="color:#2ca02c">{texto_densidade}</p></div>', unsafe_allow_html=True)
+        st.divider()
+
+    # KPIs principais (mantidos)
+    st.subheader(f"Panorama da Dengue: {periodo_titulo}")
+
+    # pega valores com segurança (zeros se o período não tiver perfil)
+    kpis = kpis_periodo(df_perfil_filtrado, df_historico, ano_selecionado)
+    total_casos = kpis['total_casos']
+    total_curados = kpis['curados']
+    total_obitos_dengue = kpis['obitos_dengue']
+    total_obitos_outros = kpis['obitos_outras_causas']
+    total_sem_desfecho = kpis['sem_desfecho']
+
+    # delta apenas quando ano específico (e com o ano anterior no histórico)
+    deltas = {kpi: gerar_delta_html(kpis[kpi], delta['anterior'], delta['tipo']) for kpi, delta in kpis['deltas'].items()}
+    delta_casos = deltas.get('total_casos', "")
+    delta_curados = deltas.get('curados', "")
+    delta_obitos = deltas.get('obitos_dengue', "")
+
+    c1, c2, c3, c4, c5 = st.columns(5)
+    with c1:
+        st.markdown(f'<div class="kpi-card kpi-notif"><h3>Notificações da Doença</h3><p>{int(total_casos):,}</p>{delta_casos}</div>'.replace(",", "."), unsafe_allow_html=True)
+    with c2:
+        st.markdown(f'<div class="kpi-card kpi-curados"><h3>Curados</h3><p>{int(total_curados):,}</p>{delta_curados}</div>'.replace(",", "."), unsafe_allow_html=True)
+    with c3:
+        st.markdown(f'<div class="kpi-card kpi-obitos"><h3>Óbitos (Dengue)</h3><p>{int(total_obitos_dengue)}</p>{delta_obitos}</div>', unsafe_allow_html=True)
+    with c4:
+        st.markdown(f'<div class="kpi-card kpi-outros"><h3>Óbitos (Outros*)</h3><p>{int(total_obitos_outros)}</p></div>', unsafe_allow_html=True)
+    with c5:
+        st.markdown(f'<div class="kpi-card kpi-neutro"><h3>Sem Desfecho**</h3><p>{int(total_sem_desfecho):,}</p></div>'.replace(",", "."), unsafe_allow_html=True)
+
+    st.caption("*Óbitos de pacientes com dengue confirmados por outras causas. **Soma de Ignorados/Brancos e Óbitos em Investigação.")
+    st.markdown("---")
+    
+    # ----------------------------
+    # HISTÓRICO ANUAL (APENAS TODOS OS ANOS)
+    # ----------------------------
+    if ano_selecionado == "Todos os Anos":
+        st.subheader("1. Histórico Anual de Casos (Tendência)")
+
+        def construir_fig_hist():
+            df_hist = df_historico[['ano', 'casos_total']]
+
+            fig_hist = go.Figure(go.Scatter(
+                x=df_hist['ano'], 
+                y=df_hist['casos_total'], 
+                text=df_hist['casos_total'],
+                mode='lines+markers+text',
+                line=dict(color='#1f77b4'),
+                hovertemplate="%{x}: %{y:,.0f} casos<extra></extra>",
+            ))
+
+            fig_hist.update_traces(
+                textposition="top center", 
+                texttemplate='%{text:,.0f}', 
+                marker=dict(size=12) 
+            )
+            fig_hist.update_layout(
+                title_text="Evolução do Total de Notificações (2020-2024)",
+                xaxis=dict(tickmode='linear', title=dict(text="Ano", font=dict(size=18))), 
+                yaxis=dict(title=dict(text="Número de Casos", font=dict(size=18))), 
+                title=dict(font=dict(size=22)), 
+                font=dict(size=16), 
+                height=500
+            )
+            return fig_hist
+
+        grafico('historico', construir_fig_hist, width='stretch')
+        with st.expander("Análise dos Extremos: Por que a queda em 2021 e o pico em 2024?"):
+            st.markdown("""A variação extrema de casos entre os anos pode ser explicada por fatores **epidemiológicos e climáticos**:
+    
+Queda em 2021 (481 casos):*Principalmente devido à **imunidade populacional** (após o surto de 2020) e ao impacto das medidas de **distanciamento social** e restrições impostas pela pandemia de COVID-19, que indiretamente limitaram a circulação do vírus.
+
+Pico em 2024 (46.531 casos):** Impulsionado pela **reintrodução de novos sorotipos** do vírus (contra os quais a população não tinha defesa) e por **condições climáticas extremas** (altas temperaturas e chuvas irregulares), que favorecem a proliferação acelerada do mosquito *Aedes aegypti*.
+            """)
+        st.markdown("---")
+    # se não for "Todos os Anos", o gráfico não aparece (conforme solicitado)
+
+    # ----------------------------
+    # Incidência Regional (mantido)
+    # ----------------------------
+    st.subheader("2. Incidência Regional (Visualização do Risco Socioeconômico)")
+    st.info("⚠️ **IMPORTANTE:**O gráfico foi dividido em duas partes. A Região Leste foi separada devido ao seu pico extremo, que ofuscava a análise das demais regiões. A Região Leste apresenta uma Taxa de Incidência **muito superior** (aprox. 55.236 / 100k) em relação às demais, sendo o **principal motor** da correlação negativa observada.Esta concentração massiva de casos pode ser um **artefato de classificação/geocodificação** na fonte de dados, onde grande parte dos casos da cidade foram atribuídos a esta macrorregião por padrão. Analisamos o ranking das demais regiões separadamente para maior clareza." )
+
+    st.markdown("---")
+
+    st.markdown("#### A) Foco no Extremo (Região Leste)")
+    col_le, col_avg = st.columns([2, 1])
+
+    with col_le:
+        def construir_fig_leste():
+            df_leste = df_regioes_filtrado[df_regioes_filtrado['nome_regiao'] == 'Leste']
+            incidencia_media_cidade = df_regioes_filtrado['taxa_incidencia'].mean()
+            val_leste = df_leste['taxa_incidencia'].iloc[0] if not df_leste.empty else 0
+        
+            df_leste_vs_media = pd.DataFrame({
+                'Região': ['Leste', 'Média da Cidade'],
+                'Incidência': [val_leste, incidencia_media_cidade],
+                'Cor': ['Leste', 'Média']
+            })
+        
+            cores = {'Leste': '#d62728', 'Média da Cidade': '#7f7f7f'}
+            fig_leste = go.Figure([
+                go.Bar(
+                    x=[linha['Incidência']], y=[linha['Região']], orientation='h', text=[linha['Incidência']],
+                    name=linha['Região'], marker_color=cores[linha['Região']],
+                )
+                for linha in df_leste_vs_media.to_dict('records')
+            ])
+            fig_leste.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+            fig_leste.update_layout(
+                title=f"Leste (Extremo) vs. Média Geral ({incidencia_media_cidade:,.0f}/100k)",
+                xaxis_title="Incidência / 100 mil hab.", yaxis_title="", legend_title_text="Região",
+            )
+            return fig_leste
+
+        grafico('leste_vs_media', construir_fig_leste, width='stretch')
+
+    st.markdown("---")
+    st.markdown("#### B) Ranking de Risco e Renda (Demais Regiões)")
+    st.caption("Observamos que a Região Centro, com renda média/baixa, apresenta a maior incidência, alinhando-se à correlação negativa esperada.No entanto, a Região Norte, a mais pobre de todas, registra a incidência mínima. Este contraste sugere que a incidência da Dengue é um fenômeno multifatorial. Fatores como a Densidade Populacional (muito alta no Centro) ou a circulação viral específica do período podem ter um peso maior na determinação do risco do que a renda isoladamente.")
+
+    grafico_por_ano('ranking_risco', fig_ranking_risco, 'df_regioes_filtrado', width='stretch')
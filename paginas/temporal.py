@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from canal_endemico import ALERTA, EPIDEMIA, NOMES_ZONAS, SEM_BASE
+
+# indicador do seletor -> (atributo da SeriesEpi, rótulo do eixo)
+INDICADORES_SEMANA = {
+    "Casos por semana": ('casos', "Casos"),
+    "Incidência em 4 semanas (por 100 mil hab.)": ('incidencia_movel', "Casos/100k (4 semanas)"),
+    "Média móvel de 4 semanas": ('media_movel', "Casos por semana (média)"),
+    "Variação vs. mesma SE do ano anterior (%)": ('variacao_anual', "Variação (%)"),
+}
+NIVEIS_SEMANA = {"Regiões": 'regioes', "Bairros": 'bairros'}
+METODOS_CANAL = {"Quartis": 'quartis', "Média ± 2 DP": 'media_dp'}
+CORES_ZONAS = {-1: '#bdbdbd', 0: '#2ca02c', 1: '#98df8a', 2: '#ffbf00', 3: '#d62728'}
+MAX_AREAS_SEMANA = 10
+
+
+# função de plot de desfechos (reaproveitada)
+def plot_desfechos(df_perfil_filtrado):
+    # em caso de soma (Todos os Anos) ou ano específico, pegar com segurança
+    try:
+        total_curados = int(df_perfil_filtrado['curados'].iloc[0])
+        total_obitos_dengue = int(df_perfil_filtrado['obitos_dengue'].iloc[0])
+        total_obitos_outros = int(df_perfil_filtrado['obitos_outras_causas'].iloc[0])
+        em_investigacao = int(df_perfil_filtrado['obitos_investigacao'].iloc[0])
+        ign_branco = int(df_perfil_filtrado['ign_branco'].iloc[0])
+    except Exception:
+        total_curados = total_obitos_dengue = total_obitos_outros = em_investigacao = ign_branco = 0
+    
+    dados = {
+        'Situação': ['Cura', 'Óbito Dengue', 'Óbito Outras', 'Em Investigação', 'Ign/Branco'],
+        'Quantidade': [total_curados, total_obitos_dengue, total_obitos_outros, em_investigacao, ign_branco]
+    }
+    
+    cores = {'Cura': '#2ca02c', 'Óbito Dengue': '#d62728', 'Óbito Outras': '#ff7f0e', 'Em Investigação': '#7f7f7f', 'Ign/Branco': '#bcbd22'}
+    
+    fig = px.bar(pd.DataFrame(dados), x='Quantidade', y='Situação', orientation='h', text_auto=True, 
+                  title="Matemática dos Desfechos (Status Final)", color='Situação',
+                  color_discrete_map=cores)
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def fig_sazonalidade(df_mensal_filtrado):
+    mapa_meses = {1: 'Jan', 2: 'Fev', 3: 'Mar', 4: 'Abr', 5: 'Mai', 6: 'Jun', 7: 'Jul', 8: 'Ago', 9: 'Set', 10: 'Out', 11: 'Nov', 12: 'Dez'}
+    df_mes = df_mensal_filtrado.assign(mes_nome=df_mensal_filtrado['mes'].map(mapa_meses))
+    fig_bar = px.bar(df_mes.sort_values('mes'), y='mes_nome', x='casos', orientation='h', text_auto=True)
+    return fig_bar
+
+
+def fig_faixa_etaria(df_faixa_filtrada):
+    df_faixa_long = df_faixa_filtrada.drop(columns=['ano'], errors='ignore').melt(var_name='Faixa', value_name='Casos')
+    df_faixa_long['Faixa'] = df_faixa_long['Faixa'].str.replace('casos_', '').str.replace('_', ' ').str.title()
+    fig_age = px.bar(df_faixa_long, x='Casos', y='Faixa', orientation='h', text_auto=True, title="Casos por Idade")
+    return fig_age
+
+
+def fig_semanas(series, colunas, indicador, max_areas=MAX_AREAS_SEMANA):
+    """Linhas por área do indicador nas semanas `colunas`: as áreas com mais casos no período."""
+    atributo, rotulo = INDICADORES_SEMANA[indicador]
+    total = series.casos[:, colunas].sum(axis=1)
+    linhas = np.argsort(total, kind="stable")[::-1][:max_areas]
+    linhas = linhas[total[linhas] > 0]
+
+    df = pd.DataFrame(getattr(series, atributo)[np.ix_(linhas, colunas)].T, columns=series.areas[linhas])
+    df['semana'] = series.inicio[colunas]
+    df['SE'] = [f"{ano}-SE{semana:02d}" for ano, semana in zip(series.ano_epi[colunas], series.semana_epi[colunas])]
+    df_long = df.melt(id_vars=['semana', 'SE'], var_name='Área', value_name=rotulo)
+    fig = px.line(df_long, x='semana', y=rotulo, color='Área', hover_data=['SE'])
+    fig.update_layout(xaxis_title="Início da semana epidemiológica", height=450)
+    return fig
+
+
+def fig_canal_endemico(canal, area, ano):
+    """Diagrama de controle de uma área num ano: faixas dos limiares e a taxa de cada SE."""
+    i = int(np.flatnonzero(canal.areas == area)[0])
+    j = int(ano) - int(canal.anos[0])
+    semanas = np.arange(1, canal.valores.shape[2] + 1)
+    valores = canal.valores[i, j]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=semanas, y=canal.inferior[i, j], name="Limite inferior", line=dict(color='#2ca02c')))
+    fig.add_trace(go.Scatter(x=semanas, y=canal.central[i, j], name="Limite central", fill='tonexty',
+                             fillcolor='rgba(152, 223, 138, 0.3)', line=dict(color='#ffbf00')))
+    fig.add_trace(go.Scatter(x=semanas, y=canal.superior[i, j], name="Limite superior (epidemia)", fill='tonexty',
+                             fillcolor='rgba(255, 191, 0, 0.25)', line=dict(color='#d62728')))
+    fig.add_trace(go.Bar(
+        x=semanas, y=valores, name=f"Taxa semanal {ano}",
+        marker_color=[CORES_ZONAS[int(zona)] for zona in canal.zonas[i, j]],
+        customdata=[NOMES_ZONAS[int(zona)] for zona in canal.zonas[i, j]],
+        hovertemplate="SE %{x}: %{y:.1f} (%{customdata})<extra></extra>",
+    ))
+    fig.update_layout(title=f"Canal endêmico: {area} ({ano})", xaxis_title="Semana epidemiológica",
+                      yaxis_title="Casos/100k na semana", height=450, barmode='overlay')
+    return fig
+
+
+def renderizar_canal_endemico(ctx, nivel):
+    """Canal endêmico: áreas em alerta/epidemia na última semana do período e o diagrama da mais crítica."""
+    st.markdown("---")
+    st.subheader("Canal Endêmico e Alertas de Surto")
+    metodo = st.radio("Limiares do canal endêmico:", list(METODOS_CANAL), horizontal=True)
+    canal = ctx.canal_endemico(NIVEIS_SEMANA[nivel], METODOS_CANAL[metodo])
+    ultima = canal.ultima_semana(None if ctx.ano_selecionado == "Todos os Anos" else ctx.ano_selecionado) if canal else None
+    if ultima is None:
+        st.info("Sem semanas com casos neste período.")
+        return
+    ano, semana = ultima
+
+    situacao = ctx.frame('canal_situacao', lambda: canal.situacao(ano, semana), seletor=(nivel, metodo))
+    em_epidemia = situacao[situacao['zona'] == EPIDEMIA]
+    em_alerta = situacao[situacao['zona'] == ALERTA]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Semana analisada", f"SE {semana:02d}/{ano}")
+    c2.metric("Áreas acima do limite superior (epidemia)", len(em_epidemia))
+    c3.metric("Áreas acima do limite central (alerta)", len(em_alerta))
+
+    if len(em_epidemia) + len(em_alerta):
+        tabela = situacao[situacao['zona'].isin([EPIDEMIA, ALERTA])].assign(zona=lambda df: df['zona'].map(NOMES_ZONAS))
+        st.dataframe(
+            tabela[['area', 'zona', 'taxa_semanal', 'limiar_central', 'limiar_superior']].rename(columns={
+                'area': 'Área', 'zona': 'Zona', 'taxa_semanal': 'Casos/100k na semana',
+                'limiar_central': 'Limite central', 'limiar_superior': 'Limite superior',
+            }).round(1),
+            hide_index=True, width='stretch',
+        )
+    elif (situacao['zona'] == SEM_BASE).all():
+        st.info(f"A SE {semana:02d}/{ano} não tem histórico suficiente nos anos anteriores para o canal endêmico.")
+    else:
+        st.success(f"Nenhuma área acima do limite central na SE {semana:02d}/{ano}.")
+
+    area = situacao['area'].iloc[0]
+    ctx.grafico('canal_endemico', lambda: fig_canal_endemico(canal, area, ano), seletor=(nivel, metodo), width='stretch')
+    st.caption("Limites da mesma semana epidemiológica nos 5 anos anteriores (quartis ou média ± 2 desvios-padrão); "
+               "semanas com menos de 3 anos de histórico ficam sem classificação.")
+
+
+def renderizar(ctx):
+    """Página 📈 Análise Temporal e de Perfil: sazonalidade, sexo, faixa etária, desfechos e semanas epidemiológicas."""
+    df_perfil_filtrado = ctx.df_perfil_filtrado
+    df_faixa_filtrada = ctx.df_faixa_filtrada
+    grafico = ctx.grafico
+    grafico_por_ano = ctx.grafico_por_ano
+
+    st.markdown("---")
+    st.header("Análise Temporal e de Perfil")
+    
+    # restaurar explicação detalhada do primeiro código na aba temporal
+    st.markdown("""
+    <div class="explanation-box">
+        <b>Objetivo:</b> Entender <i>QUANDO</i> (sazonalidade) e <i>QUEM</i> (perfil demográfico) adoece.<br>
+        <b>Dados Usados:</b> Campos de 'Data de Notificação', 'Sexo' e 'Idade' das fichas do SINAN.<br>
+        <b>Importância:</b> Ajuda a planejar campanhas sazonais (ex: reforço antes de Março) e focar em grupos de risco.
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("---")
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.subheader("Sazonalidade (Meses de Pico)")
+        grafico_por_ano('sazonalidade', fig_sazonalidade, 'df_mensal_filtrado', width='stretch')
+    with col2:
+        st.subheader("Distribuição por Sexo")
+        def construir_fig_pie():
+            df_sexo = df_perfil_filtrado[['casos_masculino', 'casos_feminino']].T.reset_index()
+            df_sexo.columns = ['sexo', 'casos']
+            df_sexo['sexo'] = df_sexo['sexo'].str.replace('casos_', '').str.capitalize()
+            fig_pie = px.pie(df_sexo, names='sexo', values='casos', hole=0.4, color_discrete_sequence=['#1f77b4', '#e377c2'])
+            return fig_pie
+
+        grafico('sexo', construir_fig_pie, width='stretch')
+
+    st.markdown("---")    
+    st.subheader("Faixa Etária e Desfechos")
+    c_age, c_outcome = st.columns(2)
+    with c_age:
+        if not df_faixa_filtrada.empty:
+            grafico_por_ano('faixa_etaria', fig_faixa_etaria, 'df_faixa_filtrada', width='stretch')
+    with c_outcome:
+        grafico_por_ano('desfechos', plot_desfechos, 'df_perfil_filtrado', width='stretch')
+
+    st.markdown("---")
+    st.subheader("Semanas Epidemiológicas por Área")
+    col_nivel, col_indicador = st.columns([1, 2])
+    with col_nivel:
+        nivel = st.radio("Área:", list(NIVEIS_SEMANA), horizontal=True)
+    with col_indicador:
+        indicador = st.selectbox("Indicador semanal:", list(INDICADORES_SEMANA))
+
+    series = ctx.series_epi(NIVEIS_SEMANA[nivel])
+    colunas = series.colunas_do_ano(ctx.ano_selecionado) if series is not None else None
+    if colunas is None or not colunas.any():
+        st.info("Sem casos diários para este período: a série semanal é montada a partir das notificações do SINAN (python db_local.py <exportações>).")
+        return
+    grafico('semanas_epi', lambda: fig_semanas(series, colunas, indicador), seletor=(nivel, indicador), width='stretch')
+    st.caption(f"As {MAX_AREAS_SEMANA} áreas com mais casos no período. Semanas de domingo a sábado; a incidência usa a população de cada área.")
+
+    renderizar_canal_endemico(ctx, nivel)
@@ -0,0 +1,23 @@
+"""
+Pool de threads compartilhado pelos cálculos em lote com NumPy (bootstrap das
+correlações, réplicas de Monte Carlo da autocorrelação espacial).
+
+Threads e não processos: o NumPy solta o GIL nas ordenações, nos produtos de
+matrizes e nos sorteios, e um pool de processos dentro de um worker do Streamlit
+teria de copiar os dados a cada tarefa. Um pool só por processo, criado na primeira
+chamada, para que análises simultâneas não disputem mais threads que núcleos.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_pool = {'executor': None}
+_lock_pool = threading.Lock()
+
+
+def executor_numpy():
+    """ThreadPoolExecutor do processo, com uma thread por núcleo."""
+    with _lock_pool:
+        if _pool['executor'] is None:
+            _pool['executor'] = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="numpy")
+        return _pool['executor']
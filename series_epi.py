@@ -0,0 +1,140 @@
+"""
+Séries por semana epidemiológica (SE) por área (bairro ou região) e indicadores móveis.
+
+A semana epidemiológica vai de domingo a sábado; a SE 1 de um ano é a que contém
+4 de janeiro (a primeira com ao menos 4 dias em janeiro), como no calendário do SINAN.
+
+Os casos diários chegam em formato longo (data, área, casos) e viram uma matriz
+áreas x semanas com um único np.bincount. Os indicadores (incidência móvel de 4
+semanas, média móvel, comparação com a mesma SE do ano anterior) são operações
+sobre a matriz inteira: todas as áreas de uma vez, sem laço por área.
+"""
+import datetime
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+JANELA_SEMANAS = 4
+POR_HABITANTES = 100_000
+
+# 1970-01-01 foi uma quinta-feira: (dias + 4) % 7 é o dia da semana com domingo = 0
+_DESLOCAMENTO_DOMINGO = 4
+
+
+def semana_epi_de(data):
+    """SE de uma data (datetime.date) no formato AAAASS, como o SEM_NOT do SINAN."""
+    inicio = data - datetime.timedelta(days=(data.weekday() + 1) % 7)  # domingo da semana
+    ano = (inicio + datetime.timedelta(days=3)).year  # a quarta-feira decide o ano da SE
+    quatro_jan = datetime.date(ano, 1, 4)
+    primeira = quatro_jan - datetime.timedelta(days=(quatro_jan.weekday() + 1) % 7)
+    return ano * 100 + (inicio - primeira).days // 7 + 1
+
+
+def inicio_da_semana(dias):
+    """Domingo que abre a SE de cada data (datetime64[D] -> datetime64[D])."""
+    dias = np.asarray(dias, dtype="datetime64[D]")
+    numero = dias.astype(np.int64)
+    return (numero - (numero + _DESLOCAMENTO_DOMINGO) % 7).astype("datetime64[D]")
+
+
+def semanas_epi(dias):
+    """(ano epidemiológico, número da SE) de cada data, vetorizado."""
+    inicio = inicio_da_semana(dias)
+    ano = (inicio + np.timedelta64(3, "D")).astype("datetime64[Y]").astype(np.int64) + 1970
+    quatro_jan = (ano - 1970).astype("datetime64[Y]").astype("datetime64[D]") + np.timedelta64(3, "D")
+    semana = (inicio - inicio_da_semana(quatro_jan)).astype(np.int64) // 7 + 1
+    return ano, semana
+
+
+@dataclass(frozen=True)
+class SeriesEpi:
+    """Matrizes áreas x semanas (consecutivas, sem buracos) e os indicadores derivados."""
+    areas: np.ndarray          # nomes das áreas (linhas)
+    inicio: np.ndarray         # domingo de cada semana (colunas), datetime64[D]
+    ano_epi: np.ndarray
+    semana_epi: np.ndarray
+    casos: np.ndarray          # casos por semana
+    habitantes: np.ndarray     # população de cada área (NaN se desconhecida)
+    incidencia_movel: np.ndarray  # casos nas últimas JANELA semanas por 100 mil hab. (NaN sem população)
+    media_movel: np.ndarray    # média de casos por semana nas últimas JANELA semanas
+    variacao_anual: np.ndarray  # % contra a mesma SE do ano anterior (NaN sem base)
+
+    def taxa_semanal(self):
+        """Casos da semana por 100 mil hab.; áreas sem população ficam com os casos."""
+        taxa = self.casos * POR_HABITANTES / self.habitantes[:, None]
+        return np.where(np.isfinite(self.habitantes)[:, None], taxa, self.casos)
+
+    def colunas_do_ano(self, ano):
+        """Máscara das semanas de um ano epidemiológico ("Todos os Anos" = todas)."""
+        if ano == "Todos os Anos":
+            return np.ones(len(self.inicio), dtype=bool)
+        return self.ano_epi == int(ano)
+
+
+def matriz_semanal(dias, codigos_area, casos, n_areas):
+    """
+    Soma os casos (diários ou não) em áreas x semanas consecutivas. Devolve
+    (inicio de cada semana, matriz de inteiros).
+    """
+    inicio = inicio_da_semana(dias).astype(np.int64)
+    primeira = inicio.min()
+    coluna = (inicio - primeira) // 7
+    n_semanas = int(coluna.max()) + 1
+    matriz = np.bincount(
+        codigos_area * n_semanas + coluna, weights=casos, minlength=n_areas * n_semanas
+    ).reshape(n_areas, n_semanas)
+    semanas = (primeira + 7 * np.arange(n_semanas)).astype("datetime64[D]")
+    return semanas, matriz.astype(np.int64)
+
+
+def soma_movel(matriz, janela=JANELA_SEMANAS):
+    """Soma das últimas `janela` colunas (a própria inclusa) via soma acumulada; NaN no começo."""
+    acumulada = np.cumsum(matriz, axis=1, dtype=np.float64)
+    resultado = np.full(matriz.shape, np.nan)
+    resultado[:, janela - 1:] = acumulada[:, janela - 1:]
+    resultado[:, janela:] -= acumulada[:, :-janela]
+    return resultado
+
+
+def variacao_mesma_semana(matriz, ano_epi, semana_epi):
+    """Variação % de cada coluna contra a mesma SE do ano anterior (NaN se ela não existir ou for zero)."""
+    chave = ano_epi * 100 + semana_epi  # crescente: as colunas são semanas consecutivas
+    alvo = (ano_epi - 1) * 100 + semana_epi
+    posicao = np.searchsorted(chave, alvo)
+    existe = (posicao < len(chave)) & (chave[np.minimum(posicao, len(chave) - 1)] == alvo)
+    anterior = np.full(matriz.shape, np.nan)
+    anterior[:, existe] = matriz[:, posicao[existe]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variacao = (matriz - anterior) / anterior * 100
+    variacao[~(anterior > 0)] = np.nan
+    return variacao
+
+
+def calcular_series(dias, areas, casos, populacao=None, janela=JANELA_SEMANAS):
+    """
+    Monta a SeriesEpi de vetores longos (data, área, casos). `populacao` é um dict
+    {área: habitantes}; áreas sem população ficam com incidência NaN. Devolve None
+    sem nenhum caso.
+    """
+    if len(dias) == 0:
+        return None
+    # factorize usa hash: bem mais rápido que np.unique em texto
+    codigos, nomes = pd.factorize(np.asarray(areas, dtype=object), sort=True)
+    nomes = np.asarray(nomes, dtype=object)
+    inicio, matriz = matriz_semanal(dias, codigos, np.asarray(casos, dtype=np.float64), len(nomes))
+    ano_epi, semana_epi = semanas_epi(inicio)
+
+    soma = soma_movel(matriz, janela)
+    habitantes = np.array([(populacao or {}).get(nome, np.nan) or np.nan for nome in nomes], dtype=np.float64)
+    return SeriesEpi(
+        areas=nomes,
+        inicio=inicio,
+        ano_epi=ano_epi,
+        semana_epi=semana_epi,
+        casos=matriz,
+        habitantes=habitantes,
+        incidencia_movel=soma / habitantes[:, None] * POR_HABITANTES,
+        media_movel=soma / janela,
+        variacao_anual=variacao_mesma_semana(matriz, ano_epi, semana_epi),
+    )
@@ -0,0 +1,415 @@
+"""
+Exportação do dashboard inteiro como site estático pré-renderizado.
+
+Cada combinação página x ano x opções dos seletores da página (cor do mapa, nível do
+mapa, eixo X da correlação) é renderizada sem navegador (streamlit.testing.AppTest) e
+vira um HTML autocontido — cards de KPI, figuras Plotly e tabelas — mais um JSON com
+os mesmos elementos (specs das figuras e tabelas como registros). Os seletores viram
+links entre as variantes, então o site funciona num servidor de arquivos comum ou numa
+CDN, sem um processo Python por sessão (ex.: durante o pico de 2024).
+
+As combinações rodam em paralelo num pool de processos: cada processo mantém o seu
+AppTest, com os caches do Streamlit aquecidos entre as páginas que recebe.
+
+Uso:
+    python site_estatico.py                    # grava em site/
+    python site_estatico.py --saida /srv/dengue --processos 4
+"""
+import argparse
+import html
+import itertools
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from geometria_bairros import DIR_ESTATICO
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(RAIZ, "app.py")
+SAIDA_PADRAO = "site"
+TIMEOUT_RENDER = 300  # segundos por execução do script no AppTest
+PREFIXO_ESTATICO = "app/static/"  # como o app referencia static/ (geojson dos bairros)
+
+_at = None  # AppTest do processo trabalhador
+
+
+# --- NOMES DE ARQUIVO ---
+
+def slug(texto):
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", texto.lower()).strip("-") or "x"
+
+
+def slug_pagina(titulo):
+    from paginas import PAGINAS
+    return PAGINAS[titulo].rsplit(".", 1)[-1]
+
+
+def arquivo_variante(indices):
+    """index.html para as opções padrão; v-<i>-<j>.html para as demais."""
+    if not any(indices):
+        return "index"
+    return "v-" + "-".join(str(i) for i in indices)
+
+
+# --- HTML ---
+
+CSS_BASE = """
+body { font-family: "Source Sans Pro", sans-serif; margin: 0; display: flex; color: #31333F; }
+aside { width: 260px; min-height: 100vh; background: #f0f2f6; padding: 1rem; box-sizing: border-box; }
+aside a { display: block; padding: .15rem 0; color: #31333F; text-decoration: none; }
+aside a.ativo, .seletor a.ativo { font-weight: 700; color: #ff4b4b; }
+main { flex: 1; padding: 1rem 2.5rem; max-width: 1200px; }
+.linha { display: flex; gap: 1rem; flex-wrap: wrap; }
+.linha > .coluna { min-width: 200px; }
+.seletor { margin: .75rem 0; }
+.seletor a { margin-right: 1rem; }
+.caption { color: #808495; font-size: .875rem; }
+.alerta { padding: .75rem 1rem; border-radius: .5rem; margin: .5rem 0; background: #e8f0fe; }
+.alerta-warning { background: #fff8e1; } .alerta-error { background: #fdecea; } .alerta-success { background: #e8f5e9; }
+.metrica span { display: block; font-size: .875rem; } .metrica strong { font-size: 2rem; font-weight: 400; }
+table.tabela { border-collapse: collapse; font-size: .875rem; } table.tabela td, table.tabela th { border: 1px solid #e6e9ef; padding: .25rem .5rem; }
+.grafico { width: 100%; min-height: 450px; }
+"""
+
+
+ATIVO = ' class="ativo"'
+
+
+def _inline(texto):
+    texto = html.escape(texto, quote=False)
+    texto = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", texto)
+    texto = re.sub(r"(?<!\*)\*(?!\s)(.+?)\*", r"<em>\1</em>", texto)
+    return re.sub(r"`(.+?)`", r"<code>\1</code>", texto)
+
+
+def markdown_simples(texto):
+    """O markdown que as páginas usam: títulos, listas, negrito/itálico, regras e parágrafos."""
+    partes, lista, paragrafo = [], [], []
+
+    def fechar():
+        if paragrafo:
+            partes.append(f"<p>{_inline(' '.join(paragrafo))}</p>")
+            paragrafo.clear()
+        if lista:
+            partes.append("<ul>" + "".join(f"<li>{_inline(item)}</li>" for item in lista) + "</ul>")
+            lista.clear()
+
+    for linha in texto.strip().splitlines():
+        linha = linha.strip()
+        titulo = re.match(r"(#{1,6})\s+(.*)", linha)
+        item = re.match(r"[-*+]\s+(.*)", linha)
+        if not linha:
+            fechar()
+        elif linha in ("---", "***"):
+            fechar()
+            partes.append("<hr>")
+        elif titulo:
+            fechar()
+            nivel = len(titulo.group(1))
+            partes.append(f"<h{nivel}>{_inline(titulo.group(2))}</h{nivel}>")
+        elif item:
+            if paragrafo:
+                fechar()
+            lista.append(item.group(1))
+        else:
+            if lista:
+                fechar()
+            paragrafo.append(linha)
+    fechar()
+    return "\n".join(partes)
+
+
+def _spec_figura(elemento, prefixo_estatico):
+    spec = json.loads(elemento.proto.spec)
+    for traco in spec.get("data", []):
+        geojson = traco.get("geojson")
+        if isinstance(geojson, str) and geojson.startswith(PREFIXO_ESTATICO):
+            traco["geojson"] = prefixo_estatico + geojson[len(PREFIXO_ESTATICO):]
+    config = json.loads(elemento.proto.config or "{}")
+    return spec, config
+
+
+class Renderizador:
+    """Converte a árvore de elementos do AppTest em HTML e na lista de elementos do JSON."""
+
+    def __init__(self, prefixo_estatico, links_seletores):
+        self.prefixo_estatico = prefixo_estatico
+        self.links_seletores = links_seletores  # rótulo -> [(opção, href, ativa)]
+        self.elementos = []
+        self.n_figuras = 0
+
+    def bloco(self, no):
+        return "\n".join(filter(None, (self.elemento(filho) for filho in no.children.values())))
+
+    def elemento(self, el):
+        tipo = el.type
+        if tipo == "flex_container":
+            return f'<div class="linha">{self.bloco(el)}</div>'
+        if tipo == "column":
+            return f'<div class="coluna" style="flex: {el.weight:.4f}">{self.bloco(el)}</div>'
+        if tipo == "expander":
+            return f"<details><summary>{html.escape(el.label)}</summary>{self.bloco(el)}</details>"
+        if tipo == "markdown":
+            corpo = el.proto.body
+            self.elementos.append({'tipo': 'markdown', 'texto': corpo})
+            return corpo if el.proto.allow_html else markdown_simples(corpo)
+        if tipo in ("title", "header", "subheader"):
+            nivel = {"title": 1, "header": 2, "subheader": 3}[tipo]
+            self.elementos.append({'tipo': tipo, 'texto': el.value})
+            return f"<h{nivel}>{_inline(el.value)}</h{nivel}>"
+        if tipo == "caption":
+            self.elementos.append({'tipo': 'caption', 'texto': el.value})
+            return f'<div class="caption">{markdown_simples(el.value)}</div>'
+        if tipo == "divider":
+            return "<hr>"
+        if tipo in ("info", "warning", "error", "success"):
+            self.elementos.append({'tipo': tipo, 'texto': el.value})
+            return f'<div class="alerta alerta-{tipo}">{markdown_simples(el.value)}</div>'
+        if tipo == "metric":
+            self.elementos.append({'tipo': 'metric', 'rotulo': el.label, 'valor': el.value, 'delta': el.delta})
+            delta = f"<small>{html.escape(str(el.delta))}</small>" if el.delta else ""
+            return (f'<div class="metrica"><span>{html.escape(el.label)}</span>'
+                    f"<strong>{html.escape(str(el.value))}</strong>{delta}</div>")
+        if tipo == "plotly_chart":
+            spec, config = _spec_figura(el, self.prefixo_estatico)
+            self.elementos.append({'tipo': 'figura', 'spec': spec})
+            self.n_figuras += 1
+            id_div = f"figura-{self.n_figuras}"
+            dados = json.dumps({'spec': spec, 'config': {**config, 'responsive': True}}, ensure_ascii=False, separators=(",", ":"))
+            dados = dados.replace("</", "<\\/")
+            return (f'<div class="grafico" id="{id_div}"></div>'
+                    f'<script type="application/json" data-figura="{id_div}">{dados}</script>')
+        if tipo == "dataframe":
+            df = el.value
+            self.elementos.append({'tipo': 'tabela', 'colunas': [str(c) for c in df.columns],
+                                   'linhas': json.loads(df.to_json(orient="values", force_ascii=False))})
+            return df.to_html(index=False, classes="tabela", na_rep="", border=0)
+        if tipo in ("selectbox", "radio"):
+            links = self.links_seletores.get(el.label, [])
+            self.elementos.append({'tipo': 'seletor', 'rotulo': el.label, 'opcoes': [opcao for opcao, _, _ in links]})
+            itens = "".join(
+                f'<a href="{href}"{ATIVO if ativa else ""}>{html.escape(str(opcao))}</a>'
+                for opcao, href, ativa in links
+            )
+            return f'<div class="seletor"><strong>{html.escape(el.label)}</strong><br>{itens}</div>'
+        return ""  # widgets sem equivalente estático (toggle etc.)
+
+
+SCRIPT_FIGURAS = """
+<script>
+document.querySelectorAll("script[data-figura]").forEach(function (s) {
+  var d = JSON.parse(s.textContent);
+  Plotly.newPlot(s.dataset.figura, d.spec.data, d.spec.layout || {}, d.config);
+});
+</script>
+"""
+
+
+def montar_html(titulo, corpo, navegacao, raiz_relativa):
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(titulo)}</title>
+<link rel="stylesheet" href="{raiz_relativa}assets/site.css">
+<script src="{raiz_relativa}assets/plotly.min.js"></script>
+</head>
+<body>
+<aside>{navegacao}</aside>
+<main>
+{corpo}
+</main>
+{SCRIPT_FIGURAS}
+</body>
+</html>
+"""
+
+
+def _navegacao(paginas, anos, pagina, ano, variante):
+    """Links da sidebar: páginas (na variante padrão) e anos (mantendo a variante atual)."""
+    partes = ["<h3>Navegação</h3>"]
+    for titulo in paginas:
+        ativo = ATIVO if titulo == pagina else ""
+        partes.append(f'<a{ativo} href="../../{slug_pagina(titulo)}/{slug(ano)}/index.html">{html.escape(titulo)}</a>')
+    partes.append("<h3>Ano de análise</h3>")
+    for opcao in anos:
+        ativo = ATIVO if opcao == ano else ""
+        partes.append(f'<a{ativo} href="../{slug(opcao)}/{variante}.html">{html.escape(str(opcao))}</a>')
+    return "\n".join(partes)
+
+
+# --- RENDERIZAÇÃO (processos trabalhadores) ---
+
+def _iniciar_trabalhador(timeout):
+    global _at
+    from streamlit.testing.v1 import AppTest
+
+    _at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    _at.run()
+
+
+def _seletores_da_pagina(at):
+    """(tipo, rótulo, opções) dos selectbox e radio da área principal."""
+    return [(tipo, w.label, list(w.options)) for tipo in ("selectbox", "radio") for w in getattr(at.main, tipo)]
+
+
+def _escolher(at, tipo, rotulo, indice):
+    widget = next(w for w in getattr(at.main, tipo) if w.label == rotulo)
+    if hasattr(widget, "select_index"):
+        widget.select_index(indice)
+    else:  # radio não tem select_index
+        widget.set_value(widget.options[indice])
+
+
+def renderizar_pagina_ano(pagina, ano, paginas, anos, saida):
+    """
+    Renderiza todas as combinações dos seletores de uma página num ano e grava os
+    HTML/JSON em <saida>/<página>/<ano>/. Devolve [(arquivo, segundos, erro)].
+    """
+    at = _at
+    at.sidebar.selectbox(key="ano").set_value(ano)
+    at.sidebar.radio[0].set_value(pagina)
+    at.run()
+    seletores = _seletores_da_pagina(at)
+    pasta = os.path.join(saida, slug_pagina(pagina), slug(ano))
+    os.makedirs(pasta, exist_ok=True)
+
+    resultado = []
+    for indices in itertools.product(*(range(len(opcoes)) for _, _, opcoes in seletores)):
+        inicio = time.perf_counter()
+        for (tipo, rotulo, _), indice in zip(seletores, indices):
+            _escolher(at, tipo, rotulo, indice)
+        at.run()
+        erro = at.exception[0].message if at.exception else None
+
+        links = {}
+        for posicao, (_, rotulo, opcoes) in enumerate(seletores):
+            links[rotulo] = []
+            for i, opcao in enumerate(opcoes):
+                outra = list(indices)
+                outra[posicao] = i
+                links[rotulo].append((opcao, f"{arquivo_variante(outra)}.html", i == indices[posicao]))
+
+        variante = arquivo_variante(indices)
+        renderizador = Renderizador("../../static/", links)
+        corpo = renderizador.bloco(at.main)
+        expansores = "".join(
+            renderizador.elemento(el) for el in at.sidebar.children.values()
+            if el.type == "expander" and "Desempenho" not in el.label
+        )
+        navegacao = _navegacao(paginas, anos, pagina, ano, variante) + expansores
+        with open(os.path.join(pasta, f"{variante}.html"), "w", encoding="utf-8") as arquivo:
+            arquivo.write(montar_html(f"{pagina} — {ano}", corpo, navegacao, "../../"))
+        with open(os.path.join(pasta, f"{variante}.json"), "w", encoding="utf-8") as arquivo:
+            json.dump({
+                'pagina': pagina,
+                'ano': ano,
+                'seletores': {rotulo: opcoes[i] for (_, rotulo, opcoes), i in zip(seletores, indices)},
+                'elementos': renderizador.elementos,
+            }, arquivo, ensure_ascii=False, separators=(",", ":"), default=str)
+        resultado.append((os.path.join(slug_pagina(pagina), slug(ano), f"{variante}.html"),
+                          time.perf_counter() - inicio, erro))
+    return resultado
+
+
+# --- ORQUESTRAÇÃO ---
+
+def descobrir_combinacoes():
+    """Páginas e anos do menu, lidos do AppTest do trabalhador."""
+    return list(_at.sidebar.radio[0].options), list(_at.sidebar.selectbox(key="ano").options)
+
+
+def _copiar_recursos(saida):
+    import plotly.offline
+
+    assets = os.path.join(saida, "assets")
+    os.makedirs(assets, exist_ok=True)
+    with open(os.path.join(assets, "plotly.min.js"), "w", encoding="utf-8") as arquivo:
+        arquivo.write(plotly.offline.get_plotlyjs())
+    with open(os.path.join(assets, "site.css"), "w", encoding="utf-8") as arquivo:
+        arquivo.write(CSS_BASE)
+    if os.path.isdir(DIR_ESTATICO):
+        shutil.copytree(DIR_ESTATICO, os.path.join(saida, "static"), dirs_exist_ok=True)
+
+
+def _gravar_indice(saida, paginas, anos, gerado_em):
+    pagina_inicial = f"{slug_pagina(paginas[0])}/{slug(anos[0])}/index.html"
+    linhas = "".join(
+        f"<tr><th>{html.escape(titulo)}</th>"
+        + "".join(f'<td><a href="{slug_pagina(titulo)}/{slug(ano)}/index.html">{html.escape(str(ano))}</a></td>' for ano in anos)
+        + "</tr>"
+        for titulo in paginas
+    )
+    with open(os.path.join(saida, "index.html"), "w", encoding="utf-8") as arquivo:
+        arquivo.write(f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta http-equiv="refresh" content="0; url={pagina_inicial}">
+<title>Ribeirão em Dados: Monitoramento da Dengue</title>
+<link rel="stylesheet" href="assets/site.css">
+</head>
+<body><main>
+<h1>🦟 Ribeirão em Dados: Monitoramento da Dengue</h1>
+<p class="caption">Versão estática gerada em {gerado_em}.</p>
+<table class="tabela">{linhas}</table>
+</main></body>
+</html>
+""")
+
+
+def exportar_site(saida=SAIDA_PADRAO, processos=None, timeout=TIMEOUT_RENDER):
+    """Renderiza todas as combinações em paralelo e grava o site em `saida`."""
+    os.environ.setdefault("RIBEIRAO_AQUECER_PAGINAS", "0")
+    os.environ.setdefault("RIBEIRAO_LOG_DESEMPENHO", "")
+    inicio = time.perf_counter()
+    os.makedirs(saida, exist_ok=True)
+    _copiar_recursos(saida)
+
+    arquivos, erros = [], []
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count(),
+                             initializer=_iniciar_trabalhador, initargs=(timeout,)) as pool:
+        paginas, anos = pool.submit(descobrir_combinacoes).result()
+        tarefas = {
+            pool.submit(renderizar_pagina_ano, pagina, ano, paginas, anos, saida): (pagina, ano)
+            for pagina in paginas for ano in anos
+        }
+        for tarefa in as_completed(tarefas):
+            pagina, ano = tarefas[tarefa]
+            for arquivo, segundos, erro in tarefa.result():
+                arquivos.append(arquivo)
+                print(f"  {arquivo} ({segundos:.1f} s)" + (f" ERRO: {erro}" if erro else ""))
+                if erro:
+                    erros.append((arquivo, erro))
+
+    _gravar_indice(saida, paginas, anos, time.strftime("%Y-%m-%d %H:%M"))
+    print(f"{len(arquivos)} páginas em {saida}/ em {time.perf_counter() - inicio:.1f} s")
+    return arquivos, erros
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta o dashboard como site estático pré-renderizado.")
+    parser.add_argument("--saida", default=SAIDA_PADRAO, help="pasta do site gerado")
+    parser.add_argument("--processos", type=int, help="processos em paralelo (padrão: nº de CPUs)")
+    parser.add_argument("--timeout", type=int, default=TIMEOUT_RENDER,
+                        help="limite em segundos por renderização")
+    args = parser.parse_args()
+
+    os.chdir(RAIZ)  # o app lê data/ e static/ com caminhos relativos
+    # pelo nome do módulo, não __main__: o AppTest troca o __main__ dos trabalhadores
+    # pelo app.py, e o pool não acharia lá as funções enviadas
+    import site_estatico
+    _, erros = site_estatico.exportar_site(os.path.abspath(args.saida), args.processos, args.timeout)
+    if erros:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
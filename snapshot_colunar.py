@@ -0,0 +1,207 @@
+import json
+import os
+import shutil
+import sqlite3
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # sem pyarrow o dashboard continua lendo direto do SQLite
+    pa = None
+
+# --- CONFIGURAÇÕES DO SNAPSHOT ---
+SNAPSHOT_DIR = os.path.join("data", "snapshot")
+MANIFESTO = "manifest.json"
+VERSAO_FORMATO = 2
+
+# notificações individuais, dados por setor censitário e o clima diário alimentam só
+# o db_local.py; o dashboard nunca os lê
+TABELAS_IGNORADAS = (
+    "notificacoes_dengue", "versao_tabelas", "malha_setores", "pesos_setor_bairro", "censo_setores",
+    "clima_diario",
+)
+
+_TIPOS_INTEIROS = (
+    (-2**7, 2**7 - 1, "int8"), (-2**15, 2**15 - 1, "int16"),
+    (-2**31, 2**31 - 1, "int32"), (-2**63, 2**63 - 1, "int64"),
+)
+
+
+def disponivel():
+    return pa is not None
+
+
+def _schema(conn, tabela, filtro="", params=()):
+    """
+    Schema Arrow compacto a partir das colunas do SQLite: inteiros no menor tipo
+    que comporta os valores (da partição exportada) e textos com dicionário (viram
+    category no pandas).
+    """
+    campos = []
+    for _, coluna, tipo, *_ in conn.execute(f"PRAGMA table_info({tabela})"):
+        tipo = (tipo or "").upper()
+        if "INT" in tipo:
+            minimo, maximo = conn.execute(f"SELECT MIN({coluna}), MAX({coluna}) FROM {tabela} {filtro}", params).fetchone()
+            minimo, maximo = minimo or 0, maximo or 0
+            nome_tipo = next(nome for baixo, alto, nome in _TIPOS_INTEIROS if baixo <= minimo and maximo <= alto)
+            campos.append(pa.field(coluna, getattr(pa, nome_tipo)()))
+        elif "CHAR" in tipo or "TEXT" in tipo:
+            campos.append(pa.field(coluna, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            campos.append(pa.field(coluna, pa.float64()))
+    return pa.schema(campos)
+
+
+def _gravar_arquivo(caminho, cursor, schema):
+    colunas = list(zip(*cursor.fetchall())) or [[] for _ in schema]
+    arrays = []
+    for valores, campo in zip(colunas, schema):
+        if pa.types.is_dictionary(campo.type):
+            arrays.append(pa.array(valores, pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(valores, campo.type))
+    tabela = pa.Table.from_arrays(arrays, schema=schema)
+    # sem compressão: é o que permite ler o arquivo por memory-map, sem cópia
+    with pa.OSFile(caminho, "wb") as arquivo, pa.ipc.new_file(arquivo, schema) as escritor:
+        escritor.write_table(tabela)
+    return tabela.num_rows
+
+
+def _exportar_tabela(conn, tabela, destino, municipio=""):
+    """
+    Grava a partição de um município (ou a tabela inteira, se ela não tiver
+    cod_municipio) em Arrow IPC, com um arquivo por ano quando existe a coluna `ano`.
+    """
+    os.makedirs(destino, exist_ok=True)
+    colunas = [linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})")]
+    filtro, params = ("WHERE cod_municipio = ?", (municipio,)) if "cod_municipio" in colunas else ("", ())
+    schema = _schema(conn, tabela, filtro, params)
+    info = {"colunas": schema.names, "linhas": 0, "particoes": {}}
+
+    if "ano" in schema.names:
+        anos = [ano for (ano,) in conn.execute(f"SELECT DISTINCT ano FROM {tabela} {filtro} ORDER BY ano", params)]
+        for ano in anos:
+            arquivo = f"ano={ano}.arrow"
+            condicao = f"{filtro} AND ano = ?" if filtro else "WHERE ano = ?"
+            cursor = conn.execute(f"SELECT * FROM {tabela} {condicao}", (*params, ano))
+            linhas = _gravar_arquivo(os.path.join(destino, arquivo), cursor, schema)
+            info["particoes"][str(ano)] = arquivo
+            info["linhas"] += linhas
+    else:
+        arquivo = "tabela.arrow"
+        info["linhas"] = _gravar_arquivo(os.path.join(destino, arquivo), conn.execute(f"SELECT * FROM {tabela} {filtro}", params), schema)
+        info["particoes"][""] = arquivo
+    return info
+
+
+def ler_manifesto(diretorio=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(diretorio, MANIFESTO), encoding="utf-8") as arquivo:
+            manifesto = json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    # manifesto de um formato anterior: como se não houvesse snapshot
+    return manifesto if manifesto.get("versao_formato") == VERSAO_FORMATO else None
+
+
+def exportar_snapshot(caminho_banco, tabelas=None, municipios=None, diretorio=SNAPSHOT_DIR):
+    """
+    Escreve o snapshot colunar do banco (Arrow IPC sem compressão, particionado por
+    município e ano) e o manifest.json com a versão de cada partição.
+
+    Cada versão de partição ganha um diretório próprio e o manifesto é trocado de uma
+    vez no final: processos que já mapearam arquivos antigos continuam lendo-os sem
+    erro. Com `tabelas` e/ou `municipios`, só essas partições são reexportadas (carga
+    incremental); as demais seguem apontando para os arquivos do snapshot anterior.
+    """
+    if pa is None:
+        print("pyarrow não instalado: snapshot colunar não gerado.")
+        return None
+
+    conn = sqlite3.connect(f"file:{os.path.abspath(caminho_banco)}?mode=ro", uri=True)
+    conn.execute("BEGIN")  # uma única leitura consistente para todas as tabelas
+    versoes = {}
+    for tabela, municipio, versao in conn.execute("SELECT tabela, cod_municipio, versao FROM versao_tabelas"):
+        versoes.setdefault(tabela, {})[municipio] = versao
+    if tabelas is None:
+        tabelas = [t for t in versoes if t not in TABELAS_IGNORADAS]
+
+    anterior = ler_manifesto(diretorio) or {}
+    manifesto = {"versao_formato": VERSAO_FORMATO, "tabelas": {
+        tabela: {"municipios": dict(info["municipios"])} for tabela, info in anterior.get("tabelas", {}).items()
+    }}
+    for tabela in tabelas:
+        if tabela in TABELAS_IGNORADAS:
+            continue
+        particoes = manifesto["tabelas"].setdefault(tabela, {"municipios": {}})["municipios"]
+        for municipio, versao in versoes[tabela].items():
+            if municipios is not None and municipio not in municipios and municipio != "":
+                continue
+            relativo = os.path.join(tabela, f"m{municipio or '_'}", f"v{versao}")
+            info = _exportar_tabela(conn, tabela, os.path.join(diretorio, relativo), municipio)
+            particoes[municipio] = {"versao": versao, "diretorio": relativo, **info}
+    conn.close()
+
+    temporario = os.path.join(diretorio, MANIFESTO + ".tmp")
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, os.path.join(diretorio, MANIFESTO))
+
+    _remover_versoes_antigas(diretorio, manifesto, anterior)
+    return manifesto
+
+
+def _diretorios(manifesto):
+    return {
+        particao["diretorio"]
+        for info in manifesto.get("tabelas", {}).values()
+        for particao in info["municipios"].values()
+    }
+
+
+def _remover_versoes_antigas(diretorio, manifesto, anterior):
+    # mantém a versão atual e a imediatamente anterior de cada partição; apaga o
+    # resto, inclusive diretórios de formatos anteriores do snapshot
+    manter = _diretorios(manifesto) | _diretorios(anterior)
+    for tabela in manifesto["tabelas"]:
+        pasta = os.path.join(diretorio, tabela)
+        for nome in os.listdir(pasta):
+            if not nome.startswith("m"):
+                shutil.rmtree(os.path.join(pasta, nome), ignore_errors=True)
+                continue
+            for versao in os.listdir(os.path.join(pasta, nome)):
+                if os.path.join(tabela, nome, versao) not in manter:
+                    shutil.rmtree(os.path.join(pasta, nome, versao), ignore_errors=True)
+
+
+def informacoes_particao(manifesto, tabela, municipio=""):
+    """Entrada do manifesto para a partição do município (ou '' para tabelas sem partição)."""
+    info = (manifesto or {}).get("tabelas", {}).get(tabela)
+    if info is None:
+        return None
+    return info["municipios"].get(municipio) or info["municipios"].get("")
+
+
+def ler_particao(manifesto, tabela, municipio="", ano=None, diretorio=SNAPSHOT_DIR):
+    """
+    Lê a partição do município num ano (ou em todos os anos, sem `ano`) por memory-map
+    e devolve um DataFrame. Retorna None se a tabela ou a partição não estiverem no
+    snapshot.
+    """
+    info = informacoes_particao(manifesto, tabela, municipio)
+    if pa is None or info is None:
+        return None
+    if ano is None:
+        arquivos = list(info["particoes"].values())
+    else:
+        arquivo = info["particoes"].get(str(ano))
+        if arquivo is None:
+            return None
+        arquivos = [arquivo]
+
+    partes = []
+    for arquivo in arquivos:
+        fonte = pa.memory_map(os.path.join(diretorio, info["diretorio"], arquivo), "r")
+        partes.append(pa.ipc.open_file(fonte).read_all())
+    tabela_arrow = pa.concat_tables(partes) if len(partes) > 1 else partes[0]
+    return tabela_arrow.to_pandas(split_blocks=True)
@@ -0,0 +1,166 @@
+"""
+Vizinhança entre os bairros, calculada uma vez a partir dos polígonos do geojson.
+
+Dois bairros são vizinhos por contiguidade quando as bordas chegam a menos de
+TOLERANCIA_CONTIGUIDADE_M metros uma da outra (a tolerância absorve as pequenas
+frestas e sobreposições de malhas desenhadas à mão). Só os pares cujas caixas
+envolventes, alargadas pela tolerância, se tocam passam pela conta de distância
+vértice-aresta. Um bairro sem nenhum vizinho contíguo (uma ilha, ou uma malha em que
+os polígonos não se encostam) recebe os VIZINHOS_PROXIMOS bairros de centro mais
+próximo, e a relação é simetrizada.
+
+A matriz fica em formato CSR (início da lista de cada bairro e a lista concatenada
+de vizinhos), gravada no banco como pares e usada padronizada por linha: a
+defasagem espacial de um bairro é a média dos valores dos vizinhos.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from geocodificacao import GEOJSON_BAIRROS, carregar_bairros
+from geometria_bairros import KM_POR_GRAU
+
+TOLERANCIA_CONTIGUIDADE_M = 25.0
+VIZINHOS_PROXIMOS = 4
+
+
+@dataclass(frozen=True)
+class Vizinhanca:
+    """
+    Vizinhos de cada bairro em CSR: os de `nomes[i]` são
+    `vizinhos[inicio[i]:inicio[i + 1]]` (índices em `nomes`); `contiguo` diz, por
+    par, se veio da contiguidade ou dos centros mais próximos.
+    """
+    nomes: tuple
+    inicio: np.ndarray
+    vizinhos: np.ndarray
+    contiguo: np.ndarray
+
+    @property
+    def numero_vizinhos(self):
+        return np.diff(self.inicio)
+
+    def defasagem(self, valores):
+        """
+        Média dos valores dos vizinhos de cada bairro (W padronizada por linha) ao longo
+        do último eixo: (..., n) -> (..., n); 0 no bairro sem vizinhos.
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        acumulado = np.zeros(valores.shape[:-1] + (len(self.vizinhos) + 1,))
+        np.cumsum(valores[..., self.vizinhos], axis=-1, out=acumulado[..., 1:])
+        soma = acumulado[..., self.inicio[1:]] - acumulado[..., self.inicio[:-1]]
+        return soma / np.maximum(self.numero_vizinhos, 1)
+
+    def restringir(self, manter):
+        """Vizinhança só dos bairros com `manter` True (máscara na ordem de `nomes`)."""
+        manter = np.asarray(manter, dtype=bool)
+        novo_indice = np.cumsum(manter) - 1
+        origem = np.repeat(np.arange(len(self.nomes)), self.numero_vizinhos)
+        par = manter[origem] & manter[self.vizinhos]
+        origem = novo_indice[origem[par]]
+        return Vizinhanca(
+            tuple(nome for nome, m in zip(self.nomes, manter) if m),
+            np.concatenate([[0], np.cumsum(np.bincount(origem, minlength=int(manter.sum())))]),
+            novo_indice[self.vizinhos[par]],
+            self.contiguo[par],
+        )
+
+    def registros(self):
+        """(nome_bairro, vizinho, contiguo) de cada par (nos dois sentidos), para gravar no banco."""
+        origem = np.repeat(np.arange(len(self.nomes)), self.numero_vizinhos)
+        return [
+            (self.nomes[i], self.nomes[j], int(c))
+            for i, j, c in zip(origem.tolist(), self.vizinhos.tolist(), self.contiguo.tolist())
+        ]
+
+    @classmethod
+    def de_registros(cls, registros, nomes=None):
+        """
+        Reconstrói a vizinhança a partir das linhas (nome_bairro, vizinho, contiguo) do
+        banco. Com `nomes`, segue essa ordem (bairros fora dela são descartados).
+        """
+        if nomes is None:
+            nomes = sorted({nome for registro in registros for nome in registro[:2]})
+        posicao = {nome: i for i, nome in enumerate(nomes)}
+        pares = sorted(
+            (posicao[a], posicao[b], bool(c)) for a, b, c in registros if a in posicao and b in posicao
+        )
+        origem, destino, contiguo = zip(*pares) if pares else ((), (), ())
+        contagem = np.bincount(np.asarray(origem, dtype=np.int64), minlength=len(nomes))
+        return cls(
+            tuple(nomes), np.concatenate([[0], np.cumsum(contagem)]),
+            np.asarray(destino, dtype=np.int64), np.asarray(contiguo, dtype=bool),
+        )
+
+
+def _projetar(pontos, lat_ref):
+    """lon/lat -> metros num plano local (equiretangular na latitude de referência)."""
+    escala = KM_POR_GRAU * 1000
+    return np.column_stack([pontos[:, 0] * escala * np.cos(np.radians(lat_ref)), pontos[:, 1] * escala])
+
+
+def _distancia_vertices_arestas(vertices, arestas):
+    """Menor distância entre os vértices (m, 2) e os segmentos (k, 2, 2), no plano."""
+    a, b = arestas[:, 0], arestas[:, 1]
+    segmento = b - a
+    comprimento2 = np.maximum((segmento ** 2).sum(axis=1), 1e-12)
+    relativo = vertices[:, None, :] - a[None]
+    t = np.clip((relativo * segmento[None]).sum(axis=2) / comprimento2, 0, 1)
+    mais_proximo = a[None] + t[..., None] * segmento[None]
+    return np.sqrt(((vertices[:, None, :] - mais_proximo) ** 2).sum(axis=2)).min()
+
+
+def calcular_vizinhanca(caminho=GEOJSON_BAIRROS, tolerancia_m=TOLERANCIA_CONTIGUIDADE_M, k=VIZINHOS_PROXIMOS):
+    """
+    Vizinhanca dos bairros do geojson: contiguidade com tolerância e, para quem fica
+    sem vizinho contíguo, os `k` centros mais próximos. Bairros com várias partes
+    (MultiPolygon) são vizinhos de quem encostar em qualquer uma delas.
+    """
+    nomes, partes = carregar_bairros(caminho)
+    n = len(nomes)
+    lat_ref = np.mean([aneis[0][:, 1].mean() for _, aneis in partes]) if partes else 0.0
+    bairro_da_parte = np.array([indice for indice, _ in partes], dtype=np.int64)
+    contornos, arestas = [], []
+    for _, aneis in partes:
+        projetados = [_projetar(anel, lat_ref) for anel in aneis]
+        contornos.append(np.concatenate(projetados))
+        arestas.append(np.concatenate([np.stack([anel[:-1], anel[1:]], axis=1) for anel in projetados]))
+    caixas = np.array([[c[:, 0].min(), c[:, 1].min(), c[:, 0].max(), c[:, 1].max()] for c in contornos]).reshape(-1, 4)
+
+    # pré-filtro pelas caixas alargadas; só os pares candidatos medem a distância das bordas
+    x0, y0, x1, y1 = caixas.T
+    candidato = (
+        (x0[:, None] - tolerancia_m <= x1[None]) & (x0[None] - tolerancia_m <= x1[:, None])
+        & (y0[:, None] - tolerancia_m <= y1[None]) & (y0[None] - tolerancia_m <= y1[:, None])
+        & (bairro_da_parte[:, None] != bairro_da_parte[None])
+    )
+    contiguo = np.zeros((n, n), dtype=bool)
+    for p, q in zip(*np.nonzero(np.triu(candidato, 1))):
+        i, j = bairro_da_parte[p], bairro_da_parte[q]
+        if contiguo[i, j]:
+            continue
+        distancia = min(
+            _distancia_vertices_arestas(contornos[p], arestas[q]),
+            _distancia_vertices_arestas(contornos[q], arestas[p]),
+        )
+        contiguo[i, j] = contiguo[j, i] = distancia <= tolerancia_m
+
+    # ilhas: os k centros mais próximos, nos dois sentidos
+    centros = np.zeros((n, 2))
+    np.add.at(centros, bairro_da_parte, np.array([c.mean(axis=0) for c in contornos]).reshape(-1, 2))
+    centros /= np.maximum(np.bincount(bairro_da_parte, minlength=n), 1)[:, None]
+    proximo = np.zeros((n, n), dtype=bool)
+    ilhas = np.flatnonzero(~contiguo.any(axis=1))
+    if len(ilhas) and n > 1:
+        distancia = np.hypot(*(centros[ilhas, None, :] - centros[None]).transpose(2, 0, 1))
+        distancia[np.arange(len(ilhas)), ilhas] = np.inf
+        mais_proximos = np.argsort(distancia, axis=1, kind="stable")[:, :min(k, n - 1)]
+        proximo[np.repeat(ilhas, mais_proximos.shape[1]), mais_proximos.ravel()] = True
+        proximo |= proximo.T
+        proximo &= ~contiguo
+
+    origem, destino = np.nonzero(contiguo | proximo)
+    return Vizinhanca(
+        tuple(nomes), np.concatenate([[0], np.cumsum(np.bincount(origem, minlength=n))]),
+        destino.astype(np.int64), contiguo[origem, destino],
+    )